@@ -0,0 +1,344 @@
+# agent_session.py
+"""
+Azure AI agent session: client setup, agent/thread reuse and streamed turns.
+
+This module imports the Azure SDK, which is slow to load, so main.py
+imports it on a background thread while shortcuts already work.
+"""
+
+import asyncio
+import hashlib
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AsyncExitStack
+from typing import Any, Callable, Dict, Set
+
+from azure.ai.projects.aio import AIProjectClient
+from azure.identity.aio import DefaultAzureCredential
+from azure.core.exceptions import ResourceNotFoundError
+from azure.ai.agents.models import (
+    AsyncAgentEventHandler, FunctionTool, ListSortOrder, ThreadMessageOptions, ToolOutput
+)
+
+from context_window import ConversationWindow
+from instrumentation import measure, metrics, timed
+
+from task_client import SERVER_URL
+if SERVER_URL:
+    # Tool calls run on the task server; the proxies keep each tool's schema
+    from task_client import (
+        add_task, update_task, delete_task, get_overdue_tasks, get_projects, get_summary,
+        get_tags, get_tasks_due_between, get_tasks_due_this_week, get_tasks_due_today, get_upcoming_tasks,
+        list_tasks, search_tasks
+    )
+else:
+    from tools import add_task, update_task, delete_task
+    from agent_tools import (
+        get_overdue_tasks, get_projects, get_summary, get_tags, get_tasks_due_between, get_tasks_due_this_week,
+        get_tasks_due_today, get_upcoming_tasks, list_tasks, search_tasks
+    )
+
+MODEL = "gpt-4o-mini"
+AGENT_NAME = "task-manager-agent"
+INSTRUCTIONS = "You are a helpful task management assistant. You can add, list, update tasks, and provide summaries across projects. For questions about due dates, use the date-range tools rather than listing tasks and filtering dates yourself. Be concise and helpful."
+
+# Agent and thread IDs are kept here between sessions
+STATE_PATH = os.environ.get("AGENT_STATE_PATH", ".agent_state.json")
+
+# Collect user functions to be used as tools; reads use the compact agent encoding
+USER_FUNCTIONS: Set[Callable[..., Any]] = {
+    add_task, list_tasks, update_task, get_summary,
+    get_projects, delete_task, search_tasks, get_tasks_due_today,
+    get_overdue_tasks, get_tasks_due_this_week, get_upcoming_tasks, get_tasks_due_between, get_tags
+}
+
+
+# Tools that only read; several of these requested in one step run concurrently
+READ_ONLY_TOOLS = frozenset({
+    "list_tasks", "search_tasks", "get_summary", "get_projects", "get_tasks_due_today",
+    "get_overdue_tasks", "get_tasks_due_this_week", "get_upcoming_tasks", "get_tasks_due_between",
+    "get_tags",
+})
+
+
+@timed("agent.tool_call")
+def call_tool(functions: Dict[str, Callable[..., str]], name: str, arguments: str) -> str:
+    """Run one tool call and return its output, reporting failures to the model as JSON."""
+    function = functions.get(name)
+    if function is None:
+        return json.dumps({"status": "error", "message": f"unknown tool: {name}"})
+    try:
+        return function(**json.loads(arguments or "{}"))
+    except Exception as e:
+        return json.dumps({"status": "error", "message": str(e)})
+
+
+def agent_fingerprint(definitions: list) -> str:
+    """Hash of everything that shapes the agent; a change means it must be recreated."""
+    spec = {
+        "model": MODEL,
+        "name": AGENT_NAME,
+        "instructions": INSTRUCTIONS,
+        "tools": sorted((d.as_dict() for d in definitions), key=lambda d: d["function"]["name"]),
+    }
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()
+
+
+def load_state() -> dict:
+    try:
+        with open(STATE_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(state: dict):
+    tmp_path = STATE_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, STATE_PATH)
+
+
+async def reuse_or_create(agents, endpoint: str, definitions: list):
+    """
+    Return the session state, reusing the agent and thread saved in STATE_PATH.
+
+    The agent is reused only if it was created for the same endpoint with
+    the same fingerprint; otherwise it and its thread are replaced, and
+    both old ones are deleted. The saved conversation window is kept only
+    together with its thread.
+    """
+    fingerprint = agent_fingerprint(definitions)
+    state = load_state()
+    agent_id = thread_id = None
+
+    if state.get("endpoint") == endpoint and state.get("fingerprint") == fingerprint:
+        try:
+            agent_id = (await agents.get_agent(state["agent_id"])).id
+            print(f"Reusing agent, agent ID: {agent_id}")
+        except (KeyError, ResourceNotFoundError):
+            agent_id = None
+        if agent_id and state.get("thread_id"):
+            try:
+                thread_id = (await agents.threads.get(state["thread_id"])).id
+                print(f"Reusing thread, thread ID: {thread_id}")
+            except ResourceNotFoundError:
+                thread_id = None
+    elif state.get("agent_id") and state.get("endpoint") == endpoint:
+        # Tools or instructions changed: retire the outdated agent
+        try:
+            await agents.delete_agent(state["agent_id"])
+        except ResourceNotFoundError:
+            pass
+    if thread_id is None and state.get("thread_id") and state.get("endpoint") == endpoint:
+        # Its conversation was held with the old agent and tools: retire it too
+        try:
+            await agents.threads.delete(state["thread_id"])
+        except ResourceNotFoundError:
+            pass
+
+    if agent_id is None:
+        agent = await agents.create_agent(
+            model=MODEL,
+            name=AGENT_NAME,
+            instructions=INSTRUCTIONS,
+            tools=definitions,
+        )
+        agent_id = agent.id
+        print(f"Created agent, agent ID: {agent_id}")
+    if thread_id is None:
+        thread_id = (await agents.threads.create()).id
+        print(f"Created thread, thread ID: {thread_id}")
+
+    state = {"endpoint": endpoint, "fingerprint": fingerprint, "agent_id": agent_id,
+             "thread_id": thread_id,
+             "window": state.get("window") if thread_id == state.get("thread_id") else None}
+    save_state(state)
+    return state
+
+
+class StreamingHandler(AsyncAgentEventHandler):
+    """Prints the reply as tokens arrive and answers tool calls from the session's thread pool."""
+
+    def __init__(self, session: "AgentSession"):
+        super().__init__()
+        self.session = session
+        self.started = False
+        self.error = None
+        self.run_id = None
+        self.parts = []
+        self.started_at = time.perf_counter()
+
+    async def on_message_delta(self, delta) -> None:
+        if not self.started:
+            metrics.record("agent.first_token", time.perf_counter() - self.started_at)
+            print("\nAgent: ", end="", flush=True)
+            self.started = True
+        print(delta.text, end="", flush=True)
+        self.parts.append(delta.text)
+
+    async def on_thread_run(self, run) -> None:
+        self.run_id = run.id
+        if run.status == "failed":
+            self.error = run.last_error
+        elif run.status == "requires_action" and run.required_action is not None:
+            tool_calls = run.required_action.submit_tool_outputs.tool_calls
+            with measure("agent.tool_step"):
+                outputs = await self.session.call_tools(tool_calls)
+            tool_outputs = [
+                ToolOutput(tool_call_id=tool_call.id, output=output)
+                for tool_call, output in zip(tool_calls, outputs)
+            ]
+            # Submit every output at once and continue streaming the same run through this handler
+            with measure("agent.submit_tool_outputs"):
+                await self.session.agents.runs.submit_tool_outputs_stream(
+                    thread_id=run.thread_id, run_id=run.id,
+                    tool_outputs=tool_outputs, event_handler=self
+                )
+
+    async def on_error(self, data: str) -> None:
+        self.error = data
+
+
+class AgentSession:
+    """Runs agent turns on one thread, streaming replies to the terminal."""
+
+    def __init__(self, agents, state: dict, executor: ThreadPoolExecutor, exit_stack: AsyncExitStack):
+        self.agents = agents
+        self.state = state
+        self.agent_id = state["agent_id"]
+        self.thread_id = state["thread_id"]
+        self.window = ConversationWindow.from_state(state.get("window"))
+        self.executor = executor
+        self.functions = {f.__name__: f for f in USER_FUNCTIONS}
+        self.turn_tools: Set[str] = set()
+        self._exit_stack = exit_stack
+
+    @classmethod
+    async def open(cls, executor: ThreadPoolExecutor) -> "AgentSession":
+        """Create the Azure AI Project Client and reuse (or create) the agent and thread."""
+        endpoint = os.environ["PROJECT_ENDPOINT"]
+        exit_stack = AsyncExitStack()
+        try:
+            credential = await exit_stack.enter_async_context(DefaultAzureCredential())
+            project_client = await exit_stack.enter_async_context(
+                AIProjectClient(credential=credential, endpoint=endpoint)
+            )
+            agents = project_client.agents
+            definitions = FunctionTool(USER_FUNCTIONS).definitions
+            state = await reuse_or_create(agents, endpoint, definitions)
+        except BaseException:
+            await exit_stack.aclose()
+            raise
+        return cls(agents, state, executor, exit_stack)
+
+    async def close(self):
+        """Close the client; the agent and thread are kept for the next session."""
+        await self._exit_stack.aclose()
+
+    async def call_tool(self, tool_call) -> str:
+        """Run a requested tool on the worker pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, call_tool, self.functions,
+            tool_call.function.name, tool_call.function.arguments
+        )
+
+    async def call_tools(self, tool_calls) -> list:
+        """
+        Run the tool calls of one requires_action step, returning outputs in call order.
+
+        Each run of consecutive read-only calls executes concurrently on the
+        worker pool, so the step takes about as long as its slowest read.
+        Any other call waits for the calls before it and runs alone, so
+        writes keep the order the model asked for.
+        """
+        self.turn_tools.update(c.function.name for c in tool_calls)
+        outputs = []
+        for read_only, group in itertools.groupby(tool_calls, key=lambda c: c.function.name in READ_ONLY_TOOLS):
+            if read_only:
+                outputs.extend(await asyncio.gather(*(self.call_tool(c) for c in group)))
+            else:
+                for tool_call in group:
+                    outputs.append(await self.call_tool(tool_call))
+        return outputs
+
+    async def run_turn(self, content: str):
+        """Post one user message and stream the agent's reply; returns the reply, or None if the run failed."""
+        with measure("agent.turn"):
+            return await self._run_turn(content)
+
+    @property
+    def turn_was_read_only(self) -> bool:
+        """Whether the last turn read tasks through at least one tool and called nothing else."""
+        return bool(self.turn_tools) and self.turn_tools <= READ_ONLY_TOOLS
+
+    async def _run_turn(self, content: str):
+        self.turn_tools = set()
+        with measure("agent.message_create"):
+            await self.agents.messages.create(thread_id=self.thread_id, role="user", content=content)
+        handler = StreamingHandler(self)
+        with measure("agent.run"):
+            async with await self.agents.runs.stream(
+                thread_id=self.thread_id, agent_id=self.agent_id, event_handler=handler
+            ) as stream:
+                await stream.until_done()
+        if handler.error:
+            print(f"\nRun failed: {handler.error}\n")
+            return None
+        print("\n")
+
+        reply = "".join(handler.parts) or await self.latest_reply(handler.run_id)
+        await self._record(content, reply)
+        return reply
+
+    async def remember(self, content: str, reply: str):
+        """
+        Add a turn answered without a run (a cached reply) to the thread,
+        so follow-up questions still have it as context.
+        """
+        with measure("agent.message_create"):
+            await self.agents.messages.create(thread_id=self.thread_id, role="user", content=content)
+            await self.agents.messages.create(thread_id=self.thread_id, role="assistant", content=reply)
+        await self._record(content, reply)
+
+    async def _record(self, content: str, reply: str):
+        self.window.record(content, reply)
+        if self.window.should_compact():
+            await self.compact()
+        self.save()
+
+    async def latest_reply(self, run_id: str) -> str:
+        """Fetch only the newest message written by run_id, not the whole thread."""
+        if run_id is None:
+            return ""
+        with measure("agent.message_list"):
+            async for message in self.agents.messages.list(
+                thread_id=self.thread_id, run_id=run_id, limit=1, order=ListSortOrder.DESCENDING
+            ):
+                return "\n".join(m.text.value for m in message.text_messages)
+        return ""
+
+    async def compact(self):
+        """Move to a new thread holding a summary of older turns plus the most recent ones."""
+        with measure("agent.compact"):
+            await self._compact()
+
+    async def _compact(self):
+        self.window.compact()
+        thread = await self.agents.threads.create(messages=[
+            ThreadMessageOptions(role=role, content=text)
+            for role, text in self.window.compact_messages()
+        ])
+        old_thread_id, self.thread_id = self.thread_id, thread.id
+        try:
+            await self.agents.threads.delete(old_thread_id)
+        except ResourceNotFoundError:
+            pass
+
+    def save(self):
+        self.state.update(thread_id=self.thread_id, window=self.window.to_state())
+        save_state(self.state)
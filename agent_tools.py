@@ -0,0 +1,151 @@
+# agent_tools.py
+"""
+Agent-facing versions of the read tools in tools.py.
+
+The agent pays for every token a tool returns, so these wrappers encode
+pages as a header plus rows with no indentation, cap the page size, and
+describe whatever did not fit ("4,812 more: 120 urgent, ...") together
+with a cursor for the next page. Shortcuts keep calling tools.py
+directly and get the full output.
+"""
+
+from instrumentation import timed, timed_dumps
+from task_schema import TaskPage, sql_encoder
+from datetime import date
+
+from tools import (
+    LIST_FIELDS, SEARCH_FIELDS, closest_projects, due_source, fetch_fuzzy, fetch_projects, fetch_summary, fetch_tags,
+    list_source, overdue_source, query_page, search_source, today_source, upcoming_source, week_source, with_archive
+)
+
+# Rows per page when the agent gives no limit, and the most it may ask for
+AGENT_PAGE_SIZE = 25
+AGENT_MAX_PAGE_SIZE = 100
+
+
+def _dumps(value) -> str:
+    return timed_dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def _describe_rest(rest: dict) -> str:
+    """
+    Render remaining-row counts as 'and N more: 12 urgent, 40 high; 50 todo, 2 done',
+    or 'and at least N more; the next N: ...' when the count was capped.
+    """
+    by_priority = ", ".join(f"{n:,} {p}" for p, n in rest["priority"].items())
+    by_status = ", ".join(f"{n:,} {s}" for s, n in rest["status"].items())
+    if rest.get("capped"):
+        return f"and at least {rest['count']:,} more; the next {rest['count']:,}: {by_priority}; {by_status}"
+    return f"and {rest['count']:,} more: {by_priority}; {by_status}"
+
+
+def encode_page(page: TaskPage) -> str:
+    """Encode a query_page() result as {"columns", "rows", "more", "next_cursor"}."""
+    columns = list(page.fields) if page.tasks else []
+    encode = sql_encoder(page.fields)
+    encoded = {"columns": columns, "rows": [encode(t) for t in page.tasks]}
+    if page.next_cursor:
+        if page.rest is not None:
+            encoded["more"] = _describe_rest(page.rest)
+        encoded["next_cursor"] = page.next_cursor
+    return _dumps(encoded)
+
+
+def _agent_limit(limit) -> int:
+    return AGENT_PAGE_SIZE if limit is None else max(1, min(int(limit), AGENT_MAX_PAGE_SIZE))
+
+
+def _agent_page(kind: str, source, default_fields: tuple, limit, cursor, fields) -> str:
+    limit = _agent_limit(limit)
+    try:
+        if callable(source):
+            kind, source = source(kind)
+        page = query_page(kind, source, default_fields, limit, cursor, fields, summarize_rest=True)
+    except ValueError as e:
+        return _dumps({"status": "error", "message": str(e)})
+    return encode_page(page)
+
+
+@timed
+def list_tasks(project: str = None, status: str = None, priority: str = None,
+               limit: int = None, cursor: str = None, fields: str = None,
+               tags: str = None, match: str = "all", include_archived: bool = False) -> str:
+    """List tasks, optionally filtered by project, status, priority and/or comma-separated tags (tasks with all of them, or any with match="any"). Returns columns and rows, most urgent first; when more rows match, "more" summarizes them and next_cursor fetches the next page. fields is a comma-separated list of columns to return. Tasks done long ago are archived; set include_archived to list them too. An unknown project returns did_you_mean with similarly spelled ones."""
+    if project and not cursor:
+        suggestions = closest_projects(project, include_archived=include_archived)
+        if suggestions and project not in suggestions:
+            return _dumps({"columns": [], "rows": [], "did_you_mean": suggestions})
+    return _agent_page("list", lambda kind: with_archive(
+        kind, lambda schema: list_source(project, status, priority, tags, match, schema), include_archived
+    ), LIST_FIELDS, limit, cursor, fields)
+
+
+@timed
+def search_tasks(query: str, limit: int = None, cursor: str = None, fields: str = None,
+                 fuzzy: bool = False, include_archived: bool = False) -> str:
+    """Search tasks by text in title, description or tags ("quoted" for exact phrases), best matches first. Returns columns and rows; "more" and next_cursor describe and page through further matches. If nothing is found, retry with fuzzy=true to match titles despite typos, or with include_archived=true to search tasks done long ago."""
+    if fuzzy:
+        try:
+            return encode_page(fetch_fuzzy(query, _agent_limit(limit), cursor, fields))
+        except ValueError as e:
+            return _dumps({"status": "error", "message": str(e)})
+    return _agent_page("search", lambda kind: with_archive(
+        kind, lambda schema: search_source(query, schema), include_archived
+    ), SEARCH_FIELDS, limit, cursor, fields)
+
+
+@timed
+def get_tasks_due_today(limit: int = None, cursor: str = None, fields: str = None) -> str:
+    """Get all tasks due today that are not done. Returns columns and rows; "more" and next_cursor describe and page through the rest."""
+    return _agent_page("today", today_source(), LIST_FIELDS, limit, cursor, fields)
+
+
+@timed
+def get_overdue_tasks(limit: int = None, cursor: str = None, fields: str = None) -> str:
+    """Get open tasks whose due date has passed, oldest first. Returns columns and rows; "more" and next_cursor describe and page through the rest."""
+    return _agent_page("due", overdue_source(), LIST_FIELDS, limit, cursor, fields)
+
+
+@timed
+def get_tasks_due_this_week(limit: int = None, cursor: str = None, fields: str = None) -> str:
+    """Get open tasks due from today through Sunday, soonest first. Returns columns and rows; "more" and next_cursor describe and page through the rest."""
+    return _agent_page("due", week_source(), LIST_FIELDS, limit, cursor, fields)
+
+
+@timed
+def get_upcoming_tasks(days: int = 7, limit: int = None, cursor: str = None, fields: str = None) -> str:
+    """Get open tasks due in the next N days (including today), soonest first. Returns columns and rows; "more" and next_cursor describe and page through the rest."""
+    return _agent_page("due", upcoming_source(days), LIST_FIELDS, limit, cursor, fields)
+
+
+@timed
+def get_tasks_due_between(start_date: str = None, end_date: str = None, limit: int = None,
+                          cursor: str = None, fields: str = None) -> str:
+    """Get open tasks due between start_date and end_date inclusive (YYYY-MM-DD; either may be omitted), soonest first. Use this instead of listing everything and filtering dates. Returns columns and rows; "more" and next_cursor page through the rest."""
+    try:
+        start = date.fromisoformat(start_date) if start_date else None
+        end = date.fromisoformat(end_date) if end_date else None
+    except ValueError:
+        return _dumps({"status": "error", "message": "start_date and end_date must be YYYY-MM-DD"})
+    return _agent_page("due", due_source(start, end), LIST_FIELDS, limit, cursor, fields)
+
+
+@timed
+def get_summary(include_archived: bool = False) -> str:
+    """Get a summary of tasks across all projects. include_archived counts archived tasks as done."""
+    return _dumps(fetch_summary(include_archived))
+
+
+@timed
+def get_projects(include_archived: bool = False) -> str:
+    """Get a list of all unique projects with task counts. include_archived counts archived tasks as completed."""
+    return _dumps({
+        "columns": ["name", "total_tasks", "completed"],
+        "rows": [[p.name, p.total_tasks, p.completed] for p in fetch_projects(include_archived)],
+    })
+
+
+@timed
+def get_tags() -> str:
+    """Get every tag in use, with how many tasks carry it."""
+    return _dumps({"columns": ["tag", "tasks"], "rows": fetch_tags()})
@@ -0,0 +1,11 @@
+# benchmarks/__init__.py
+"""
+Performance benchmarks for the task manager.
+
+    python -m benchmarks.run --sizes 10k,100k      # time everything, write JSON
+    python -m benchmarks.compare old.json new.json # flag regressions
+
+Datasets are generated deterministically (see generator.py) and cached in
+benchmarks/.data; agent turns run against fake_agents.FakeAgentsClient so
+no Azure project is needed.
+"""
@@ -0,0 +1,118 @@
+# benchmarks/compare.py
+"""
+Compare two benchmark result files.
+
+    python -m benchmarks.compare baseline.json current.json
+
+A case regresses when its median grows by more than max_slowdown (a
+fraction) AND by more than min_delta_ms, so sub-millisecond noise on
+fast cases does not fail a run. Limits come from thresholds.json: the
+"default" entry, overridden by the first glob in "overrides" that
+matches the case name. Exits with status 1 on any regression or on a
+case that raised.
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import sys
+
+DEFAULT_THRESHOLDS = os.path.join(os.path.dirname(__file__), "thresholds.json")
+FALLBACK_THRESHOLDS = {"metric": "median_ms", "default": {"max_slowdown": 0.25, "min_delta_ms": 0.5}}
+
+
+def load_thresholds(path: str = DEFAULT_THRESHOLDS) -> dict:
+    if not path or not os.path.exists(path):
+        return FALLBACK_THRESHOLDS
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def limits_for(name: str, thresholds: dict) -> dict:
+    limits = dict(thresholds["default"])
+    for pattern, override in thresholds.get("overrides", {}).items():
+        if fnmatch.fnmatchcase(name, pattern):
+            limits.update(override)
+            break
+    return limits
+
+
+def compare(baseline: dict, current: dict, thresholds: dict) -> list:
+    """One row per (size, case) present in either report, with a status."""
+    metric = thresholds.get("metric", "median_ms")
+    rows = []
+    for size, data in current["sizes"].items():
+        old_results = baseline.get("sizes", {}).get(size, {}).get("results", {})
+        new_results = data["results"]
+        for name in sorted(set(old_results) | set(new_results)):
+            old = old_results.get(name, {}).get(metric)
+            new = new_results.get(name, {}).get(metric)
+            row = {"size": size, "name": name, "old": old, "new": new, "change": None}
+            if "error" in new_results.get(name, {}):
+                row["status"] = "error"
+            elif old is None:
+                row["status"] = "new"
+            elif new is None:
+                row["status"] = "missing"
+            else:
+                limits = limits_for(name, thresholds)
+                row["change"] = (new - old) / old if old else 0.0
+                if new - old > limits["min_delta_ms"] and row["change"] > limits["max_slowdown"]:
+                    row["status"] = "regressed"
+                elif old - new > limits["min_delta_ms"] and -row["change"] > limits["max_slowdown"]:
+                    row["status"] = "improved"
+                else:
+                    row["status"] = "ok"
+            rows.append(row)
+    return rows
+
+
+def failed(rows: list) -> bool:
+    return any(r["status"] in ("regressed", "error") for r in rows)
+
+
+def _ms(value) -> str:
+    return "-" if value is None else f"{value:.3f}"
+
+
+def format_report(report: dict) -> str:
+    lines = []
+    for size, data in report["sizes"].items():
+        lines.append(f"\n{size} ({data['tasks']:,} tasks)      median ms      p95 ms")
+        for name, stats in data["results"].items():
+            if "error" in stats:
+                lines.append(f"  {name:<40} {stats['error']}")
+            else:
+                lines.append(f"  {name:<40} {stats['median_ms']:>10.3f}  {stats['p95_ms']:>10.3f}")
+    return "\n".join(lines)
+
+
+def format_comparison(rows: list) -> str:
+    lines = [f"\n{'size':<6} {'case':<40} {'old':>10} {'new':>10} {'change':>8}  status"]
+    for r in rows:
+        change = "-" if r["change"] is None else f"{r['change']:+.0%}"
+        lines.append(f"{r['size']:<6} {r['name']:<40} {_ms(r['old']):>10} {_ms(r['new']):>10} {change:>8}  {r['status']}")
+    regressed = sum(r["status"] == "regressed" for r in rows)
+    errors = sum(r["status"] == "error" for r in rows)
+    lines.append(f"\n{regressed} regression(s), {errors} error(s)" if regressed or errors else "\nNo regressions.")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--thresholds", default=DEFAULT_THRESHOLDS)
+    args = parser.parse_args(argv)
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)
+    rows = compare(baseline, current, load_thresholds(args.thresholds))
+    print(format_comparison(rows))
+    return 1 if failed(rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
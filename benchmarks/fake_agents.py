@@ -0,0 +1,196 @@
+# benchmarks/fake_agents.py
+"""
+Local stand-in for AIProjectClient(...).agents.
+
+Implements the subset of the async agents API that agent_session.py
+uses (agents, threads, messages and streamed runs) in memory. A scripted
+"model" picks one tool call from keywords in the prompt, then streams a
+short reply, so a full turn exercises message posting, tool dispatch on
+the worker pool, output submission and delta printing without a network.
+Set latency to add a fixed delay per request.
+"""
+
+import asyncio
+import itertools
+import json
+from types import SimpleNamespace
+from typing import Optional
+
+try:
+    from azure.core.exceptions import ResourceNotFoundError
+except ImportError:  # the fake also runs without the Azure SDK installed
+    class ResourceNotFoundError(LookupError):
+        pass
+
+REPLY_CHUNK = 8
+
+
+def route(prompt: str) -> list:
+    """Pick the [(tool name, arguments), ...] a model would plausibly call in one step for prompt."""
+    text = prompt.lower()
+    if "overview" in text:
+        return [("get_summary", {}), ("get_tasks_due_today", {}), ("list_tasks", {"priority": "urgent"})]
+    if "summary" in text:
+        return [("get_summary", {})]
+    if "project" in text and "list" not in text:
+        return [("get_projects", {})]
+    if "today" in text:
+        return [("get_tasks_due_today", {})]
+    if "search" in text or "find" in text:
+        return [("search_tasks", {"query": prompt.split()[-1]})]
+    if "urgent" in text:
+        return [("list_tasks", {"priority": "urgent"})]
+    return [("list_tasks", {})]
+
+
+def _message(role: str, content: str, run_id: str = None):
+    return SimpleNamespace(
+        role=role, content=content, run_id=run_id,
+        text_messages=[SimpleNamespace(text=SimpleNamespace(value=content))],
+    )
+
+
+class _Stream:
+    """What runs.stream() returns: drives the handler through queued events."""
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.events = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def until_done(self):
+        while self.events:
+            kind, payload = self.events.pop(0)
+            if kind == "run":
+                await self.handler.on_thread_run(payload)
+            else:
+                await self.handler.on_message_delta(payload)
+
+
+class _Namespace:
+    def __init__(self, client: "FakeAgentsClient"):
+        self._client = client
+
+
+class _Threads(_Namespace):
+    async def create(self, messages=None, **kwargs):
+        await self._client._delay()
+        thread_id = self._client._new_id("thread")
+        self._client.threads_data[thread_id] = [
+            _message(m["role"], m["content"]) for m in messages or []
+        ]
+        return SimpleNamespace(id=thread_id)
+
+    async def get(self, thread_id: str, **kwargs):
+        await self._client._delay()
+        self._client._thread(thread_id)
+        return SimpleNamespace(id=thread_id)
+
+    async def delete(self, thread_id: str, **kwargs):
+        await self._client._delay()
+        self._client._thread(thread_id)
+        del self._client.threads_data[thread_id]
+
+
+class _Messages(_Namespace):
+    async def create(self, thread_id: str, role: str, content: str, **kwargs):
+        await self._client._delay()
+        message = _message(role, content)
+        self._client._thread(thread_id).append(message)
+        return message
+
+    async def list(self, thread_id: str, run_id: str = None, limit: int = None, order: str = "desc", **kwargs):
+        await self._client._delay()
+        messages = [m for m in self._client._thread(thread_id) if run_id is None or m.run_id == run_id]
+        if str(getattr(order, "value", order)) == "desc":
+            messages.reverse()
+        for message in messages[:limit]:
+            yield message
+
+
+class _Runs(_Namespace):
+    async def stream(self, thread_id: str, agent_id: str, event_handler, **kwargs):
+        await self._client._delay()
+        self._client._agent(agent_id)
+        prompt = next(m.content for m in reversed(self._client._thread(thread_id)) if m.role == "user")
+        run = SimpleNamespace(
+            id=self._client._new_id("run"), thread_id=thread_id, status="requires_action",
+            last_error=None,
+            required_action=SimpleNamespace(submit_tool_outputs=SimpleNamespace(tool_calls=[
+                SimpleNamespace(id=self._client._new_id("call"),
+                                function=SimpleNamespace(name=name, arguments=json.dumps(arguments)))
+                for name, arguments in route(prompt)
+            ])),
+        )
+        stream = _Stream(event_handler)
+        stream.events.append(("run", run))
+        self._client.streams[run.id] = stream
+        return stream
+
+    async def submit_tool_outputs_stream(self, thread_id: str, run_id: str, tool_outputs: list,
+                                         event_handler, **kwargs):
+        await self._client._delay()
+        stream = self._client.streams.pop(run_id)
+        self._client.tool_outputs.extend(tool_outputs)
+        size = sum(len(o["output"]) for o in tool_outputs)
+        reply = f"Here is what I found ({size:,} characters of tool output)."
+        self._client._thread(thread_id).append(_message("assistant", reply, run_id))
+        for start in range(0, len(reply), REPLY_CHUNK):
+            stream.events.append(("delta", SimpleNamespace(text=reply[start:start + REPLY_CHUNK])))
+        stream.events.append(("run", SimpleNamespace(
+            id=run_id, thread_id=thread_id, status="completed", last_error=None, required_action=None
+        )))
+
+
+class FakeAgentsClient:
+    """In-memory replacement for the .agents attribute of an AIProjectClient."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.agents_data = {}
+        self.threads_data = {}
+        self.streams = {}
+        self.tool_outputs = []
+        self._ids = itertools.count(1)
+        self.threads = _Threads(self)
+        self.messages = _Messages(self)
+        self.runs = _Runs(self)
+
+    async def _delay(self):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    def _new_id(self, prefix: str) -> str:
+        return f"{prefix}_{next(self._ids):06d}"
+
+    def _thread(self, thread_id: str) -> list:
+        if thread_id not in self.threads_data:
+            raise ResourceNotFoundError(f"thread {thread_id} not found")
+        return self.threads_data[thread_id]
+
+    def _agent(self, agent_id: str) -> dict:
+        if agent_id not in self.agents_data:
+            raise ResourceNotFoundError(f"agent {agent_id} not found")
+        return self.agents_data[agent_id]
+
+    async def create_agent(self, model: str, name: str = None, instructions: str = None,
+                           tools: Optional[list] = None, **kwargs):
+        await self._delay()
+        agent_id = self._new_id("asst")
+        self.agents_data[agent_id] = {"model": model, "name": name, "instructions": instructions, "tools": tools}
+        return SimpleNamespace(id=agent_id)
+
+    async def get_agent(self, agent_id: str, **kwargs):
+        await self._delay()
+        self._agent(agent_id)
+        return SimpleNamespace(id=agent_id)
+
+    async def delete_agent(self, agent_id: str, **kwargs):
+        await self._delay()
+        self._agent(agent_id)
+        del self.agents_data[agent_id]
@@ -0,0 +1,132 @@
+# benchmarks/generator.py
+"""
+Seeded synthetic task data.
+
+The same (count, seed, today) always produces the same tasks, so timings
+taken on different commits are measured against identical databases.
+Distributions are skewed the way real task lists are: a few large
+projects and a long tail of small ones, most work todo or done, few
+urgent tasks, and due dates clustered around the near future.
+"""
+
+import os
+import random
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Iterator
+
+import tools
+from task_schema import Task
+
+DEFAULT_SEED = 42
+DATA_DIR = os.path.join(os.path.dirname(__file__), ".data")
+BUILD_CHUNK_SIZE = 20000
+
+PROJECTS = [
+    "AgriTech DB", "Afrinomad", "Senegal Startups", "work", "personal", "grocery",
+    "client-project", "website", "mobile app", "infra", "hiring", "finance",
+    "marketing", "research", "support", "docs", "data platform", "billing",
+    "onboarding", "security", "design system", "analytics", "partnerships",
+    "events", "legal", "ops", "sales", "community", "travel", "home",
+    "garden", "reading", "fitness", "side project", "newsletter", "podcast",
+    "api", "search", "payments", "compliance",
+]
+# Zipf-like weights: the first projects hold most of the tasks
+PROJECT_WEIGHTS = [1 / (rank + 1) ** 1.1 for rank in range(len(PROJECTS))]
+
+STATUS_WEIGHTS = {"todo": 45, "in_progress": 20, "blocked": 5, "done": 30}
+PRIORITY_WEIGHTS = {"urgent": 5, "high": 20, "normal": 55, "low": 20}
+NO_DUE_DATE = 0.35
+
+VERBS = ["Fix", "Write", "Review", "Deploy", "Plan", "Update", "Call", "Draft",
+         "Test", "Refactor", "Prepare", "Schedule", "Research", "Clean up", "Migrate"]
+ADJECTIVES = ["critical", "monthly", "new", "legacy", "quarterly", "urgent", "shared",
+              "internal", "customer", "weekly", "draft", "final"]
+NOUNS = ["bug", "report", "release notes", "meeting", "invoice", "dashboard", "backup",
+         "proposal", "schema", "onboarding guide", "budget", "roadmap", "hotfix",
+         "newsletter", "contract", "test suite", "landing page", "API docs"]
+TAGS = ["backend", "frontend", "blocked-external", "quick-win", "q3", "q4", "review",
+        "customer", "infra", "writing"]
+
+
+def task_id(index: int, seed: int) -> str:
+    """Unique 8-hex-digit ID: multiplying by an odd constant is a bijection mod 2**32."""
+    return format((index * 2654435761 + seed * 40503) % 2 ** 32, "08x")
+
+
+def generate_tasks(count: int, seed: int = DEFAULT_SEED, today: date = None) -> Iterator[Task]:
+    """Yield count reproducible Task objects."""
+    rng = random.Random(seed)
+    today = today or date.today()
+    statuses, status_weights = zip(*STATUS_WEIGHTS.items())
+    priorities, priority_weights = zip(*PRIORITY_WEIGHTS.items())
+    for index in range(count):
+        status = rng.choices(statuses, status_weights)[0]
+        due_date = None
+        if rng.random() >= NO_DUE_DATE:
+            if status == "done":
+                offset = -rng.randint(0, 120)
+            else:
+                offset = max(-60, min(120, round(rng.gauss(10, 20))))
+            due_date = today + timedelta(days=offset)
+        noun = rng.choice(NOUNS)
+        description = ""
+        if rng.random() < 0.5:
+            description = f"{rng.choice(VERBS)} the {rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} before the {noun} ships"
+        yield Task(
+            id=task_id(index, seed),
+            title=f"{rng.choice(VERBS)} {rng.choice(ADJECTIVES)} {noun}",
+            project=rng.choices(PROJECTS, PROJECT_WEIGHTS)[0],
+            status=status,
+            priority=rng.choices(priorities, priority_weights)[0],
+            due_date=due_date,
+            description=description,
+            tags=rng.sample(TAGS, rng.choice((0, 0, 0, 1, 2))),
+            created_at=datetime.combine(today - timedelta(days=rng.randint(0, 365)), datetime.min.time()),
+        )
+
+
+@contextmanager
+def using_database(path: str):
+    """Point tools.py at path for the duration of the block."""
+    previous = tools.DB_PATH
+    tools.close_db()
+    tools.DB_PATH = path
+    try:
+        tools.init_db()
+        yield path
+    finally:
+        tools.close_db()
+        tools.DB_PATH = previous
+
+
+def build_database(path: str, count: int, seed: int = DEFAULT_SEED, today: date = None) -> str:
+    """Create a database at path holding generate_tasks(count, seed, today)."""
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    with using_database(path):
+        batch = []
+        for task in generate_tasks(count, seed, today):
+            batch.append(task)
+            if len(batch) == BUILD_CHUNK_SIZE:
+                tools.insert_tasks(batch)
+                batch = []
+        if batch:
+            tools.insert_tasks(batch)
+        tools.get_connection().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    return path
+
+
+def dataset(count: int, seed: int = DEFAULT_SEED, rebuild: bool = False) -> str:
+    """
+    Path of the cached dataset for (count, seed, today), building it if needed.
+
+    Due dates are relative to today, so a new dataset is built each day.
+    """
+    os.makedirs(DATA_DIR, exist_ok=True)
+    today = date.today()
+    path = os.path.join(DATA_DIR, f"tasks-{count}-s{seed}-{today.isoformat()}.db")
+    if rebuild or not os.path.exists(path):
+        build_database(path, count, seed, today)
+    return path
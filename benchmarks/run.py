@@ -0,0 +1,320 @@
+# benchmarks/run.py
+"""
+Time tools.py, the shortcut formatters, process_shortcut and agent turns.
+
+    python -m benchmarks.run                         # 10k and 100k tasks
+    python -m benchmarks.run --sizes 1m --repeat 50
+    python -m benchmarks.run --compare benchmarks/results/<baseline>.json
+
+Each size runs on a scratch copy of the cached dataset, so write
+benchmarks never change the data the next run starts from. Results are
+written as JSON (median, p95, min and mean in milliseconds per case);
+with --compare the run fails when a case regresses past
+benchmarks/thresholds.json.
+"""
+
+import argparse
+import asyncio
+import io
+import itertools
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AsyncExitStack, redirect_stdout
+from datetime import datetime
+
+import tools
+import shortcuts
+from cache import result_cache
+from response_cache import response_cache
+from benchmarks import compare
+from benchmarks.fake_agents import FakeAgentsClient
+from benchmarks.generator import DEFAULT_SEED, PROJECTS, dataset, using_database
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+DEFAULT_SIZES = "10k,100k"
+DEFAULT_REPEAT = 20
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+BIG_PROJECT = PROJECTS[0]
+SMALL_PROJECT = PROJECTS[-1]
+
+
+def summarize(samples: list) -> dict:
+    """Milliseconds statistics for a list of durations in seconds."""
+    ms = sorted(s * 1000 for s in samples)
+    return {
+        "runs": len(ms),
+        "median_ms": round(statistics.median(ms), 4),
+        "p95_ms": round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 4),
+        "min_ms": round(ms[0], 4),
+        "mean_ms": round(statistics.fmean(ms), 4),
+    }
+
+
+class Bench:
+    """Collects timings for one dataset size."""
+
+    def __init__(self, repeat: int, only: str = None):
+        self.repeat = repeat
+        self.only = only
+        self.results = {}
+
+    def wanted(self, name: str) -> bool:
+        return self.only is None or self.only in name
+
+    def time(self, name: str, run, setup=None, repeat: int = None, warmup: int = 1):
+        """
+        Time run() (or run(setup()) when setup is given; setup is not timed).
+
+        A case that raises is recorded as {"error": ...} and the run goes on.
+        """
+        if not self.wanted(name):
+            return
+        samples = []
+        try:
+            for i in range(warmup + (repeat or self.repeat)):
+                arg = setup() if setup else None
+                start = time.perf_counter()
+                run(arg) if setup else run()
+                elapsed = time.perf_counter() - start
+                if i >= warmup:
+                    samples.append(elapsed)
+        except Exception as e:
+            self.results[name] = {"error": f"{type(e).__name__}: {e}"}
+            return
+        self.results[name] = summarize(samples)
+
+    async def time_async(self, name: str, run, repeat: int = None, warmup: int = 1):
+        if not self.wanted(name):
+            return
+        samples = []
+        try:
+            for i in range(warmup + (repeat or self.repeat)):
+                start = time.perf_counter()
+                await run()
+                elapsed = time.perf_counter() - start
+                if i >= warmup:
+                    samples.append(elapsed)
+        except Exception as e:
+            self.results[name] = {"error": f"{type(e).__name__}: {e}"}
+            return
+        self.results[name] = summarize(samples)
+
+
+def sample_ids(count: int) -> list:
+    rows = tools.get_connection().execute(
+        "SELECT id FROM tasks WHERE rowid % 97 = 0 LIMIT ?", (count,)
+    ).fetchall()
+    return [r[0] for r in rows]
+
+
+def bench_tools(bench: Bench):
+    bench.time("tools.init_db", tools.init_db)
+    bench.time("tools.connect", lambda: (tools.close_db(), tools.get_connection()))
+
+    bench.time("tools.list_tasks[page]", lambda: tools.list_tasks(limit=50))
+    bench.time("tools.list_tasks[big_project]", lambda: tools.list_tasks(project=BIG_PROJECT, limit=50))
+    bench.time("tools.list_tasks[project_status]",
+               lambda: tools.list_tasks(project=BIG_PROJECT, status="todo", limit=50))
+    bench.time("tools.list_tasks[urgent]", lambda: tools.list_tasks(priority="urgent", limit=50))
+    bench.time("tools.list_tasks[small_project_all]", lambda: tools.list_tasks(project=SMALL_PROJECT))
+    page = json.loads(tools.list_tasks(limit=50))
+    bench.time("tools.list_tasks[next_page]", lambda: tools.list_tasks(limit=50, cursor=page["next_cursor"]))
+    bench.time("tools.search_tasks[word]", lambda: tools.search_tasks("report", limit=50))
+    bench.time("tools.search_tasks[phrase]", lambda: tools.search_tasks('"release notes"', limit=50))
+    bench.time("tools.search_tasks[fuzzy]", lambda: tools.search_tasks("reveiw contrct", limit=50, fuzzy=True))
+    bench.time("tools.find_duplicates", lambda: tools.find_duplicates("Reveiw draft contract", BIG_PROJECT))
+    bench.time("tools.list_tasks[tag]", lambda: tools.list_tasks(tags="backend", limit=50))
+    bench.time("tools.list_tasks[tags_all]", lambda: tools.list_tasks(tags="backend,quick-win", limit=50))
+    bench.time("tools.list_tasks[tags_any]", lambda: tools.list_tasks(tags="q3,q4", match="any", limit=50))
+    bench.time("tools.get_tags", tools.get_tags)
+    bench.time("tools.get_tasks_due_today", tools.get_tasks_due_today)
+    bench.time("tools.get_overdue_tasks[page]", lambda: tools.get_overdue_tasks(limit=50))
+    bench.time("tools.get_upcoming_tasks[page]", lambda: tools.get_upcoming_tasks(14, limit=50))
+    bench.time("tools.get_summary", tools.get_summary)
+    bench.time("tools.get_projects", tools.get_projects)
+    bench.time("tools.fetch_tasks[page]", lambda: tools.fetch_tasks(limit=50))
+    bench.time("tools.fetch_tasks[urgent_all]", lambda: tools.fetch_tasks(priority="urgent"), repeat=5)
+    bench.time("tools.list_tasks[urgent_all]", lambda: tools.list_tasks(priority="urgent"), repeat=5)
+
+    ids = sample_ids(200)
+    cycle = {"i": 0}
+
+    def next_update():
+        cycle["i"] += 1
+        return ids[cycle["i"] % len(ids)], ("todo", "in_progress")[cycle["i"] % 2]
+
+    bench.time("tools.add_task", lambda: tools.add_task("Benchmark task", SMALL_PROJECT, "high", "2030-01-01"))
+    bench.time("tools.update_task", lambda arg: tools.update_task(arg[0], status=arg[1]), setup=next_update)
+    bench.time("tools.delete_task", lambda task_id: tools.delete_task(task_id),
+               setup=lambda: json.loads(tools.add_task("Doomed task", SMALL_PROJECT))["task_id"])
+    batch = [{"title": f"Batch task {i}", "project": SMALL_PROJECT, "priority": "low"} for i in range(100)]
+    bench.time("tools.add_tasks[100]", lambda: tools.add_tasks(batch))
+    updates = [{"task_id": task_id, "status": "in_progress"} for task_id in ids[:100]]
+    bench.time("tools.update_tasks[100]", lambda: tools.update_tasks(updates))
+    bench.time("tools.rebuild_counters", tools.rebuild_counters, repeat=3)
+
+
+# Lines per page for the pager cases, a tall terminal
+PAGER_SIZE = 50
+
+
+def bench_formatters(bench: Bench):
+    projects = tools.fetch_projects()
+    summary = tools.fetch_summary()
+    page = tools.fetch_tasks(limit=50)
+    urgent = tools.fetch_tasks(priority="urgent")
+    pager = shortcuts.Pager()
+
+    def page_through(tasks: list):
+        # Every page of a listing, as /next would show them
+        pager.open(shortcuts.task_lines(tasks), unit="task", size=PAGER_SIZE)
+        for _ in range((len(tasks) - 1) // PAGER_SIZE):
+            pager.next()
+
+    bench.time("format.pager[projects]",
+               lambda: pager.open(shortcuts.project_lines(projects), heading="Projects", size=PAGER_SIZE))
+    bench.time("format.pager[summary]",
+               lambda: pager.open(shortcuts.summary_lines(summary), heading="Summary", size=PAGER_SIZE))
+    bench.time("format.pager[tasks_page]", lambda: page_through(page.tasks))
+    bench.time("format.pager[urgent_all]", lambda: page_through(urgent.tasks), repeat=5)
+    bench.time("format.format_cache_stats", lambda: shortcuts.format_cache_stats(result_cache.stats(), response_cache.stats()))
+    bench.time("format.show_help", shortcuts.show_help)
+
+
+def bench_shortcuts(bench: Bench):
+    for command in ("/projects", "/summary", "/urgent", "/today", "/overdue", "/search report", "/cache", "/help"):
+        bench.time(f"shortcut.{command}[cold]", lambda _, c=command: shortcuts.process_shortcut(c),
+                   setup=result_cache.clear, repeat=5 if command == "/urgent" else None)
+        bench.time(f"shortcut.{command}[warm]", lambda c=command: shortcuts.process_shortcut(c))
+
+    bench.time("shortcut./list[small_project]", lambda: shortcuts.process_shortcut(f"/list {SMALL_PROJECT}"))
+    bench.time("shortcut./add[local]",
+               lambda: shortcuts.process_shortcut(f"/add Draft budget for {SMALL_PROJECT} urgent due fri"))
+    ids = itertools.cycle(sample_ids(100))
+    bench.time("shortcut./done[local]", lambda task_id: shortcuts.process_shortcut(f"/done {task_id}"),
+               setup=lambda: next(ids))
+    bench.time("shortcut./delete[local]", lambda task_id: shortcuts.process_shortcut(f"/delete {task_id}"),
+               setup=lambda: json.loads(tools.add_task("Doomed task", SMALL_PROJECT))["task_id"])
+    bench.time("shortcut.passthrough", lambda: shortcuts.process_shortcut("show me blocked tasks"))
+
+
+def bench_agent_turns(bench: Bench, scratch_dir: str) -> str:
+    """Time AgentSession.run_turn against FakeAgentsClient; returns a skip reason or None."""
+    try:
+        import agent_session
+    except ImportError as e:
+        return f"agent turns skipped: {e}"
+
+    agent_session.STATE_PATH = os.path.join(scratch_dir, "agent_state.json")
+
+    async def run_turns():
+        agents = FakeAgentsClient()
+        agent = await agents.create_agent(model=agent_session.MODEL, name=agent_session.AGENT_NAME)
+        thread = await agents.threads.create()
+        state = {"agent_id": agent.id, "thread_id": thread.id}
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            session = agent_session.AgentSession(agents, state, executor, AsyncExitStack())
+            with redirect_stdout(io.StringIO()):
+                for name, prompt in (("summary", "Give me a summary"),
+                                     ("list_urgent", "List urgent tasks"),
+                                     ("search", "Find report"),
+                                     ("due_today", "What is due today?"),
+                                     ("three_tools", "Give me an overview")):
+                    await bench.time_async(f"agent.turn[{name}]", lambda p=prompt: session.run_turn(p))
+
+    asyncio.run(run_turns())
+    return None
+
+
+def run_size(label: str, count: int, seed: int, repeat: int, only: str = None) -> dict:
+    """Run every benchmark against a scratch copy of the dataset for count tasks."""
+    source = dataset(count, seed)
+    bench = Bench(repeat, only)
+    notes = []
+    with tempfile.TemporaryDirectory(prefix="task-bench-") as scratch_dir:
+        path = os.path.join(scratch_dir, "tasks.db")
+        shutil.copyfile(source, path)
+        with using_database(path):
+            result_cache.clear()
+            bench_tools(bench)
+            bench_formatters(bench)
+            bench_shortcuts(bench)
+            skipped = bench_agent_turns(bench, scratch_dir)
+            if skipped:
+                notes.append(skipped)
+    return {"tasks": count, "notes": notes, "results": bench.results}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"comma-separated, from {', '.join(SIZES)}")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="timed runs per case")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--only", help="run only cases whose name contains this text")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", metavar="BASELINE", help="fail if slower than this results file")
+    parser.add_argument("--thresholds", default=compare.DEFAULT_THRESHOLDS)
+    args = parser.parse_args(argv)
+
+    sizes = [s.strip().lower() for s in args.sizes.split(",") if s.strip()]
+    unknown = [s for s in sizes if s not in SIZES]
+    if unknown:
+        parser.error(f"unknown size(s): {', '.join(unknown)}")
+
+    commit = git_commit()
+    report = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "commit": commit,
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "sizes": {},
+    }
+    for label in sizes:
+        print(f"Running {label} ({SIZES[label]:,} tasks)...", file=sys.stderr)
+        report["sizes"][label] = run_size(label, SIZES[label], args.seed, args.repeat, args.only)
+        for note in report["sizes"][label]["notes"]:
+            print(f"  {note}", file=sys.stderr)
+
+    name = commit or datetime.now().strftime("%Y%m%d-%H%M%S")
+    output = args.output or os.path.join(RESULTS_DIR, f"{name}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {output}", file=sys.stderr)
+    print(compare.format_report(report))
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare.compare(baseline, report, compare.load_thresholds(args.thresholds))
+        print(compare.format_comparison(rows))
+        if compare.failed(rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
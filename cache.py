@@ -0,0 +1,90 @@
+# cache.py
+"""
+Invalidation-aware result cache sitting between shortcuts.py and tools.py.
+
+Entries remember the tools.data_version() token they were computed at and
+are only served while it is unchanged, so any write (from this process or
+another one sharing tasks.db) invalidates them precisely. Entries marked
+daily also expire when the date rolls over.
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Callable, Hashable
+
+from task_client import SERVER_URL
+if SERVER_URL:
+    from task_client import data_version
+else:
+    from tools import data_version
+
+DEFAULT_MAX_ENTRIES = 64
+
+
+class ResultCache:
+    """Bounded LRU cache of values keyed on (key, data version)."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, compute: Callable[[], Any], daily: bool = False) -> Any:
+        """Return the cached value for key, calling compute() if it is missing or stale."""
+        version = data_version()
+        if daily:
+            version += (date.today(),)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            if entry is not None:
+                self.invalidations += 1
+
+        value = compute()
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+result_cache = ResultCache()
+
+
+def cached_call(fn: Callable[..., Any], *args, daily: bool = False, **kwargs) -> Any:
+    """
+    Call a tools.py query through the cache, keyed on its name and arguments.
+
+    Typed results (TaskPage, ProjectStats lists) are shared between
+    callers, so treat them as read-only.
+    """
+    key = ("query", fn.__name__, args, tuple(sorted(kwargs.items())))
+    return result_cache.get(key, lambda: fn(*args, **kwargs), daily)
@@ -0,0 +1,77 @@
+# context_window.py
+"""
+Bounded conversation context for the agent thread.
+
+The agent thread only ever holds the last few turns plus a short summary
+of everything older. Once more than CONTEXT_MAX_TURNS turns have been
+recorded, the older ones are folded into the summary and the session
+moves to a fresh thread seeded with compact_messages(), so the prompt
+size (and with it per-turn latency and token cost) stays flat however
+long the session runs.
+"""
+
+import os
+import re
+from typing import List, Tuple
+
+# Turns kept on one thread before compacting
+CONTEXT_MAX_TURNS = int(os.environ.get("CONTEXT_MAX_TURNS", "12"))
+# Most recent turns carried over verbatim to the new thread
+CONTEXT_KEEP_TURNS = 4
+# Upper bound on the summary; the oldest lines are dropped first
+SUMMARY_MAX_CHARS = 2000
+USER_CLIP = 160
+REPLY_CLIP = 240
+
+
+def clip(text: str, limit: int) -> str:
+    """Collapse whitespace and cut text to at most limit characters."""
+    text = re.sub(r"\s+", " ", text or "").strip()
+    return text if len(text) <= limit else text[:limit - 1].rstrip() + "…"
+
+
+class ConversationWindow:
+    """Recent turns of the current thread and a summary of the ones before."""
+
+    def __init__(self, turns: List[Tuple[str, str]] = None, summary: str = "",
+                 max_turns: int = CONTEXT_MAX_TURNS, keep_turns: int = CONTEXT_KEEP_TURNS):
+        self.turns = [tuple(t) for t in turns or []]
+        self.summary = summary
+        self.max_turns = max_turns
+        self.keep_turns = min(keep_turns, max_turns)
+
+    def record(self, user: str, reply: str):
+        self.turns.append((user, reply))
+
+    def should_compact(self) -> bool:
+        return len(self.turns) > self.max_turns
+
+    def compact(self):
+        """Fold all but the last keep_turns turns into the summary."""
+        cut = len(self.turns) - self.keep_turns
+        older, self.turns = self.turns[:cut], self.turns[cut:]
+        lines = self.summary.splitlines() + [
+            f"- User: {clip(user, USER_CLIP)} | Agent: {clip(reply, REPLY_CLIP)}"
+            for user, reply in older
+        ]
+        while lines and len("\n".join(lines)) > SUMMARY_MAX_CHARS:
+            lines.pop(0)
+        self.summary = "\n".join(lines)
+
+    def compact_messages(self) -> List[Tuple[str, str]]:
+        """(role, content) pairs that seed a new thread: the summary, then the kept turns."""
+        messages = []
+        if self.summary:
+            messages.append(("user", "Summary of our earlier conversation, for context only:\n" + self.summary))
+        for user, reply in self.turns:
+            messages.append(("user", user))
+            messages.append(("assistant", reply))
+        return messages
+
+    def to_state(self) -> dict:
+        return {"summary": self.summary, "turns": [list(t) for t in self.turns]}
+
+    @classmethod
+    def from_state(cls, state: dict) -> "ConversationWindow":
+        state = state or {}
+        return cls(turns=state.get("turns"), summary=state.get("summary", ""))
@@ -0,0 +1,115 @@
+# fuzzy.py
+"""
+Trigram similarity for typo-tolerant matching.
+
+Text is compared as sets of word trigrams. Each word is padded with two
+spaces in front and one behind (as PostgreSQL's pg_trgm does), so
+"reveiw" still shares "  r", " re" and "rev" with "review".
+
+Near-duplicate detection never compares a title against every task:
+title_bands() condenses a title's trigrams into a few MinHash band keys,
+and two titles with Jaccard similarity 0.5 share at least one key 82% of
+the time (0.6: 93%, 0.8: over 99%), so tools.py looks candidates up by
+key in an index and only scores those.
+"""
+
+import hashlib
+import re
+import struct
+from difflib import SequenceMatcher
+from functools import lru_cache
+
+_WORD = re.compile(r"\w+")
+
+# MinHash layout: BANDS keys per title, each built from BAND_ROWS hashes.
+# More rows per band means fewer chance collisions but lower recall.
+BANDS = 6
+BAND_ROWS = 2
+_unpack_hashes = struct.Struct(f">{BANDS * BAND_ROWS}I").unpack
+
+
+@lru_cache(maxsize=4096)
+def trigrams(text: str) -> frozenset:
+    """The padded word trigrams of text, case-insensitively."""
+    grams = set()
+    for word in _WORD.findall(text.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+def similarity(a: str, b: str) -> float:
+    """Jaccard similarity of the trigram sets of a and b, from 0.0 to 1.0."""
+    x, y = trigrams(a), trigrams(b)
+    if not x or not y:
+        return 0.0
+    return len(x & y) / len(x | y)
+
+
+def word_similarity(query: str, text: str) -> float:
+    """Share of query's trigrams found in text: how well text contains query, typos allowed."""
+    x = trigrams(query)
+    if not x:
+        return 0.0
+    return len(x & trigrams(text)) / len(x)
+
+
+def closest(name: str, choices, limit: int = 3, threshold: float = 0.6) -> list:
+    """
+    The choices spelled most like name, best first: those scoring at least
+    threshold and within 0.2 of the best.
+
+    Meant for short lists such as project names. A short name has too few
+    trigrams for a swapped pair of letters ("wrok") to leave any in common,
+    so difflib's character-level ratio counts as well.
+    """
+    name = name.lower()
+    scored = [
+        (max(similarity(name, choice), SequenceMatcher(None, name, choice.lower()).ratio()), choice)
+        for choice in choices
+    ]
+    scored = sorted((s for s in scored if s[0] >= threshold), key=lambda s: -s[0])
+    return [choice for score, choice in scored[:limit] if score >= scored[0][0] - 0.2]
+
+
+@lru_cache(maxsize=None)
+def _gram_hashes(gram: str) -> tuple:
+    # One digest gives every MinHash function's 32-bit hash of the gram
+    return _unpack_hashes(hashlib.blake2b(gram.encode(), digest_size=4 * BANDS * BAND_ROWS).digest())
+
+
+@lru_cache(maxsize=1024)
+def _band_salts(project: str) -> tuple:
+    # Keys are salted per project and band, so a lookup only meets its own project
+    return tuple(
+        int.from_bytes(hashlib.blake2b(f"{project}\0{band}".encode(), digest_size=8).digest(), "big")
+        for band in range(BANDS)
+    )
+
+
+@lru_cache(maxsize=65536)
+def _word_mins(word: str) -> tuple:
+    # The minimum of a union is the minimum of the parts' minimums, so a
+    # title's MinHash is combined from per-word ones; titles share most
+    # of their words, and each word's trigrams are hashed only once.
+    padded = f"  {word} "
+    return tuple(map(min, zip(*(_gram_hashes(padded[i:i + 3]) for i in range(len(padded) - 2)))))
+
+
+@lru_cache(maxsize=4096)
+def title_bands(title: str, project: str) -> tuple:
+    """
+    MinHash band keys for a title within a project, as signed 64-bit
+    integers for SQLite; empty when the title has no words.
+    """
+    words = _WORD.findall(title.lower())
+    if not words:
+        return ()
+    mins = _word_mins(words[0]) if len(words) == 1 else tuple(map(min, zip(*map(_word_mins, words))))
+    keys = []
+    for band, salt in enumerate(_band_salts(project)):
+        key = salt
+        for row in range(BAND_ROWS):
+            key ^= mins[band * BAND_ROWS + row] << (32 * row)
+        keys.append(key - (1 << 64) if key >= 1 << 63 else key)
+    return tuple(keys)
@@ -0,0 +1,78 @@
+# importer.py
+"""
+Streaming bulk import of tasks from CSV or JSONL files.
+
+Rows are read lazily and inserted in fixed-size chunks, so memory use is
+bounded by the chunk size no matter how large the file is.
+"""
+
+import csv
+import json
+import time
+from itertools import islice
+from typing import Iterator, Tuple
+
+from task_schema import Task
+from tools import insert_tasks, new_task_id
+
+IMPORT_CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 10
+
+
+def iter_records(path: str) -> Iterator[Tuple[int, dict]]:
+    """Yield (line_number, row) pairs from a .csv or .jsonl/.ndjson file."""
+    lowered = path.lower()
+    if lowered.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+    elif lowered.endswith((".jsonl", ".ndjson")):
+        with open(path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                if line.strip():
+                    try:
+                        yield line_number, json.loads(line)
+                    except json.JSONDecodeError as e:
+                        yield line_number, {"_error": f"invalid JSON: {e.msg}"}
+    else:
+        raise ValueError("unsupported file type; use .csv or .jsonl")
+
+
+def import_file(path: str, chunk_size: int = IMPORT_CHUNK_SIZE) -> dict:
+    """
+    Validate and insert every row in a CSV/JSONL file.
+
+    Each chunk is inserted in one transaction. Rows that fail validation
+    against task_schema.Task are skipped and reported; rows whose id
+    already exists are counted as duplicates.
+
+    Returns a report dict with imported/rejected/duplicate counts, the first
+    few errors, elapsed seconds and throughput in rows per second.
+    """
+    report = {"imported": 0, "rejected": 0, "duplicates": 0, "errors": []}
+    started = time.perf_counter()
+    records = iter_records(path)
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            break
+        batch = []
+        for line_number, row in chunk:
+            try:
+                if not isinstance(row, dict):
+                    raise ValueError("expected an object per line")
+                if "_error" in row:
+                    raise ValueError(row["_error"])
+                batch.append(Task.from_dict({**row, "id": row.get("id") or new_task_id()}))
+            except ValueError as e:
+                report["rejected"] += 1
+                if len(report["errors"]) < MAX_REPORTED_ERRORS:
+                    report["errors"].append(f"line {line_number}: {e}")
+        inserted = insert_tasks(batch, skip_existing=True)
+        report["imported"] += inserted
+        report["duplicates"] += len(batch) - inserted
+    elapsed = time.perf_counter() - started
+    report["seconds"] = round(elapsed, 3)
+    report["rows_per_second"] = round(report["imported"] / elapsed) if elapsed > 0 else 0
+    return report
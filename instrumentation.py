@@ -0,0 +1,294 @@
+# instrumentation.py
+"""
+Lightweight latency instrumentation for the hot paths.
+
+Every tools.py function, process_shortcut, the shortcut formatters and
+the agent phases (message create, run, reply fetch) record into named
+histograms; SQLite statements are timed by the connection factory
+tools.py uses and recorded per calling tool as "sqlite:<tool>".
+
+Histograms use logarithmic buckets (10% wide), so memory stays constant
+and p50/p95/p99 are accurate to within a bucket. Statements slower than
+SLOW_QUERY_MS are kept in a short list; with EXPLAIN_SLOW_QUERIES=1 their
+EXPLAIN QUERY PLAN is captured too. Set TASK_STATS_FILE to dump all
+stats as JSON when the process exits. The /stats shortcut shows them.
+"""
+
+import atexit
+import functools
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", "50"))
+EXPLAIN_SLOW_QUERIES = os.environ.get("EXPLAIN_SLOW_QUERIES") == "1"
+STATS_FILE = os.environ.get("TASK_STATS_FILE")
+MAX_SLOW_QUERIES = 20
+
+BUCKET_GROWTH = 1.1
+BUCKET_COUNT = 256  # 1 µs .. ~11 hours
+_LOG_GROWTH = math.log(BUCKET_GROWTH)
+_QUERY = re.compile(r"\s*(SELECT|WITH)\b", re.IGNORECASE)
+
+
+class Histogram:
+    """Count, total, min, max and log-bucketed latencies for one operation."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self.buckets = [0] * BUCKET_COUNT
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        micros = seconds * 1e6
+        index = 0 if micros <= 1 else min(BUCKET_COUNT - 1, int(math.log(micros) / _LOG_GROWTH) + 1)
+        self.buckets[index] += 1
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th quantile, in seconds."""
+        if not self.count:
+            return 0.0
+        target = max(1, math.ceil(q * self.count))
+        seen = 0
+        for index, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target:
+                return min(BUCKET_GROWTH ** index / 1e6, self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        ms = lambda seconds: round(seconds * 1000, 3)
+        return {
+            "count": self.count,
+            "total_ms": ms(self.total),
+            "p50_ms": ms(self.percentile(0.50)),
+            "p95_ms": ms(self.percentile(0.95)),
+            "p99_ms": ms(self.percentile(0.99)),
+            "max_ms": ms(self.max),
+        }
+
+
+class Metrics:
+    """Thread-safe registry of named histograms and recent slow queries."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self.slow_queries = deque(maxlen=MAX_SLOW_QUERIES)
+        self._scope = threading.local()
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.add(seconds)
+
+    @contextmanager
+    def timer(self, name: str):
+        """Time the block as name; SQLite statements inside it are attributed to name."""
+        stack = self._scope.__dict__.setdefault("stack", [])
+        stack.append(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+            stack.pop()
+
+    def scope(self) -> str:
+        stack = getattr(self._scope, "stack", None)
+        return stack[-1].rpartition(".")[2] if stack else "other"
+
+    def record_slow_query(self, sql: str, seconds: float, plan: list = None):
+        with self._lock:
+            self.slow_queries.append({
+                "sql": re.sub(r"\s+", " ", sql).strip()[:500],
+                "ms": round(seconds * 1000, 3),
+                "scope": self.scope(),
+                "plan": plan,
+                "at": datetime.now().isoformat(timespec="seconds"),
+            })
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "operations": {name: h.summary() for name, h in sorted(self._histograms.items())},
+                "slow_queries": list(self.slow_queries),
+                "slow_query_ms": SLOW_QUERY_MS,
+            }
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self.slow_queries.clear()
+
+
+metrics = Metrics()
+
+
+def timed(name=None):
+    """
+    Decorator recording each call as name, default "<module>.<function>".
+
+    Use as @timed or @timed("name"). The wrapper keeps the function's name,
+    signature and docstring, so it can still be registered as an agent tool.
+    """
+    def decorate(fn):
+        label = name or f"{fn.__module__}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with metrics.timer(label):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    if callable(name):
+        fn, name = name, None
+        return decorate(fn)
+    return decorate
+
+
+@contextmanager
+def measure(name: str):
+    """
+    Record the block's duration as name without entering a scope.
+
+    Safe around awaits, where several coroutines share the loop thread.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.record(name, time.perf_counter() - start)
+
+
+def timed_dumps(value, **kwargs) -> str:
+    """json.dumps, recorded as "json:<current scope>"."""
+    start = time.perf_counter()
+    try:
+        return json.dumps(value, **kwargs)
+    finally:
+        metrics.record(f"json:{metrics.scope()}", time.perf_counter() - start)
+
+
+def _explain(conn: sqlite3.Connection, sql: str, parameters) -> list:
+    try:
+        rows = conn.cursor(sqlite3.Cursor).execute("EXPLAIN QUERY PLAN " + sql, parameters).fetchall()
+    except sqlite3.Error as e:
+        return [f"EXPLAIN failed: {e}"]
+    return [row[-1] for row in rows]
+
+
+class TimedCursor(sqlite3.Cursor):
+    """
+    Cursor that times each statement from execute() through its fetches.
+
+    A statement is recorded when its result is exhausted, when the cursor
+    runs the next statement, or when the cursor is released.
+    """
+
+    _sql = None
+
+    def _begin(self, sql: str, parameters, elapsed: float):
+        self._finish()
+        self._sql, self._parameters, self._elapsed = sql, parameters, elapsed
+
+    def _finish(self):
+        sql, self._sql = self._sql, None
+        if sql is None:
+            return
+        metrics.record(f"sqlite:{metrics.scope()}", self._elapsed)
+        if self._elapsed * 1000 >= SLOW_QUERY_MS:
+            plan = None
+            if EXPLAIN_SLOW_QUERIES and _QUERY.match(sql):
+                plan = _explain(self.connection, sql, self._parameters)
+            metrics.record_slow_query(sql, self._elapsed, plan)
+
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        super().execute(sql, parameters)
+        self._begin(sql, parameters, time.perf_counter() - start)
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        super().executemany(sql, seq_of_parameters)
+        self._begin(sql, (), time.perf_counter() - start)
+        return self
+
+    def _fetch(self, fetch, *args):
+        start = time.perf_counter()
+        try:
+            return fetch(*args)
+        finally:
+            if self._sql is not None:
+                self._elapsed += time.perf_counter() - start
+
+    def fetchone(self):
+        row = self._fetch(super().fetchone)
+        if row is None:
+            self._finish()
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._fetch(super().fetchmany, self.arraysize if size is None else size)
+        self._finish()
+        return rows
+
+    def fetchall(self):
+        rows = self._fetch(super().fetchall)
+        self._finish()
+        return rows
+
+    def __next__(self):
+        try:
+            return self._fetch(super().__next__)
+        except StopIteration:
+            self._finish()
+            raise
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        self._finish()
+
+
+class TimedConnection(sqlite3.Connection):
+    """Connection whose statements run on TimedCursor (pass as sqlite3.connect(factory=...))."""
+
+    def cursor(self, factory=None):
+        return super().cursor(factory or TimedCursor)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def dump_stats(path: str = None) -> str:
+    """Write metrics.snapshot() as JSON to path (default TASK_STATS_FILE)."""
+    path = path or STATS_FILE
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(metrics.snapshot(), f, indent=2)
+    return path
+
+
+if STATS_FILE:
+    atexit.register(dump_stats)
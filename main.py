@@ -1,67 +1,165 @@
 # main.py
-import os
+import asyncio
+import importlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from typing import Any, Callable, Set
 
 load_dotenv()  # Load .env file
 
-from azure.ai.projects import AIProjectClient
-from azure.identity import DefaultAzureCredential
-from azure.ai.agents.models import FunctionTool, ToolSet, MessageTextContent
-
-from tools import (
-    add_task, list_tasks, update_task, get_summary, init_db,
-    get_projects, delete_task, search_tasks, get_tasks_due_today
-)
+from tools import init_db, close_db, run_maintenance
 from shortcuts import process_shortcut
-
-
-def main():
-    # Initialize database
-    init_db()
-
-    # Create Azure AI Project Client
-    project_client = AIProjectClient(
-        credential=DefaultAzureCredential(),
-        endpoint=os.environ["PROJECT_ENDPOINT"],
-    )
-
-    # Collect user functions to be used as tools
-    user_functions: Set[Callable[..., Any]] = {
-        add_task, list_tasks, update_task, get_summary,
-        get_projects, delete_task, search_tasks, get_tasks_due_today
-    }
-
-    # Create toolset with custom functions
-    functions = FunctionTool(user_functions)
-    toolset = ToolSet()
-    toolset.add(functions)
-    project_client.agents.enable_auto_function_calls(toolset)
-
-    # Create the Azure AI Agent with specified configurations
-    agent = project_client.agents.create_agent(
-        model="gpt-4o-mini",
-        name="task-manager-agent",
-        instructions="You are a helpful task management assistant. You can add, list, update tasks, and provide summaries across projects. Be concise and helpful.",
-        toolset=toolset,
-    )
-    print(f"Created agent, agent ID: {agent.id}")
-
-    # Create a thread for the conversation
-    thread = project_client.agents.threads.create()
-    print(f"Created thread, thread ID: {thread.id}")
+from instrumentation import measure
+from response_cache import response_cache
+from task_client import SERVER_URL, TaskServerError, ping
+
+# Worker threads for tool calls and shortcuts, so SQLite work never blocks the event loop
+TOOL_WORKERS = 4
+# Seconds between checks whether archiving and compaction are due (see tools.run_maintenance)
+MAINTENANCE_CHECK = 3600
+
+
+async def connect_agent(executor: ThreadPoolExecutor):
+    """Import the Azure SDK off the event loop, then open (or reuse) the agent session."""
+    loop = asyncio.get_running_loop()
+    with measure("agent.connect"):
+        agent_session = await loop.run_in_executor(None, importlib.import_module, "agent_session")
+        return await agent_session.AgentSession.open(executor)
+
+
+def report_connection(task: asyncio.Task):
+    if task.cancelled():
+        return
+    if task.exception() is not None:
+        print(f"\n⚠️  Could not connect to Azure AI: {task.exception()}\n"
+              "   Fast shortcuts still work.")
+    else:
+        print("\n✅ Agent connected.")
+
+
+class PromptWorker:
+    """
+    Sends prompts to the agent one at a time, once the session has connected.
+
+    Read-only questions asked again against unchanged tasks are answered
+    from the response cache without a run. The lookup happens when the
+    prompt is dequeued, so writes queued before it have already landed.
+    """
+
+    def __init__(self, connecting: asyncio.Task, executor: ThreadPoolExecutor):
+        self.connecting = connecting
+        self.executor = executor
+        self.prompts: asyncio.Queue = asyncio.Queue()
+        self.busy = False
+
+    async def submit(self, prompt: str):
+        if self.busy:
+            print("⏳ Queued; the agent is still busy with your previous message.")
+        self.busy = True
+        await self.prompts.put(prompt)
+
+    async def serve(self):
+        while True:
+            prompt = await self.prompts.get()
+            try:
+                await self.answer(prompt)
+            except Exception as e:
+                print(f"\nRun failed: {e}\n")
+            finally:
+                self.busy = self.prompts.qsize() > 0
+                self.prompts.task_done()
+
+    async def answer(self, prompt: str):
+        loop = asyncio.get_running_loop()
+        with measure("response_cache.get"):
+            reply = await loop.run_in_executor(self.executor, response_cache.get, prompt)
+        if reply is not None:
+            print(f"\nAgent: {reply}\n")
+            if self.connecting.done() and not self.connecting.cancelled() and self.connecting.exception() is None:
+                await self.connecting.result().remember(prompt, reply)
+            return
+
+        if not self.connecting.done():
+            print("⏳ Waiting for the agent to connect...")
+        session = await self.connecting
+        # Taken before the run: a reply is only as fresh as the data it started from
+        version = await loop.run_in_executor(self.executor, response_cache.version)
+        reply = await session.run_turn(prompt)
+        if reply and session.turn_was_read_only:
+            await loop.run_in_executor(self.executor, response_cache.put, prompt, reply, version)
+
+
+async def maintain(executor: ThreadPoolExecutor):
+    """Archive old done tasks and compact the database whenever it is due, for as long as the app runs."""
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            with measure("maintenance"):
+                await loop.run_in_executor(executor, run_maintenance)
+        except Exception as e:
+            print(f"\n⚠️  Maintenance failed: {e}\n")
+        await asyncio.sleep(MAINTENANCE_CHECK)
+
+
+def start_input_reader(loop: asyncio.AbstractEventLoop) -> asyncio.Queue:
+    """Read stdin on a daemon thread so the event loop keeps streaming while the user types."""
+    lines: asyncio.Queue = asyncio.Queue()
+
+    def read():
+        while True:
+            try:
+                line = input()
+            except EOFError:
+                line = None
+            loop.call_soon_threadsafe(lines.put_nowait, line)
+            if line is None:
+                return
+
+    threading.Thread(target=read, name="stdin", daemon=True).start()
+    return lines
+
+
+async def main():
+    if SERVER_URL:
+        # Thin client: the task server owns the database
+        try:
+            info = ping()
+        except TaskServerError as e:
+            print(f"⚠️  {e}")
+            return
+        print(f"🔗 Using the task server at {SERVER_URL} ({info['db']})")
+    else:
+        # Initialize database
+        init_db()
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=TOOL_WORKERS, thread_name_prefix="tools")
+
+    # Connect to Azure AI in the background; shortcuts are available right away
+    connecting = asyncio.create_task(connect_agent(executor))
+    connecting.add_done_callback(report_connection)
     print("🗂️  Task Manager Agent Ready. Type 'quit' to exit.")
     print("💡 Tip: Type '/help' to see available shortcuts!\n")
 
+    worker = PromptWorker(connecting, executor)
+    serving = asyncio.create_task(worker.serve())
+    # With a task server, the server runs maintenance on its own database
+    maintaining = None if SERVER_URL else asyncio.create_task(maintain(executor))
+    lines = start_input_reader(loop)
     try:
         # Interactive loop
         while True:
-            user_input = input("You: ").strip()
-            if user_input.lower() == "quit":
+            print("You: ", end="", flush=True)
+            user_input = await lines.get()
+            if user_input is None or user_input.strip().lower() == "quit":
                 break
+            user_input = user_input.strip()
+            if not user_input:
+                continue
 
-            # Process shortcuts
-            fast_response, modified_input = process_shortcut(user_input)
+            # Process shortcuts off the event loop; fast ones answer even mid-run
+            fast_response, modified_input = await loop.run_in_executor(
+                executor, process_shortcut, user_input
+            )
 
             # If it's a fast shortcut, display result directly
             if fast_response is not None:
@@ -69,39 +167,23 @@ def main():
                 continue
 
             # Use modified input (either expanded AI shortcut or original input)
-            # Create a message in the thread
-            project_client.agents.messages.create(
-                thread_id=thread.id,
-                role="user",
-                content=modified_input,
-            )
-
-            # Run the agent on the thread
-            run = project_client.agents.runs.create_and_process(
-                thread_id=thread.id,
-                agent_id=agent.id
-            )
-
-            if run.status == "failed":
-                print(f"Run failed: {run.last_error}")
-                continue
-
-            # Get the latest messages from the thread
-            messages = list(project_client.agents.messages.list(thread_id=thread.id))
-            # The most recent message is first (index 0)
-            # Access the text content properly from MessageTextContent
-            message_content = messages[0].content[0]
-            if isinstance(message_content, MessageTextContent):
-                agent_response = message_content.text.value
-            else:
-                agent_response = str(message_content)
-            print(f"\nAgent: {agent_response}\n")
+            await worker.submit(modified_input)
 
+        # Let queued prompts finish before shutting down
+        await worker.prompts.join()
     finally:
-        # Delete the agent when done
-        project_client.agents.delete_agent(agent.id)
-        print("Deleted agent")
+        serving.cancel()
+        if maintaining is not None:
+            maintaining.cancel()
+        if connecting.done():
+            if not connecting.cancelled() and connecting.exception() is None:
+                await connecting.result().close()
+        else:
+            connecting.cancel()
+        executor.shutdown(wait=True)
+        response_cache.close()
+        close_db()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    asyncio.run(main())
@@ -0,0 +1,129 @@
+# quick_add.py
+"""
+Rule-based parser for the /add shortcut.
+
+Pulls a priority, a due date and a known project name out of free text
+such as "Buy milk for grocery project urgent due fri". When the text
+cannot be parsed with confidence the caller falls back to the AI agent.
+"""
+
+import re
+from datetime import date, timedelta
+from typing import Iterable, Optional
+
+WEEKDAYS = {
+    "mon": 0, "monday": 0, "tue": 1, "tues": 1, "tuesday": 1,
+    "wed": 2, "wednesday": 2, "thu": 3, "thur": 3, "thurs": 3, "thursday": 3,
+    "fri": 4, "friday": 4, "sat": 5, "saturday": 5, "sun": 6, "sunday": 6,
+}
+
+# A date only counts when it is unambiguous: an ISO date, one after
+# due/by/on, "next <weekday>", "in N days", or the last word of the text.
+# A bare "sun" or "wed" elsewhere may be part of the title ("sun cream").
+_DATE = re.compile(
+    r"\b(?P<prefix>(?:due|by|on)\s+)?"
+    r"(?P<when>\d{4}-\d{2}-\d{2}|today|tomorrow|tmrw"
+    r"|(?:next\s+)?(?:" + "|".join(sorted(WEEKDAYS, key=len, reverse=True)) + r")"
+    r"|in\s+\d+\s+(?:days?|weeks?))\b",
+    re.IGNORECASE,
+)
+_PRIORITY_TAGGED = re.compile(
+    r"\b(?:priority[:\s]+(?P<a>urgent|high|normal|low)|(?P<b>urgent|high|normal|low)[\s-]+priority)\b",
+    re.IGNORECASE,
+)
+_URGENT = re.compile(r"\b(?:urgent|urgently|asap)\b|!urgent", re.IGNORECASE)
+_TRAILING_PRIORITY = re.compile(r"\s+(?P<p>high|normal|low)\s*$", re.IGNORECASE)
+_CONNECTOR = r"(?:for|to|in|into|under|on)"
+
+
+def parse_when(text: str, today: date) -> Optional[str]:
+    """Resolve an ISO date, 'today', 'tomorrow', a weekday or 'in N days' to YYYY-MM-DD."""
+    when = text.lower().split()
+    if re.fullmatch(r"\d{4}-\d{2}-\d{2}", when[0]):
+        try:
+            return date.fromisoformat(when[0]).isoformat()
+        except ValueError:
+            return None
+    if when[0] == "today":
+        return today.isoformat()
+    if when[0] in ("tomorrow", "tmrw"):
+        return (today + timedelta(days=1)).isoformat()
+    if when[0] == "in":
+        amount = int(when[1]) * (7 if when[2].startswith("week") else 1)
+        return (today + timedelta(days=amount)).isoformat()
+    # "fri" on a Friday means today; "next fri" means the following one.
+    ahead = (WEEKDAYS[when[-1]] - today.weekday()) % 7
+    if ahead == 0 and when[0] == "next":
+        ahead = 7
+    return (today + timedelta(days=ahead)).isoformat()
+
+
+def _is_clear_date(match: re.Match, text: str) -> bool:
+    when = match.group("when").lower()
+    return bool(match.group("prefix") or when[0].isdigit() or when.startswith(("next", "in "))
+                or not text[match.end():].strip())
+
+
+def _find_project(text: str, projects: Iterable[str]):
+    """Return (project, match) for the single known project named in text, else (None, None)."""
+    found = {}
+    for name in sorted(projects, key=len, reverse=True):
+        pattern = re.compile(
+            rf"(?:\b{_CONNECTOR}\s+)?(?:the\s+)?[#@]?(?<![\w-]){re.escape(name)}(?![\w-])(?:\s+project)?",
+            re.IGNORECASE,
+        )
+        match = pattern.search(text)
+        # Skip names contained in a longer project already matched at the same spot.
+        if match and not any(m.start() <= match.start() < m.end() for m in found.values()):
+            found[name] = match
+    if len(found) != 1:
+        return None, None
+    return next(iter(found.items()))
+
+
+def parse_task_text(text: str, projects: Iterable[str], today: date = None) -> Optional[dict]:
+    """
+    Parse quick-add text into add_task() arguments.
+
+    Returns {"title", "project", "priority", "due_date"} or None when the
+    text does not name exactly one known project, names more than one
+    date or a weekday that may belong to the title, or leaves no title
+    behind.
+    """
+    today = today or date.today()
+    rest = " " + text.strip() + " "
+
+    project, match = _find_project(rest, projects)
+    if project is None:
+        return None
+    rest = rest[:match.start()] + " " + rest[match.end():]
+
+    dates = list(_DATE.finditer(rest))
+    if len(dates) > 1 or any(not _is_clear_date(d, rest) for d in dates):
+        return None
+    due_date = None
+    if dates:
+        due_date = parse_when(dates[0].group("when"), today)
+        if due_date is None:
+            return None
+        rest = rest[:dates[0].start()] + " " + rest[dates[0].end():]
+
+    priority = "normal"
+    tagged = _PRIORITY_TAGGED.search(rest)
+    if tagged:
+        priority = (tagged.group("a") or tagged.group("b")).lower()
+        rest = rest[:tagged.start()] + " " + rest[tagged.end():]
+    elif _URGENT.search(rest):
+        priority = "urgent"
+        rest = _URGENT.sub(" ", rest)
+    else:
+        trailing = _TRAILING_PRIORITY.search(rest)
+        if trailing:
+            priority = trailing.group("p").lower()
+            rest = rest[:trailing.start()]
+
+    title = re.sub(r"\s+", " ", rest).strip(" ,;:-")
+    title = re.sub(rf"\s+{_CONNECTOR}$", "", title, flags=re.IGNORECASE).strip(" ,;:-")
+    if not title:
+        return None
+    return {"title": title, "project": project, "priority": priority, "due_date": due_date}
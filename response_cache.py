@@ -0,0 +1,183 @@
+# response_cache.py
+"""
+On-disk cache of agent replies to repeated read-only questions.
+
+"What's urgent?" asked twice against unchanged tasks should not pay for
+a second agent run. Replies are stored in a small SQLite file keyed on
+the normalized prompt and the task database, and are only served while
+the database's persistent write version (tools.write_version()) and the
+date are the ones they were answered at. Entries also expire after
+DEFAULT_TTL and the least recently used go once there are more than
+DEFAULT_MAX_ENTRIES.
+
+Only standalone read-only questions are cached: the prompt must not ask
+for a change (see is_read_only_prompt()) or lean on the conversation
+before it, as "and the urgent ones?" does (see is_standalone_prompt()).
+main.py only stores a reply when the run called at least one tool and
+nothing but read-only tools, so answers drawn from the conversation
+alone are never reused.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import date
+
+from task_client import SERVER_URL
+if SERVER_URL:
+    from task_client import write_version
+else:
+    from tools import write_version
+import tools
+
+CACHE_PATH = os.environ.get("RESPONSE_CACHE_PATH", ".response_cache.db")
+DEFAULT_TTL = 12 * 3600  # seconds
+DEFAULT_MAX_ENTRIES = 500
+
+# Words that ask for a change; a prompt containing one is never cached
+_WRITE_WORDS = re.compile(
+    r"\b(add|create|new|make|mark|done|finish|complete|close|delete|remove|drop|update|change|"
+    r"set|edit|rename|move|assign|schedule|reschedule|postpone|import|undo|clear)\b"
+)
+# A prompt that opens like a follow-up or refers back to earlier turns
+# means something different in another conversation, so it is never cached
+_FOLLOW_UP = re.compile(
+    r"^(and|also|but|or|so|then|ok|okay|what about|how about)\b"
+    r"|\b(it|its|them|they|their|those|these|that one|ones|same|again|else|other|others|"
+    r"instead|previous|above|last one)\b"
+)
+_PUNCTUATION = re.compile(r"[^\w\s'/-]")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Fold case, curly quotes, punctuation and spacing, so trivially different wordings share an entry."""
+    text = prompt.lower().replace("’", "'").replace("‘", "'")
+    return " ".join(_PUNCTUATION.sub(" ", text).split())
+
+
+def is_read_only_prompt(prompt: str) -> bool:
+    """Whether a prompt only asks about tasks, as far as its wording shows."""
+    normalized = normalize_prompt(prompt)
+    return bool(normalized) and not _WRITE_WORDS.search(normalized)
+
+
+def is_standalone_prompt(prompt: str) -> bool:
+    """Whether a prompt can be understood without the conversation before it, as far as its wording shows."""
+    return not _FOLLOW_UP.search(normalize_prompt(prompt))
+
+
+def is_cacheable_prompt(prompt: str) -> bool:
+    return is_read_only_prompt(prompt) and is_standalone_prompt(prompt)
+
+
+class ResponseCache:
+    """Replies keyed on (normalized prompt, database), valid at one write version and date."""
+
+    def __init__(self, path: str = CACHE_PATH, ttl: float = DEFAULT_TTL,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._conn = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode = WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    version TEXT NOT NULL,
+                    reply TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    used_at REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_used ON responses (used_at)")
+        return self._conn
+
+    @staticmethod
+    def _key(prompt: str) -> str:
+        database = SERVER_URL or os.path.abspath(tools.DB_PATH)
+        return hashlib.sha256(f"{database}\0{normalize_prompt(prompt)}".encode()).hexdigest()
+
+    @staticmethod
+    def version() -> str:
+        """The state an answer depends on: the tasks' write version and today's date."""
+        return f"{write_version()}@{date.today().isoformat()}"
+
+    def get(self, prompt: str):
+        """The cached reply to prompt if it is cacheable and still valid, else None."""
+        if not is_cacheable_prompt(prompt):
+            return None
+        key, version, now = self._key(prompt), self.version(), time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT reply FROM responses WHERE key = ? AND version = ? AND created_at > ?",
+                (key, version, now - self.ttl)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            with conn:
+                conn.execute("UPDATE responses SET used_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, prompt: str, reply: str, version: str):
+        """
+        Store a reply computed at version (from version(), taken before the
+        run), then evict expired and least recently used entries.
+        """
+        if not reply or not is_cacheable_prompt(prompt):
+            return
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, version, reply, created_at, used_at) VALUES (?, ?, ?, ?, ?)",
+                    (self._key(prompt), version, reply, now, now)
+                )
+                conn.execute("DELETE FROM responses WHERE created_at <= ?", (now - self.ttl,))
+                conn.execute("""
+                    DELETE FROM responses WHERE key IN (
+                        SELECT key FROM responses ORDER BY used_at DESC LIMIT -1 OFFSET ?
+                    )
+                """, (self.max_entries,))
+
+    def clear(self):
+        with self._lock:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM responses")
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            if self._conn is None and not os.path.exists(self.path):
+                entries = 0  # nothing cached yet; don't create the file just to count
+            else:
+                entries = self._connect().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+response_cache = ResponseCache()
@@ -5,12 +5,32 @@ Hybrid shortcut system for task management agent.
 - AI shortcuts: Expand to natural language and use AI context
 """
 
-import json
-from typing import Optional, Tuple
-from tools import (
-    get_projects, get_summary, list_tasks,
-    get_tasks_due_today, delete_task, search_tasks
-)
+import itertools
+import os
+import re
+import shutil
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+from task_schema import TaskPage
+from task_client import SERVER_URL
+if SERVER_URL:
+    # Thin client: queries and writes run on the task server
+    from task_client import (
+        fetch_projects, fetch_summary, fetch_tasks, create_task, edit_task, fetch_due_today,
+        remove_task, fetch_search, fetch_overdue, fetch_due_this_week, fetch_upcoming, import_file,
+        fetch_fuzzy, find_duplicates, fetch_tags, tag_task, resolve_task_id, compact_db
+    )
+else:
+    from tools import (
+        fetch_projects, fetch_summary, fetch_tasks, create_task, edit_task,
+        fetch_due_today, remove_task, fetch_search, fetch_overdue, fetch_due_this_week, fetch_upcoming,
+        fetch_fuzzy, find_duplicates, fetch_tags, tag_task, resolve_task_id, compact_db
+    )
+    from importer import import_file
+from fuzzy import closest
+from quick_add import parse_task_text
+from cache import cached_call, result_cache
+from response_cache import response_cache
+from instrumentation import metrics, timed
 
 # ANSI color codes for better terminal output
 class Colors:
@@ -23,62 +43,404 @@ class Colors:
     END = '\033[0m'
 
 
-def format_projects(json_str: str) -> str:
-    """Format project list for display."""
-    projects = json.loads(json_str)
-    if not projects:
-        return f"{Colors.YELLOW}No projects found.{Colors.END}"
+PRIORITY_EMOJI = {"urgent": "🔴", "high": "🟠", "normal": "🟢", "low": "🔵"}
+STATUS_EMOJI = {"todo": "⏳", "in_progress": "🔄", "done": "✅", "blocked": "🚫"}
 
-    output = [f"\n{Colors.BOLD}{Colors.BLUE}📁 Your Projects:{Colors.END}\n"]
+
+def project_lines(projects: Iterable) -> Iterator[str]:
+    """Yield one progress line per project (ProjectStats from fetch_projects)."""
     for p in projects:
-        completion_rate = (p['completed'] / p['total_tasks'] * 100) if p['total_tasks'] > 0 else 0
+        completion_rate = (p.completed / p.total_tasks * 100) if p.total_tasks > 0 else 0
         bar_length = 20
         filled = int(bar_length * completion_rate / 100)
         bar = '█' * filled + '░' * (bar_length - filled)
 
-        output.append(
-            f"{Colors.CYAN}{p['name']}{Colors.END}: "
-            f"{p['completed']}/{p['total_tasks']} tasks "
+        yield (
+            f"{Colors.CYAN}{p.name}{Colors.END}: "
+            f"{p.completed}/{p.total_tasks} tasks "
             f"[{bar}] {completion_rate:.0f}%"
         )
-    return "\n".join(output) + "\n"
 
 
-def format_summary(json_str: str) -> str:
-    """Format summary for display."""
-    summary = json.loads(json_str)
-    if not summary:
-        return f"{Colors.YELLOW}No tasks found.{Colors.END}"
-
-    output = [f"\n{Colors.BOLD}{Colors.BLUE}📊 Task Summary:{Colors.END}\n"]
+def summary_lines(summary: dict) -> Iterator[str]:
+    """Yield a heading and one line per status for each project in a summary."""
     for project, statuses in summary.items():
         total = sum(statuses.values())
-        output.append(f"\n{Colors.CYAN}{Colors.BOLD}{project}{Colors.END} ({total} tasks):")
+        yield f"\n{Colors.CYAN}{Colors.BOLD}{project}{Colors.END} ({total} tasks):"
         for status, count in statuses.items():
-            emoji = {"todo": "⏳", "in_progress": "🔄", "done": "✅", "blocked": "🚫"}.get(status, "📌")
-            output.append(f"  {emoji} {status}: {count}")
+            yield f"  {STATUS_EMOJI.get(status, '📌')} {status}: {count}"
+
+
+def task_lines(tasks: Iterable) -> Iterator[str]:
+    """Yield one line per Task."""
+    for task in tasks:
+        due = f" | Due: {task.due_date.isoformat()}" if task.due_date else ""
+        tags = "".join(f" #{t}" for t in task.tags)
+        yield (
+            f"{PRIORITY_EMOJI.get(task.priority, '⚪')} {STATUS_EMOJI.get(task.status, '📌')} "
+            f"[{Colors.CYAN}{task.id}{Colors.END}] "
+            f"{task.title} ({Colors.YELLOW}{task.project}{Colors.END}){due}{tags}"
+        )
+
+
+def iter_tasks(fetch: Callable[..., TaskPage], batch: int, daily: bool = False, **filters) -> Iterator:
+    """Yield every task a typed query matches, fetching batch rows at a time through the cache."""
+    cursor = None
+    while True:
+        page = cached_call(fetch, limit=batch, cursor=cursor, daily=daily, **filters)
+        yield from page.tasks
+        cursor = page.next_cursor
+        if not cursor:
+            return
+
+
+def page_size() -> int:
+    """Lines of output per page: the terminal height less room for headings and the prompt."""
+    return max(MIN_PAGE_LINES, shutil.get_terminal_size((80, 24)).lines - PAGE_CHROME_LINES)
+
+
+# Lines the pager reserves around a page (heading, footer, prompt)
+PAGE_CHROME_LINES = 6
+MIN_PAGE_LINES = 5
+
+
+class Pager:
+    """
+    Shows a lazily generated listing one terminal page at a time.
+
+    Lines are pulled from the generator only as pages are shown, so the
+    first page of a huge listing renders without formatting (or, for
+    tasks, fetching) the rest. Pages already shown are kept for /prev.
+    """
+
+    def __init__(self):
+        self._lines = None
+
+    @property
+    def is_open(self) -> bool:
+        """Whether the last listing had anything to page through."""
+        return self._lines is not None
+
+    def open(self, lines: Iterator[str], heading: str = "", unit: str = None,
+             empty: str = "Nothing found.", size: int = None) -> str:
+        """
+        Start paging lines and return the first page.
+
+        With unit (e.g. "task"), a listing that fits on one page is headed
+        "Found N task(s):" and a longer one "Tasks 1–40:"; otherwise heading
+        is shown above every page.
+        """
+        self._lines = iter(lines)
+        self._heading, self._unit, self._size = heading, unit, size or page_size()
+        self._pages, self._index, self._done = [], 0, False
+        self._fill(0)
+        if not self._pages[0]:
+            self._lines = None
+            return f"{Colors.YELLOW}{empty}{Colors.END}"
+        return self._render()
+
+    def next(self) -> str:
+        if self._lines is None:
+            return f"{Colors.YELLOW}Nothing to page through; run a listing like /urgent first.{Colors.END}"
+        if not self._has_page(self._index + 1):
+            return f"{Colors.YELLOW}Already on the last page.{Colors.END}"
+        self._index += 1
+        return self._render()
+
+    def prev(self) -> str:
+        if self._lines is None:
+            return f"{Colors.YELLOW}Nothing to page through; run a listing like /urgent first.{Colors.END}"
+        if self._index == 0:
+            return f"{Colors.YELLOW}Already on the first page.{Colors.END}"
+        self._index -= 1
+        return self._render()
+
+    def _fill(self, index: int):
+        while len(self._pages) <= index and not self._done:
+            page = list(itertools.islice(self._lines, self._size))
+            self._done = len(page) < self._size
+            if page or not self._pages:
+                self._pages.append(page)
+
+    def _has_page(self, index: int) -> bool:
+        self._fill(index)
+        return index < len(self._pages)
+
+    def _render(self) -> str:
+        page = self._pages[self._index]
+        # Peek one page ahead so the footer only offers /next when there is more
+        more = self._has_page(self._index + 1)
+        first = self._index * self._size + 1
+        if self._unit and not more and self._index == 0:
+            heading = f"Found {len(page)} {self._unit}(s):"
+        elif self._unit:
+            heading = f"{self._unit.capitalize()}s {first}–{first + len(page) - 1}:"
+        else:
+            heading = self._heading
+        output = [f"\n{Colors.BOLD}{heading}{Colors.END}\n", *page]
+        if more or self._index:
+            hints = [hint for hint, show in (("/next for more", more), ("/prev to go back", self._index)) if show]
+            output.append(f"\n{Colors.YELLOW}Page {self._index + 1} · {', '.join(hints)}{Colors.END}")
+        return "\n".join(output) + "\n"
+
+
+pager = Pager()
+
+
+@timed
+def page_tasks(fetch: Callable[..., TaskPage], daily: bool = False, **filters) -> str:
+    """Open the pager on a typed task query; only the rows of the pages shown are fetched."""
+    size = page_size()
+    return pager.open(task_lines(iter_tasks(fetch, size, daily, **filters)), unit="task",
+                      empty="No tasks found.", size=size)
+
+
+@timed
+def page_projects() -> str:
+    return pager.open(project_lines(cached_call(fetch_projects)),
+                      heading=f"{Colors.BLUE}📁 Your Projects:", empty="No projects found.")
+
+
+@timed
+def page_summary() -> str:
+    return pager.open(summary_lines(cached_call(fetch_summary)),
+                      heading=f"{Colors.BLUE}📊 Task Summary:", empty="No tasks found.")
+
+
+def search(args: str) -> str:
+    """Run a full-text search locally, falling back to typo-tolerant title matches."""
+    if not args:
+        return f"{Colors.YELLOW}Usage: /search <query>{Colors.END}\nType /help for more info."
+    if cached_call(fetch_search, query=args, limit=1).tasks:
+        return page_tasks(fetch_search, query=args)
+    fuzzy = page_tasks(fetch_fuzzy, query=args)
+    if pager.is_open:
+        return f"{Colors.YELLOW}No exact matches; closest titles:{Colors.END}" + fuzzy
+    return fuzzy
+
+
+def upcoming(args: str) -> str:
+    """Page through open tasks due in the next N days (default 7)."""
+    days = args.strip() or "7"
+    if not days.isdigit():
+        return f"{Colors.YELLOW}Usage: /upcoming [days]{Colors.END}\nType /help for more info."
+    return page_tasks(fetch_upcoming, daily=True, days=int(days))
+
+
+# Columns for tag listings, which show each task's tags
+TAGGED_FIELDS = ("id", "title", "project", "status", "priority", "due_date", "tags")
+
+
+def tag_lines(tags: Iterable) -> Iterator[str]:
+    """Yield one line per (tag, task count) from fetch_tags."""
+    for tag, count in tags:
+        yield f"{Colors.CYAN}#{tag}{Colors.END}: {count} task(s)"
+
+
+def tag(args: str) -> str:
+    """
+    /tag lists the tags in use; /tag a b pages through tasks tagged both
+    (/tag a or b: either); /tag <task_id> +a -b adds and removes tags.
+    """
+    words = args.replace(",", " ").split()
+    if not words:
+        return pager.open(tag_lines(cached_call(fetch_tags)),
+                          heading=f"{Colors.BLUE}🏷️  Tags:", empty="No tags yet.")
+
+    task_id, edits = words[0].lower(), words[1:]
+    if TASK_ID_PATTERN.match(task_id) and edits and all(w[0] in "+-" for w in edits):
+        task_id, missing = find_task(task_id)
+        if missing:
+            return missing
+        tags = tag_task(task_id, add=[w[1:] for w in edits if w[0] == "+"],
+                        remove=[w[1:] for w in edits if w[0] == "-"])
+        if tags is None:
+            return f"{Colors.YELLOW}Task {task_id} not found.{Colors.END}"
+        shown = " ".join(f"#{t}" for t in tags) or "no tags"
+        return f"{Colors.GREEN}🏷️  [{task_id}] now has {shown}.{Colors.END}"
+
+    match = "any" if "or" in (w.lower() for w in words) else "all"
+    tags = tuple(w for w in words if w.lower() != "or")
+    if not tags or any(w[0] in "+-" for w in tags):
+        return f"{Colors.YELLOW}Usage: /tag [tag ...] or /tag <task_id> +tag -tag{Colors.END}\nType /help for more info."
+    return page_tasks(fetch_tasks, tags=tags, match=match, fields=TAGGED_FIELDS)
+
+
+def import_tasks(args: str) -> str:
+    """Bulk import tasks from a CSV or JSONL file and report throughput."""
+    path = args.strip().strip('"\'')
+    if not path:
+        return f"{Colors.YELLOW}Usage: /import <file.csv|file.jsonl>{Colors.END}\nType /help for more info."
+    try:
+        # Absolute, so a task server started elsewhere opens the same file
+        report = import_file(os.path.abspath(path))
+    except (OSError, ValueError) as e:
+        return f"{Colors.RED}Import failed: {e}{Colors.END}"
+
+    output = [
+        f"\n{Colors.BOLD}{Colors.BLUE}📥 Import complete:{Colors.END}\n",
+        f"{Colors.GREEN}✓ Imported {report['imported']:,} task(s){Colors.END} "
+        f"in {report['seconds']:.2f}s ({report['rows_per_second']:,} tasks/s)",
+    ]
+    if report['duplicates']:
+        output.append(f"{Colors.YELLOW}↷ Skipped {report['duplicates']:,} existing task ID(s){Colors.END}")
+    if report['rejected']:
+        output.append(f"{Colors.RED}✗ Rejected {report['rejected']:,} invalid row(s):{Colors.END}")
+        output.extend(f"  {error}" for error in report['errors'])
+        hidden = report['rejected'] - len(report['errors'])
+        if hidden > 0:
+            output.append(f"  ... and {hidden:,} more")
     return "\n".join(output) + "\n"
 
 
-def format_tasks(json_str: str) -> str:
-    """Format task list for display."""
-    tasks = json.loads(json_str)
-    if not tasks:
-        return f"{Colors.YELLOW}No tasks found.{Colors.END}"
+def format_cache_stats(stats: dict, responses: dict) -> str:
+    """Format result cache and response cache statistics for display."""
+    return (
+        f"\n{Colors.BOLD}{Colors.BLUE}🗄️  Result Cache:{Colors.END}\n\n"
+        f"  Hits: {stats['hits']}  Misses: {stats['misses']}  "
+        f"Hit rate: {stats['hit_rate'] * 100:.0f}%\n"
+        f"  Invalidated: {stats['invalidations']}  Evicted: {stats['evictions']}  "
+        f"Entries: {stats['entries']}/{stats['max_entries']}\n"
+        f"\n{Colors.BOLD}{Colors.BLUE}💬 Response Cache:{Colors.END}\n\n"
+        f"  Hits: {responses['hits']}  Misses: {responses['misses']}  "
+        f"Hit rate: {responses['hit_rate'] * 100:.0f}%\n"
+        f"  Entries: {responses['entries']}/{responses['max_entries']}\n"
+    )
 
-    output = [f"\n{Colors.BOLD}Found {len(tasks)} task(s):{Colors.END}\n"]
-    for task in tasks:
-        priority_emoji = {"urgent": "🔴", "high": "🟠", "normal": "🟢", "low": "🔵"}.get(task['priority'], "⚪")
-        status_emoji = {"todo": "⏳", "in_progress": "🔄", "done": "✅", "blocked": "🚫"}.get(task['status'], "📌")
 
-        due = f" | Due: {task['due_date']}" if task.get('due_date') else ""
+def format_stats(snapshot: dict) -> str:
+    """Format instrumentation counters, latency percentiles and slow queries for display."""
+    operations = snapshot['operations']
+    if not operations:
+        return f"{Colors.YELLOW}No stats recorded yet.{Colors.END}"
+
+    output = [
+        f"\n{Colors.BOLD}{Colors.BLUE}⏱️  Performance Stats:{Colors.END}\n",
+        f"  {'operation':<36} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}",
+    ]
+    # Biggest total time first: that is where a slow session went
+    for name, h in sorted(operations.items(), key=lambda item: -item[1]['total_ms']):
         output.append(
-            f"{priority_emoji} {status_emoji} [{Colors.CYAN}{task['id']}{Colors.END}] "
-            f"{task['title']} ({Colors.YELLOW}{task['project']}{Colors.END}){due}"
+            f"  {Colors.CYAN}{name:<36}{Colors.END} {h['count']:>7} {h['p50_ms']:>9.3f} "
+            f"{h['p95_ms']:>9.3f} {h['p99_ms']:>9.3f} {h['max_ms']:>9.3f}"
         )
+    if snapshot['slow_queries']:
+        output.append(f"\n{Colors.YELLOW}Slow queries (≥ {snapshot['slow_query_ms']:g} ms):{Colors.END}")
+        for q in snapshot['slow_queries']:
+            output.append(f"  {q['ms']:>9.1f} ms  [{q['scope']}]  {q['sql'][:120]}")
+            output.extend(f"               plan: {step}" for step in q['plan'] or [])
     return "\n".join(output) + "\n"
 
 
+def stats(args: str) -> str:
+    """Show instrumentation stats; '/stats reset' clears them."""
+    if args.strip().lower() == "reset":
+        metrics.reset()
+        return f"{Colors.GREEN}Stats reset.{Colors.END}"
+    return format_stats(metrics.snapshot())
+
+
+def compact(args: str) -> str:
+    """Compact the database now; '/compact --full' first switches an older one to incremental vacuum."""
+    option = args.strip().lower()
+    if option not in ("", "--full"):
+        return f"{Colors.YELLOW}Usage: /compact [--full]{Colors.END}"
+    freed = compact_db(full=option == "--full")
+    if not freed:
+        return (f"{Colors.YELLOW}Nothing reclaimed: this database predates incremental vacuum. "
+                f"Run /compact --full once to convert it (rewrites the whole file).{Colors.END}")
+    pages = ", ".join(f"{count:,} page(s) from {schema}" for schema, count in freed.items())
+    return f"{Colors.GREEN}🧹 Compacted: freed {pages}.{Colors.END}"
+
+
+# Task IDs are 20 base32 characters (older ones 8 hex characters), and
+# any unambiguous start of one works in its place; anything else is left
+# to the AI to interpret. A prefix needs a digit, so words go to the AI.
+TASK_ID_PATTERN = re.compile(r"^([0-9a-f]{8}|(?=.*\d)[0-9a-hjkmnp-tv-z]{4,20})$")
+
+
+def find_task(task_id: str) -> Tuple[Optional[str], Optional[str]]:
+    """(full ID, None) for a task ID or prefix, or (None, message) when it matches no task or several."""
+    try:
+        full_id = resolve_task_id(task_id)
+    except ValueError as e:
+        return None, f"{Colors.YELLOW}{e}.{Colors.END}"
+    if full_id is None:
+        return None, f"{Colors.YELLOW}Task {task_id} not found.{Colors.END}"
+    return full_id, None
+
+
+def project_names() -> list:
+    """Names of all known projects (served from the result cache)."""
+    return [p.name for p in cached_call(fetch_projects)]
+
+
+def local_add(args: str) -> Optional[str]:
+    """Add a task parsed locally, or None if the text is not parsed confidently."""
+    parsed = parse_task_text(args, project_names())
+    if parsed is None:
+        return None
+    duplicates = find_duplicates(parsed['title'], parsed['project'])
+    task = create_task(**parsed)
+    due = f" | Due: {parsed['due_date']}" if parsed['due_date'] else ""
+    output = (
+        f"{Colors.GREEN}✓ Added [{Colors.CYAN}{task.id}{Colors.GREEN}] "
+        f"{parsed['title']}{Colors.END} ({Colors.YELLOW}{parsed['project']}{Colors.END}, "
+        f"{parsed['priority']}){due}"
+    )
+    for other, _ in duplicates:
+        output += f"\n{Colors.YELLOW}⚠ Possible duplicate of [{other.id}] {other.title}{Colors.END}"
+    return output
+
+
+def local_list(args: str) -> Optional[str]:
+    """
+    List a known project (or everything) locally. A misspelt project name
+    lists the one it is closest to, or asks which was meant when several
+    are close; None if nothing is close.
+    """
+    if not args:
+        return page_tasks(fetch_tasks)
+    wanted = args.strip().lower()
+    names = project_names()
+    for name in names:
+        if name.lower() == wanted:
+            return page_tasks(fetch_tasks, project=name)
+    suggestions = closest(wanted, names)
+    if len(suggestions) == 1:
+        note = f"{Colors.YELLOW}No project '{args.strip()}'; showing '{suggestions[0]}'.{Colors.END}"
+        return note + page_tasks(fetch_tasks, project=suggestions[0])
+    if suggestions:
+        return f"{Colors.YELLOW}No project '{args.strip()}'. Did you mean: {', '.join(suggestions)}?{Colors.END}"
+    return None
+
+
+def local_done(args: str) -> Optional[str]:
+    """Mark a task done by ID locally, or None if the argument is not a task ID."""
+    task_id = args.strip().lower()
+    if not TASK_ID_PATTERN.match(task_id):
+        return None
+    task_id, missing = find_task(task_id)
+    if missing:
+        return missing
+    if not edit_task(task_id, status='done'):
+        return f"{Colors.YELLOW}Task {task_id} not found.{Colors.END}"
+    return f"{Colors.GREEN}✅ Marked [{task_id}] as done.{Colors.END}"
+
+
+def local_delete(args: str) -> Optional[str]:
+    """Delete a task by ID locally, or None if the argument is not a task ID."""
+    task_id = args.strip().lower()
+    if not TASK_ID_PATTERN.match(task_id):
+        return None
+    task_id, missing = find_task(task_id)
+    if missing:
+        return missing
+    if not remove_task(task_id):
+        return f"{Colors.YELLOW}Task {task_id} not found.{Colors.END}"
+    return f"{Colors.GREEN}🗑️  Deleted [{task_id}].{Colors.END}"
+
+
 def show_help() -> str:
     """Display all available shortcuts."""
     help_text = f"""
@@ -89,49 +451,85 @@ def show_help() -> str:
   {Colors.GREEN}/summary{Colors.END}         - Show task summary dashboard
   {Colors.GREEN}/urgent{Colors.END}          - List all urgent priority tasks
   {Colors.GREEN}/today{Colors.END}           - Show tasks due today
+  {Colors.GREEN}/overdue{Colors.END}         - Show open tasks past their due date
+  {Colors.GREEN}/week{Colors.END}            - Show open tasks due from today through Sunday
+  {Colors.GREEN}/upcoming{Colors.END} [N]    - Show open tasks due in the next N days (default 7)
+  {Colors.GREEN}/next{Colors.END}, {Colors.GREEN}/prev{Colors.END}     - Page through the last listing (one screen at a time)
+  {Colors.GREEN}/search{Colors.END} <query>  - Search tasks by text ("quoted" for phrases)
+                      Example: /search meeting
+  {Colors.GREEN}/tag{Colors.END} [tags]      - List tags, or tasks with all the tags ('a or b' for either)
+                      Example: /tag home errand
+  {Colors.GREEN}/tag{Colors.END} <id> +a -b  - Add and remove a task's tags
+                      Example: /tag abc123ef +waiting -today
+  {Colors.GREEN}/import{Colors.END} <file>   - Bulk import tasks from a CSV or JSONL file
+                      Example: /import backlog.csv
+  {Colors.GREEN}/cache{Colors.END}           - Show result cache hit/miss statistics
+  {Colors.GREEN}/compact{Colors.END} [--full] - Give free space back to the filesystem ('--full' once for older databases)
+  {Colors.GREEN}/stats{Colors.END}           - Show call counts and p50/p95/p99 latencies ('/stats reset' to clear)
   {Colors.GREEN}/help{Colors.END}            - Show this help message
 
-{Colors.BOLD}AI-Enhanced Shortcuts{Colors.END} (natural language):
-  {Colors.CYAN}/add{Colors.END} <text>       - Quick add task (AI parses project/priority)
-                      Example: /add Buy milk for grocery project urgent
+{Colors.BOLD}Smart Shortcuts{Colors.END} (run locally, AI only when the input is unclear):
+  {Colors.CYAN}/add{Colors.END} <text>       - Quick add task (project, priority and due date parsed locally)
+                      Example: /add Buy milk for grocery project urgent due fri
   {Colors.CYAN}/list{Colors.END} <project>   - List tasks in specific project
                       Example: /list grocery
   {Colors.CYAN}/done{Colors.END} <task_id>   - Mark task as completed
                       Example: /done abc123ef
   {Colors.CYAN}/delete{Colors.END} <task_id> - Delete a task
                       Example: /delete abc123ef
-  {Colors.CYAN}/search{Colors.END} <query>   - Search tasks by text
-                      Example: /search meeting
 
 {Colors.BOLD}Natural Language{Colors.END} (anything else):
   Just type normally and the AI will help!
   Example: "Show me all blocked tasks in the client project"
 
-{Colors.YELLOW}Tip:{Colors.END} Fast shortcuts are instant. AI shortcuts use context for smarter parsing!
+{Colors.YELLOW}Tip:{Colors.END} Fast and smart shortcuts are instant. Smart shortcuts hand off to the AI when they can't parse your input!
 """
     return help_text
 
 
 # Fast shortcuts - execute directly without AI
+# Listings open the pager, which fetches one terminal page of rows at a
+# time through the result cache; /next and /prev move through them.
 FAST_SHORTCUTS = {
-    '/projects': lambda args: format_projects(get_projects()),
-    '/summary': lambda args: format_summary(get_summary()),
-    '/urgent': lambda args: format_tasks(list_tasks(priority='urgent')),
-    '/today': lambda args: format_tasks(get_tasks_due_today()),
+    '/projects': lambda args: page_projects(),
+    '/summary': lambda args: page_summary(),
+    '/urgent': lambda args: page_tasks(fetch_tasks, priority='urgent'),
+    '/today': lambda args: page_tasks(fetch_due_today, daily=True),
+    '/overdue': lambda args: page_tasks(fetch_overdue, daily=True),
+    '/week': lambda args: page_tasks(fetch_due_this_week, daily=True),
+    '/upcoming': upcoming,
+    '/next': lambda args: pager.next(),
+    '/prev': lambda args: pager.prev(),
+    '/search': search,
+    '/tag': tag,
+    '/import': import_tasks,
+    '/cache': lambda args: format_cache_stats(result_cache.stats(), response_cache.stats()),
+    '/stats': stats,
+    '/compact': compact,
     '/help': lambda args: show_help(),
 }
 
 
+# Smart shortcuts - run locally when the arguments are unambiguous.
+# A handler returns None to fall back to the AI expansion below.
+LOCAL_SHORTCUTS = {
+    '/add': local_add,
+    '/list': local_list,
+    '/done': local_done,
+    '/delete': local_delete,
+}
+
+
 # AI-enhanced shortcuts - expand to natural language with context
 AI_SHORTCUTS = {
     '/add': lambda args: f"Add a new task: {args}. Parse the project name, priority, and description from the text intelligently.",
     '/list': lambda args: f"List all tasks in the '{args}' project" if args else "List all tasks across all projects",
     '/done': lambda args: f"Mark task {args} as done",
     '/delete': lambda args: f"Delete task {args}",
-    '/search': lambda args: f"Search for tasks containing: {args}",
 }
 
 
+@timed
 def process_shortcut(user_input: str) -> Tuple[Optional[str], Optional[str]]:
     """
     Process shortcut commands.
@@ -139,6 +537,7 @@ def process_shortcut(user_input: str) -> Tuple[Optional[str], Optional[str]]:
     Returns:
         (response, modified_input)
         - If fast shortcut: (response, None) - display response directly
+        - If smart shortcut resolved locally: (response, None)
         - If AI shortcut: (None, expanded_prompt) - send to AI
         - If not a shortcut: (None, original_input) - pass through
     """
@@ -158,10 +557,17 @@ def process_shortcut(user_input: str) -> Tuple[Optional[str], Optional[str]]:
         except Exception as e:
             return f"{Colors.RED}Error executing shortcut: {str(e)}{Colors.END}", None
 
-    # Check AI shortcuts
+    # Check AI shortcuts, running them locally when the arguments are clear
     if shortcut in AI_SHORTCUTS:
         if not args and shortcut not in ['/list']:
             return f"{Colors.YELLOW}Usage: {shortcut} <arguments>{Colors.END}\nType /help for more info.", None
+        if shortcut in LOCAL_SHORTCUTS:
+            try:
+                response = LOCAL_SHORTCUTS[shortcut](args)
+            except Exception as e:
+                return f"{Colors.RED}Error executing shortcut: {str(e)}{Colors.END}", None
+            if response is not None:
+                return response, None
         expanded = AI_SHORTCUTS[shortcut](args)
         return None, expanded
 
@@ -0,0 +1,144 @@
+# task_client.py
+"""
+Thin client for task_server.py.
+
+When TASK_SERVER_URL is set (e.g. http://127.0.0.1:8765), shortcuts.py,
+cache.py, agent_session.py and main.py import their task functions from
+here instead of tools.py. Each one is a proxy with the same name,
+signature and docstring as the function it stands for, so the agent's
+tool schemas and the shortcut code do not change; calls become JSON-RPC
+requests to the server, carrying TASK_SERVER_TOKEN when it is set.
+"""
+
+import functools
+import http.client
+import inspect
+import itertools
+import os
+from urllib.parse import urlsplit
+
+import agent_tools
+import importer
+import tools
+from task_server import INVALID_PARAMS, TOKEN, dumps, loads, method_name
+
+SERVER_URL = os.environ.get("TASK_SERVER_URL")
+TIMEOUT = 30.0
+
+
+class TaskServerError(Exception):
+    """The task server could not be reached or failed a call."""
+
+
+class TaskClient:
+    """Calls task server methods over HTTP; one short-lived connection per call."""
+
+    def __init__(self, url: str, timeout: float = TIMEOUT, token: str = TOKEN):
+        parts = urlsplit(url)
+        self.url = url
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.timeout = timeout
+        self.headers = {"Content-Type": "application/json"}
+        if token:
+            self.headers["Authorization"] = f"Bearer {token}"
+        self._ids = itertools.count(1)
+
+    def call(self, method: str, params: dict = None):
+        """
+        Run one method on the server and return its decoded result.
+
+        Raises ValueError for invalid arguments, as the local function
+        would, and TaskServerError for anything else.
+        """
+        body = dumps({"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params or {}})
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            conn.request("POST", "/rpc", body, self.headers)
+            response = conn.getresponse()
+            data = response.read()
+            if response.status != 200:
+                raise TaskServerError(
+                    f"the task server at {self.url} refused the call: {response.status} {response.reason}"
+                )
+            reply = loads(data)
+        except (OSError, http.client.HTTPException, ValueError) as e:
+            raise TaskServerError(f"cannot reach the task server at {self.url}: {e}")
+        finally:
+            conn.close()
+        error = reply.get("error")
+        if error:
+            if error["code"] == INVALID_PARAMS:
+                raise ValueError(error["message"])
+            raise TaskServerError(error["message"])
+        return reply["result"]
+
+
+_client = None
+
+
+def get_client() -> TaskClient:
+    global _client
+    if _client is None:
+        if not SERVER_URL:
+            raise TaskServerError("TASK_SERVER_URL is not set")
+        _client = TaskClient(SERVER_URL)
+    return _client
+
+
+def remote(fn):
+    """Proxy for fn that runs it on the task server, keeping its name, signature and docstring."""
+    method = method_name(fn)
+    signature = inspect.signature(fn)
+
+    @functools.wraps(fn)
+    def call(*args, **kwargs):
+        return get_client().call(method, dict(signature.bind(*args, **kwargs).arguments))
+    return call
+
+
+def data_version() -> tuple:
+    """The server's data version token, for cache.py."""
+    return tuple(get_client().call("tools.data_version"))
+
+
+def ping() -> dict:
+    """Check the server is up; returns its database path and write counters."""
+    return get_client().call("ping")
+
+
+# Typed API used by shortcuts.py
+fetch_tasks = remote(tools.fetch_tasks)
+fetch_search = remote(tools.fetch_search)
+fetch_due_today = remote(tools.fetch_due_today)
+fetch_overdue = remote(tools.fetch_overdue)
+fetch_due_this_week = remote(tools.fetch_due_this_week)
+fetch_upcoming = remote(tools.fetch_upcoming)
+fetch_summary = remote(tools.fetch_summary)
+fetch_projects = remote(tools.fetch_projects)
+fetch_fuzzy = remote(tools.fetch_fuzzy)
+find_duplicates = remote(tools.find_duplicates)
+closest_projects = remote(tools.closest_projects)
+write_version = remote(tools.write_version)
+fetch_tags = remote(tools.fetch_tags)
+resolve_task_id = remote(tools.resolve_task_id)
+create_task = remote(tools.create_task)
+edit_task = remote(tools.edit_task)
+tag_task = remote(tools.tag_task)
+remove_task = remote(tools.remove_task)
+compact_db = remote(tools.compact_db)
+import_file = remote(importer.import_file)
+
+# Agent tools used by agent_session.py
+add_task = remote(tools.add_task)
+update_task = remote(tools.update_task)
+delete_task = remote(tools.delete_task)
+list_tasks = remote(agent_tools.list_tasks)
+search_tasks = remote(agent_tools.search_tasks)
+get_tasks_due_today = remote(agent_tools.get_tasks_due_today)
+get_overdue_tasks = remote(agent_tools.get_overdue_tasks)
+get_tasks_due_this_week = remote(agent_tools.get_tasks_due_this_week)
+get_upcoming_tasks = remote(agent_tools.get_upcoming_tasks)
+get_tasks_due_between = remote(agent_tools.get_tasks_due_between)
+get_summary = remote(agent_tools.get_summary)
+get_projects = remote(agent_tools.get_projects)
+get_tags = remote(agent_tools.get_tags)
@@ -1,17 +1,261 @@
-from dataclasses import dataclass, field
-from datetime import datetime 
-from typing import Optional
+from datetime import date, datetime
+from functools import lru_cache
+from operator import attrgetter
+from typing import Callable, Iterable, Optional
+
+STATUSES = ("todo", "in_progress", "done", "blocked")
+PRIORITIES = ("urgent", "high", "normal", "low")
+TASK_FIELDS = ("id", "title", "project", "status", "priority", "due_date",
+               "description", "tags", "created_at")
+
+
+def _parse_due_date(value) -> Optional[date]:
+    """date from a stored YYYY-MM-DD string; anything unparseable reads as no due date."""
+    try:
+        return date.fromisoformat(value[:10])
+    except ValueError:
+        return None
+
+
+def _parse_tags(value) -> list:
+    return [t for t in value.split(",") if t]
+
+
+def normalize_tags(tags) -> list:
+    """
+    Tags from a list or comma-separated string: trimmed, lower-cased,
+    without a leading '#', blanks and repeats dropped, in first-seen order.
+    """
+    if isinstance(tags, str):
+        tags = [tags]
+    seen = {}
+    for item in tags or ():
+        for tag in str(item).split(","):
+            tag = tag.strip().lstrip("#").strip().lower()
+            if tag:
+                seen.setdefault(tag, None)
+    return list(seen)
+
+
+# Column text -> Python value, for columns stored in a different form
+_FROM_SQL = {
+    "due_date": _parse_due_date,
+    "tags": _parse_tags,
+    "created_at": datetime.fromisoformat,
+}
+# Python value -> column text, for the same columns
+_TO_SQL = {
+    "due_date": date.isoformat,
+    "tags": lambda tags: ",".join(tags) or None,
+    "created_at": datetime.isoformat,
+}
+# Values for columns a query did not select
+_DEFAULTS = {"title": "", "project": "", "status": "todo", "priority": "normal",
+             "due_date": None, "description": "", "created_at": None}
+
+
+def _check_type(data: dict, name: str, *types):
+    """data[name] if it is None or one of types, else ValueError naming the field."""
+    value = data.get(name)
+    if value is not None and not isinstance(value, types):
+        expected = " or ".join("string" if t is str else t.__name__ for t in types)
+        raise ValueError(f"{name} must be a {expected}, got {value!r}")
+    return value
+
 
-@dataclass
 class Task:
-    id: str
-    title: str
-    project: str  # "AgriTech DB", "Afrinomad", "Senegal Startups", etc.
-    status: str  # "todo", "in_progress", "done", "blocked"
-    priority: str  # "urgent", "high", "normal", "low"
-    due_date: Optional[datetime] = None
-    description: str = ""
-    tags: list = field(default_factory=list)
-    created_at: datetime = field(default_factory=datetime.now)
-
-    
\ No newline at end of file
+    """
+    One task, with due_date as a date, created_at as a datetime and tags as a list.
+
+    Uses __slots__ so result pages of many thousands of tasks stay small and
+    cheap to build; task_factory() creates them straight from SQLite rows.
+    """
+
+    __slots__ = TASK_FIELDS
+
+    def __init__(self, id: str, title: str, project: str, status: str, priority: str,
+                 due_date: Optional[date] = None, description: str = "",
+                 tags: Optional[list] = None, created_at: Optional[datetime] = None):
+        self.id = id
+        self.title = title
+        self.project = project  # "AgriTech DB", "Afrinomad", "Senegal Startups", etc.
+        self.status = status  # "todo", "in_progress", "done", "blocked"
+        self.priority = priority  # "urgent", "high", "normal", "low"
+        self.due_date = due_date
+        self.description = description
+        self.tags = tags if tags is not None else []
+        self.created_at = created_at if created_at is not None else datetime.now()
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in TASK_FIELDS)
+        return f"Task({fields})"
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Task):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in TASK_FIELDS)
+
+    def to_dict(self, fields: tuple = TASK_FIELDS) -> dict:
+        """JSON-ready mapping of fields, with dates as ISO strings and tags comma-joined as stored."""
+        return dict(zip(fields, sql_encoder(fields)(self)))
+
+    def sql_value(self, name: str):
+        """A field in the form it is stored in the tasks table."""
+        return sql_encoder((name,))(self)[0]
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Task":
+        """
+        Build a validated Task from a plain mapping such as a CSV or JSONL row.
+
+        Blank values fall back to the column defaults. Raises ValueError
+        naming the offending field when a value is missing, of the wrong
+        type or invalid.
+        """
+        for name in ("id", "title", "project", "status", "priority", "description"):
+            _check_type(data, name, str)
+        _check_type(data, "due_date", str, date)
+        _check_type(data, "created_at", str, datetime)
+        tags = _check_type(data, "tags", str, list)
+        if isinstance(tags, list) and not all(isinstance(t, str) for t in tags):
+            raise ValueError(f"tags must be strings, got {tags!r}")
+        if not data.get("id"):
+            raise ValueError("id is required")
+
+        title = (data.get("title") or "").strip()
+        project = (data.get("project") or "").strip()
+        if not title:
+            raise ValueError("title is required")
+        if not project:
+            raise ValueError("project is required")
+
+        status = (data.get("status") or "todo").strip()
+        if status not in STATUSES:
+            raise ValueError(f"status must be one of {', '.join(STATUSES)}, got {status!r}")
+        priority = (data.get("priority") or "normal").strip()
+        if priority not in PRIORITIES:
+            raise ValueError(f"priority must be one of {', '.join(PRIORITIES)}, got {priority!r}")
+
+        due_date = data.get("due_date") or None
+        if isinstance(due_date, str):
+            try:
+                due_date = datetime.fromisoformat(due_date.strip()).date()
+            except ValueError:
+                raise ValueError(f"due_date must be YYYY-MM-DD, got {due_date!r}")
+        elif isinstance(due_date, datetime):
+            due_date = due_date.date()
+
+        created_at = data.get("created_at") or datetime.now()
+        if isinstance(created_at, str):
+            try:
+                created_at = datetime.fromisoformat(created_at.strip())
+            except ValueError:
+                raise ValueError(f"created_at must be an ISO timestamp, got {created_at!r}")
+
+        tags = normalize_tags(tags)
+
+        return cls(
+            id=data["id"],
+            title=title,
+            project=project,
+            status=status,
+            priority=priority,
+            due_date=due_date,
+            description=data.get("description") or "",
+            tags=tags,
+            created_at=created_at,
+        )
+
+
+@lru_cache(maxsize=64)
+def sql_encoder(fields: tuple) -> Callable:
+    """Function mapping a Task to a list of the given fields in their stored form."""
+    get = attrgetter(*fields) if len(fields) > 1 else (lambda task: (getattr(task, fields[0]),))
+    converters = [(i, _TO_SQL[name]) for i, name in enumerate(fields) if name in _TO_SQL]
+
+    def encode(task):
+        values = list(get(task))
+        for i, convert in converters:
+            if values[i] is not None:
+                values[i] = convert(values[i])
+        return values
+
+    return encode
+
+
+def task_factory(fields: Iterable[str], key_size: int = 0) -> Callable:
+    """
+    SQLite row factory building a Task from rows shaped (*sort_key, *fields).
+
+    Columns that were not selected get their defaults. The sort key of
+    the most recent row is kept in factory.last_key, so a pager can encode
+    the position of the last row it fetched.
+    """
+    columns = [(key_size + i, name, _FROM_SQL.get(name)) for i, name in enumerate(fields)]
+    selected = {name for _, name, _ in columns}
+    defaults = [(name, value) for name, value in _DEFAULTS.items() if name not in selected]
+    new = Task.__new__
+
+    def factory(cursor, row):
+        task = new(Task)
+        for index, name, convert in columns:
+            value = row[index]
+            if convert is not None:
+                value = convert(value) if value else ([] if name == "tags" else None)
+            setattr(task, name, value)
+        for name, value in defaults:
+            setattr(task, name, value)
+        if "tags" not in selected:
+            task.tags = []
+        if key_size:
+            factory.last_key = row[:key_size]
+        return task
+
+    factory.last_key = None
+    return factory
+
+
+class TaskPage:
+    """One page of a task query: the tasks, a cursor for the next page, and optionally what is left."""
+
+    __slots__ = ("tasks", "next_cursor", "fields", "rest")
+
+    def __init__(self, tasks: list, next_cursor: Optional[str] = None,
+                 fields: tuple = TASK_FIELDS, rest: Optional[dict] = None):
+        self.tasks = tasks
+        self.next_cursor = next_cursor
+        self.fields = fields
+        self.rest = rest
+
+    def __repr__(self) -> str:
+        return f"TaskPage({len(self.tasks)} tasks, next_cursor={self.next_cursor!r})"
+
+    def to_dict(self) -> dict:
+        """JSON-ready {"tasks": [...], "next_cursor": ...}, plus "rest" when it was computed."""
+        encode, fields = sql_encoder(self.fields), self.fields
+        page = {"tasks": [dict(zip(fields, encode(t))) for t in self.tasks], "next_cursor": self.next_cursor}
+        if self.rest is not None:
+            page["rest"] = self.rest
+        return page
+
+
+class ProjectStats:
+    """Task totals for one project."""
+
+    __slots__ = ("name", "total_tasks", "completed")
+
+    def __init__(self, name: str, total_tasks: int, completed: int):
+        self.name = name
+        self.total_tasks = total_tasks
+        self.completed = completed
+
+    def __repr__(self) -> str:
+        return f"ProjectStats({self.name!r}, total_tasks={self.total_tasks}, completed={self.completed})"
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ProjectStats):
+            return NotImplemented
+        return (self.name, self.total_tasks, self.completed) == (other.name, other.total_tasks, other.completed)
+
+    def to_dict(self) -> dict:
+        return {"name": self.name, "total_tasks": self.total_tasks, "completed": self.completed}
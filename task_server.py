@@ -0,0 +1,362 @@
+# task_server.py
+"""
+Optional local server that shares one tasks.db between several clients.
+
+    python task_server.py --port 8765
+    TASK_SERVER_URL=http://127.0.0.1:8765 python main.py
+
+Clients POST JSON-RPC 2.0 requests to /rpc. The method is the qualified
+name of an exposed function ("tools.fetch_tasks", "agent_tools.list_tasks")
+and params are its keyword arguments.
+
+Reads run on a pool of threads, each with its own WAL connection, so they
+never wait on each other or on the writer. Every write goes through a
+single writer thread, which commits each group of queued writes with one
+transaction (group commit); a write only gets its answer once its group
+has committed. Writes retry with back-off while another process holds
+the lock (see tools.BUSY_RETRIES).
+
+A maintenance thread archives old done tasks and compacts the database
+whenever tools.run_maintenance() says it is due; tools.compact_db (the
+/compact shortcut) runs on the calling thread, outside the writer.
+
+The server listens on localhost. It only runs requests with a JSON
+Content-Type (415 otherwise) whose Host header names the address it is
+bound to (403 otherwise). A web page cannot send a cross-site
+application/json POST without a CORS preflight, which the server never
+answers. A rebound DNS name also fails the Host check. With
+TASK_SERVER_TOKEN (or --token) set, each request must also carry
+"Authorization: Bearer <token>" (401 otherwise). Without a token, any
+local process can still read and change the tasks.
+"""
+
+import argparse
+import hmac
+import json
+import os
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import agent_tools
+import importer
+import tools
+from task_schema import ProjectStats, Task, TaskPage, sql_encoder, task_factory
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+READER_THREADS = 8
+# Most writes folded into one commit
+MAX_GROUP_SIZE = 256
+# Seconds between checks whether maintenance is due
+MAINTENANCE_CHECK = 3600
+# Shared secret clients must send as a bearer token; unset means none
+TOKEN = os.environ.get("TASK_SERVER_TOKEN")
+
+READ_METHODS = (
+    tools.fetch_tasks, tools.fetch_search, tools.fetch_due_today, tools.fetch_due_between,
+    tools.fetch_overdue, tools.fetch_due_this_week, tools.fetch_upcoming,
+    tools.fetch_summary, tools.fetch_projects, tools.fetch_fuzzy, tools.find_duplicates, tools.closest_projects,
+    tools.write_version, tools.fetch_tags, tools.resolve_task_id,
+    tools.list_tasks, tools.search_tasks, tools.get_tasks_due_today, tools.get_overdue_tasks,
+    tools.get_tasks_due_this_week, tools.get_upcoming_tasks, tools.get_tasks_due_between,
+    tools.get_summary, tools.get_projects, tools.get_tags,
+    agent_tools.list_tasks, agent_tools.search_tasks, agent_tools.get_tasks_due_today,
+    agent_tools.get_overdue_tasks, agent_tools.get_tasks_due_this_week, agent_tools.get_upcoming_tasks,
+    agent_tools.get_tasks_due_between, agent_tools.get_summary, agent_tools.get_projects, agent_tools.get_tags,
+)
+WRITE_METHODS = (
+    tools.create_task, tools.edit_task, tools.tag_task, tools.remove_task,
+    tools.add_task, tools.add_tasks, tools.update_task, tools.update_tasks, tools.delete_task,
+    tools.rebuild_counters, importer.import_file,
+)
+# Run on the calling thread outside the writer: a full VACUUM and
+# attaching the archive cannot happen inside its group transaction
+MAINTENANCE_METHODS = (tools.compact_db,)
+
+# JSON-RPC error codes
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+
+
+class UnknownMethod(LookupError):
+    pass
+
+
+def method_name(fn) -> str:
+    return f"{fn.__module__}.{fn.__name__}"
+
+
+def encode_value(value):
+    """json.dumps default= hook for the typed results and arguments of the exposed functions."""
+    if isinstance(value, TaskPage):
+        encode = sql_encoder(value.fields)
+        return {"__page__": {"fields": list(value.fields), "rows": [encode(t) for t in value.tasks],
+                             "next_cursor": value.next_cursor, "rest": value.rest}}
+    if isinstance(value, Task):
+        return {"__task__": value.to_dict()}
+    if isinstance(value, ProjectStats):
+        return {"__project__": value.to_dict()}
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, date):
+        return {"__date__": value.isoformat()}
+    if isinstance(value, tuple):
+        return list(value)
+    raise TypeError(f"cannot send {type(value).__name__} to or from the task server")
+
+
+def decode_value(obj: dict):
+    """json.loads object_hook= reversing encode_value()."""
+    if len(obj) != 1:
+        return obj
+    (tag, value), = obj.items()
+    if tag == "__page__":
+        fields = tuple(value["fields"])
+        build = task_factory(fields)
+        tasks = [build(None, row) for row in value["rows"]]
+        return TaskPage(tasks, value["next_cursor"], fields, value["rest"])
+    if tag == "__task__":
+        return task_factory(tuple(value))(None, tuple(value.values()))
+    if tag == "__project__":
+        return ProjectStats(**value)
+    if tag == "__datetime__":
+        return datetime.fromisoformat(value)
+    if tag == "__date__":
+        return date.fromisoformat(value)
+    return obj
+
+
+def dumps(value) -> bytes:
+    return json.dumps(value, default=encode_value, separators=(",", ":")).encode()
+
+
+def loads(data: bytes):
+    return json.loads(data, object_hook=decode_value)
+
+
+class Writer:
+    """The single writer thread: runs queued writes in groups, one commit per group."""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="task-writer", daemon=True)
+        self.groups = 0
+        self.writes = 0
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def submit(self, fn, params: dict) -> Future:
+        future = Future()
+        self._queue.put((fn, params, future))
+        return future
+
+    def _next_group(self) -> list:
+        first = self._queue.get()
+        if first is None:
+            return None
+        group = [first]
+        while len(group) < MAX_GROUP_SIZE:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)  # finish this group, then stop
+                break
+            group.append(item)
+        return group
+
+    def _run(self):
+        while True:
+            group = self._next_group()
+            if group is None:
+                break
+            results = []
+            try:
+                with tools.group_commit():
+                    for fn, params, future in group:
+                        try:
+                            results.append((future, fn(**params), None))
+                        except Exception as e:
+                            results.append((future, None, e))
+            except Exception as e:
+                # The commit itself failed: nothing in the group was written
+                for _, _, future in group:
+                    future.set_exception(e)
+                continue
+            self.groups += 1
+            self.writes += len(group)
+            for future, result, error in results:
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    server_version = "TaskServer/1.0"
+
+    def do_POST(self):
+        if self.path != "/rpc":
+            self.send_error(404)
+            return
+        if self.headers.get("Host", "").lower() not in self.server.hosts:
+            self.send_error(403, "unexpected Host header")
+            return
+        if self.server.token and not hmac.compare_digest(
+                self.headers.get("Authorization", "").encode(), f"Bearer {self.server.token}".encode()):
+            self.send_error(401, "missing or wrong token")
+            return
+        if self.headers.get_content_type() != "application/json":
+            self.send_error(415, "requests must be application/json")
+            return
+        try:
+            request = loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            call_id = request.get("id")
+            method, params = request["method"], request.get("params") or {}
+        except (ValueError, KeyError, TypeError, AttributeError):
+            self._reply({"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": "invalid request"}})
+            return
+        reply = {"jsonrpc": "2.0", "id": call_id}
+        try:
+            reply["result"] = self.server.call(method, params)
+        except UnknownMethod:
+            reply["error"] = {"code": METHOD_NOT_FOUND, "message": f"unknown method {method}"}
+        except (ValueError, TypeError) as e:
+            reply["error"] = {"code": INVALID_PARAMS, "message": str(e)}
+        except Exception as e:
+            reply["error"] = {"code": SERVER_ERROR, "message": f"{type(e).__name__}: {e}"}
+        self._reply(reply)
+
+    def _reply(self, reply: dict):
+        body = dumps(reply)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TaskServer(HTTPServer):
+    """HTTP JSON-RPC server handling requests on a reader thread pool."""
+
+    def __init__(self, address: tuple, readers: int = READER_THREADS, token: str = TOKEN):
+        super().__init__(address, RequestHandler)
+        self.token = token
+        self.readers = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="task-reader")
+        self.writer = Writer()
+        self.reads = {method_name(fn): fn for fn in READ_METHODS}
+        self.writes = {method_name(fn): fn for fn in WRITE_METHODS}
+        self.maintenance = {method_name(fn): fn for fn in MAINTENANCE_METHODS}
+        self._version_lock = threading.Lock()
+        self._version_conn = None
+        self._stopping = threading.Event()
+        self._maintenance = threading.Thread(target=self._maintain, name="task-maintenance", daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def hosts(self) -> set:
+        """Host header values naming the bound address (port optional when it is 80)."""
+        host, port = self.server_address[:2]
+        names = {host, "localhost"} if host in ("127.0.0.1", "::1") else {host}
+        hosts = {f"{name}:{port}" for name in names}
+        return hosts | names if port == 80 else hosts
+
+    def call(self, method: str, params: dict):
+        if method == "ping":
+            return {"db": tools.DB_PATH, "groups": self.writer.groups, "writes": self.writer.writes}
+        if method == "tools.data_version":
+            return self.data_version()
+        if method in self.reads:
+            return self.reads[method](**params)
+        if method in self.writes:
+            return self.writer.submit(self.writes[method], params).result()
+        if method in self.maintenance:
+            return self.maintenance[method](**params)
+        raise UnknownMethod(method)
+
+    def data_version(self) -> tuple:
+        # Always read PRAGMA data_version on the same connection: its value
+        # is per connection, so mixing reader threads could repeat a token.
+        with self._version_lock:
+            if self._version_conn is None:
+                self._version_conn = sqlite3.connect(tools.DB_PATH, check_same_thread=False)
+            return tools.data_version(self._version_conn)
+
+    def _maintain(self):
+        # Outside the writer: archiving attaches the archive database,
+        # which cannot happen inside the writer's group transaction
+        while True:
+            try:
+                tools.run_maintenance()
+            except Exception as e:
+                print(f"Maintenance failed: {type(e).__name__}: {e}")
+            if self._stopping.wait(MAINTENANCE_CHECK):
+                return
+
+    def process_request(self, request, client_address):
+        self.readers.submit(self._process_request, request, client_address)
+
+    def _process_request(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def serve_forever(self, poll_interval=0.5):
+        self.writer.start()
+        self._maintenance.start()
+        try:
+            super().serve_forever(poll_interval)
+        finally:
+            self.readers.shutdown(wait=True)
+            self._stopping.set()
+            self._maintenance.join()
+            self.writer.stop()
+            if self._version_conn is not None:
+                self._version_conn.close()
+            tools.close_db()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--readers", type=int, default=READER_THREADS)
+    parser.add_argument("--db", default=tools.DB_PATH)
+    parser.add_argument("--token", default=TOKEN, help="require this bearer token (default: $TASK_SERVER_TOKEN)")
+    args = parser.parse_args(argv)
+
+    tools.DB_PATH = args.db
+    tools.init_db()
+    server = TaskServer((args.host, args.port), args.readers, args.token)
+    print(f"Serving {args.db} on {server.url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# test_agent_session.py
+"""
+Tests for tool dispatch in agent_session.py (skipped without the Azure SDK)
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AsyncExitStack
+from types import SimpleNamespace
+
+import pytest
+
+agent_session = pytest.importorskip("agent_session")
+
+
+def test_read_only_calls_run_together_and_writes_stay_ordered():
+    events = []
+    lock = threading.Lock()
+
+    def tool(name):
+        def run(**kwargs):
+            with lock:
+                events.append(("start", name))
+            time.sleep(0.1)
+            with lock:
+                events.append(("end", name))
+            return name
+        return run
+
+    names = ["get_summary", "list_tasks", "get_projects", "add_task", "update_task", "search_tasks"]
+    calls = [SimpleNamespace(id=str(i), function=SimpleNamespace(name=n, arguments="{}")) for i, n in enumerate(names)]
+
+    async def dispatch():
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            session = agent_session.AgentSession(None, {"agent_id": "a", "thread_id": "t"}, executor, AsyncExitStack())
+            session.functions = {n: tool(n) for n in names}
+            return await session.call_tools(calls)
+
+    start = time.perf_counter()
+    assert asyncio.run(dispatch()) == names
+    # Three reads together, two writes one by one, then the last read
+    assert time.perf_counter() - start < 0.5
+    assert {e[1] for e in events[:3]} == {"get_summary", "list_tasks", "get_projects"}
+    assert events[6:10] == [("start", "add_task"), ("end", "add_task"), ("start", "update_task"), ("end", "update_task")]
+
+
+def test_only_turns_that_read_tasks_count_as_read_only():
+    session = agent_session.AgentSession(None, {"agent_id": "a", "thread_id": "t"}, None, AsyncExitStack())
+    assert not session.turn_was_read_only
+    session.turn_tools = {"list_tasks", "get_summary"}
+    assert session.turn_was_read_only
+    session.turn_tools = {"list_tasks", "add_task"}
+    assert not session.turn_was_read_only
+
+
+def test_changed_tools_retire_the_old_agent_and_thread(tmp_path, monkeypatch):
+    from benchmarks.fake_agents import FakeAgentsClient
+
+    monkeypatch.setattr(agent_session, "STATE_PATH", str(tmp_path / "state.json"))
+    agents = FakeAgentsClient()
+
+    def definitions(*names):
+        return [SimpleNamespace(as_dict=lambda n=n: {"function": {"name": n}}) for n in names]
+
+    first = asyncio.run(agent_session.reuse_or_create(agents, "endpoint", definitions("list_tasks")))
+    again = asyncio.run(agent_session.reuse_or_create(agents, "endpoint", definitions("list_tasks")))
+    assert (again["agent_id"], again["thread_id"]) == (first["agent_id"], first["thread_id"])
+
+    changed = asyncio.run(agent_session.reuse_or_create(agents, "endpoint", definitions("list_tasks", "get_tags")))
+    assert changed["thread_id"] != first["thread_id"]
+    assert list(agents.agents_data) == [changed["agent_id"]]
+    assert list(agents.threads_data) == [changed["thread_id"]]
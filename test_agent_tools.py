@@ -0,0 +1,78 @@
+# test_agent_tools.py
+"""
+Tests for the compact agent-facing encoding in agent_tools.py
+"""
+
+import json
+
+import pytest
+
+import agent_tools
+import tools
+
+
+@pytest.fixture(autouse=True)
+def temp_db(tmp_path, monkeypatch):
+    """Point tools at a fresh database for every test."""
+    monkeypatch.setattr(tools, "DB_PATH", str(tmp_path / "tasks.db"))
+    tools.init_db()
+    yield
+    tools.close_db()
+
+
+def seed(count: int):
+    priorities = ["urgent", "high", "normal", "low"]
+    tools.add_tasks([
+        {"title": f"Task {i}", "project": "Big", "priority": priorities[i % 4],
+         "status": "done" if i % 5 == 0 else "todo"}
+        for i in range(count)
+    ])
+
+
+def test_list_is_columnar_truncated_and_summarized():
+    seed(40)
+    output = agent_tools.list_tasks(project="Big", limit=10)
+    assert "\n" not in output and '": ' not in output
+
+    page = json.loads(output)
+    assert page["columns"] == list(tools.LIST_FIELDS)
+    assert len(page["rows"]) == 10
+    assert all(row[4] == "urgent" for row in page["rows"])
+    # 40 tasks, 10 urgent shown: the rest are the other 30
+    assert page["more"].startswith("and 30 more: 10 high, 10 normal, 10 low;")
+    assert "6 done, 24 todo" in page["more"]
+
+    last = json.loads(agent_tools.list_tasks(project="Big", limit=30, cursor=page["next_cursor"]))
+    assert len(last["rows"]) == 30
+    assert "more" not in last and "next_cursor" not in last
+
+
+def test_rest_summary_stops_at_its_limit(monkeypatch):
+    monkeypatch.setattr(tools, "REST_SUMMARY_LIMIT", 8)
+    seed(40)
+    page = json.loads(agent_tools.list_tasks(project="Big", limit=10))
+    assert page["more"] == "and at least 8 more; the next 8: 8 high; 2 done, 6 todo"
+    assert json.loads(agent_tools.list_tasks(project="Big", limit=35))["more"].startswith("and 5 more:")
+
+
+def test_default_page_is_capped_but_shortcut_path_is_full():
+    seed(agent_tools.AGENT_PAGE_SIZE + 5)
+    page = json.loads(agent_tools.list_tasks())
+    assert len(page["rows"]) == agent_tools.AGENT_PAGE_SIZE
+    assert page["more"].startswith("and 5 more")
+
+    full = json.loads(tools.list_tasks())
+    assert len(full["tasks"]) == agent_tools.AGENT_PAGE_SIZE + 5
+
+    capped = json.loads(agent_tools.search_tasks("task", limit=10_000))
+    assert len(capped["rows"]) == min(agent_tools.AGENT_MAX_PAGE_SIZE, agent_tools.AGENT_PAGE_SIZE + 5)
+
+
+def test_errors_and_empty_results():
+    assert json.loads(agent_tools.list_tasks(fields="bogus"))["status"] == "error"
+    assert json.loads(agent_tools.search_tasks("   ")) == {"columns": [], "rows": []}
+    assert json.loads(agent_tools.get_projects()) == {"columns": ["name", "total_tasks", "completed"], "rows": []}
+    # A misspelt project is answered with closest_projects()
+    seed(2)
+    assert json.loads(agent_tools.list_tasks(project="Bgi"))["did_you_mean"] == ["Big"]
+    assert len(json.loads(agent_tools.list_tasks(project="Big"))["rows"]) == 2
@@ -0,0 +1,81 @@
+# test_benchmarks.py
+"""
+Tests for the benchmark data generator, fake agents client and comparison
+"""
+
+import asyncio
+import json
+from collections import Counter
+from datetime import date
+
+from benchmarks import compare
+from benchmarks.fake_agents import FakeAgentsClient
+from benchmarks.generator import build_database, generate_tasks, using_database
+import tools
+
+
+def test_generator_is_seeded_and_skewed(tmp_path):
+    today = date(2026, 3, 2)
+    first = [t.to_dict() for t in generate_tasks(2000, seed=7, today=today)]
+    assert first == [t.to_dict() for t in generate_tasks(2000, seed=7, today=today)]
+    assert first != [t.to_dict() for t in generate_tasks(2000, seed=8, today=today)]
+    assert len({t["id"] for t in first}) == 2000
+
+    projects = Counter(t["project"] for t in first).most_common()
+    assert projects[0][1] > 5 * projects[-1][1]
+    priorities = Counter(t["priority"] for t in first)
+    assert priorities["normal"] > priorities["urgent"] * 5
+
+    path = build_database(str(tmp_path / "bench.db"), 500, seed=7, today=today)
+    with using_database(path):
+        totals = json.loads(tools.get_projects())
+        assert sum(p["total_tasks"] for p in totals) == 500
+
+
+def test_fake_client_runs_a_tool_call_turn():
+    async def turn():
+        agents = FakeAgentsClient()
+        thread = await agents.threads.create()
+        await agents.messages.create(thread_id=thread.id, role="user", content="Give me a summary")
+
+        class Handler:
+            deltas = []
+
+            async def on_thread_run(self, run):
+                if run.status == "requires_action":
+                    call = run.required_action.submit_tool_outputs.tool_calls[0]
+                    assert call.function.name == "get_summary"
+                    await agents.runs.submit_tool_outputs_stream(
+                        thread_id=thread.id, run_id=run.id,
+                        tool_outputs=[{"tool_call_id": call.id, "output": "{}"}], event_handler=self)
+
+            async def on_message_delta(self, delta):
+                self.deltas.append(delta.text)
+
+        agent = await agents.create_agent(model="fake")
+        handler = Handler()
+        async with await agents.runs.stream(thread_id=thread.id, agent_id=agent.id, event_handler=handler) as stream:
+            await stream.until_done()
+        latest = [m async for m in agents.messages.list(thread_id=thread.id, limit=1)]
+        return "".join(handler.deltas), latest[0].content
+
+    streamed, stored = asyncio.run(turn())
+    assert streamed == stored
+    assert "2 characters of tool output" in streamed
+
+
+def test_compare_flags_only_meaningful_slowdowns():
+    def report(**medians):
+        return {"sizes": {"10k": {"tasks": 10, "results": {
+            name: {"median_ms": ms, "p95_ms": ms} for name, ms in medians.items()}}}}
+
+    baseline = report(fast=0.1, slow=10.0, steady=5.0, gone=1.0)
+    current = report(fast=0.3, slow=20.0, steady=5.5, added=1.0)
+    rows = {r["name"]: r["status"] for r in compare.compare(baseline, current, compare.FALLBACK_THRESHOLDS)}
+    # fast tripled but only by 0.2 ms, below min_delta_ms
+    assert rows == {"fast": "ok", "slow": "regressed", "steady": "ok", "gone": "missing", "added": "new"}
+
+    thresholds = {"default": {"max_slowdown": 0.25, "min_delta_ms": 0.5},
+                  "overrides": {"sl*": {"max_slowdown": 2.0}}}
+    assert compare.limits_for("slow", thresholds) == {"max_slowdown": 2.0, "min_delta_ms": 0.5}
+    assert compare.compare(baseline, current, thresholds)[3]["status"] == "ok"
@@ -0,0 +1,50 @@
+# test_context_window.py
+"""
+Tests for the conversation window in context_window.py
+"""
+
+import context_window
+from context_window import ConversationWindow
+
+
+def test_compaction_keeps_recent_turns_and_summarizes_the_rest():
+    window = ConversationWindow(max_turns=3, keep_turns=2)
+    for i in range(3):
+        window.record(f"question {i}", f"answer {i}")
+    assert not window.should_compact()
+
+    window.record("question 3", "answer 3")
+    assert window.should_compact()
+    window.compact()
+
+    assert window.turns == [("question 2", "answer 2"), ("question 3", "answer 3")]
+    assert "question 0" in window.summary and "answer 1" in window.summary
+
+    messages = window.compact_messages()
+    assert messages[0][0] == "user" and "question 0" in messages[0][1]
+    assert messages[1:] == [("user", "question 2"), ("assistant", "answer 2"),
+                            ("user", "question 3"), ("assistant", "answer 3")]
+
+
+def test_summary_stays_bounded(monkeypatch):
+    monkeypatch.setattr(context_window, "SUMMARY_MAX_CHARS", 300)
+    window = ConversationWindow(max_turns=2, keep_turns=1)
+    for i in range(50):
+        window.record(f"question {i} " + "x" * 200, f"answer {i} " + "y" * 300)
+        if window.should_compact():
+            window.compact()
+
+    assert len(window.summary) <= 300
+    assert "question 0 " not in window.summary
+    assert len(window.turns) <= 2
+
+
+def test_state_round_trip():
+    window = ConversationWindow()
+    window.record("hi", "hello")
+    window.summary = "- User: earlier | Agent: reply"
+
+    restored = ConversationWindow.from_state(window.to_state())
+    assert restored.turns == window.turns
+    assert restored.summary == window.summary
+    assert ConversationWindow.from_state(None).turns == []
@@ -0,0 +1,79 @@
+# test_instrumentation.py
+"""
+Tests for the latency instrumentation in instrumentation.py
+"""
+
+import inspect
+import json
+
+import pytest
+
+import instrumentation
+import shortcuts
+import tools
+from instrumentation import Histogram, metrics
+
+
+@pytest.fixture(autouse=True)
+def temp_db(tmp_path, monkeypatch):
+    """Point tools at a fresh database and start every test with empty stats."""
+    monkeypatch.setattr(tools, "DB_PATH", str(tmp_path / "tasks.db"))
+    tools.init_db()
+    metrics.reset()
+    yield
+    tools.close_db()
+    metrics.reset()
+
+
+def test_histogram_percentiles():
+    histogram = Histogram()
+    for ms in range(1, 101):
+        histogram.add(ms / 1000)
+    summary = histogram.summary()
+    assert summary["count"] == 100
+    assert summary["max_ms"] == 100.0
+    # Buckets are 10% wide, so estimates land within 10% above the exact value
+    assert 50 <= summary["p50_ms"] <= 55
+    assert 95 <= summary["p95_ms"] <= 100
+    assert 99 <= summary["p99_ms"] <= 100
+
+
+def test_tools_are_timed_with_sqlite_and_json_breakdown():
+    # Decorated tools keep what FunctionTool reads to build the schema
+    assert tools.list_tasks.__name__ == "list_tasks"
+    assert "limit" in inspect.signature(tools.list_tasks).parameters
+    assert tools.list_tasks.__doc__.startswith("List tasks")
+
+    tools.add_task("Write report", "work")
+    tools.list_tasks(project="work")
+    shortcuts.process_shortcut("/summary")
+
+    operations = metrics.snapshot()["operations"]
+    for name in ("tools.add_task", "tools.list_tasks", "sqlite:list_tasks", "json:list_tasks",
+                 "sqlite:add_task", "shortcuts.process_shortcut", "shortcuts.page_summary"):
+        assert operations[name]["count"] >= 1, name
+
+
+def test_slow_queries_capture_query_plans(monkeypatch):
+    monkeypatch.setattr(instrumentation, "SLOW_QUERY_MS", 0)
+    monkeypatch.setattr(instrumentation, "EXPLAIN_SLOW_QUERIES", True)
+    tools.list_tasks(project="work", status="todo")
+
+    slow = [q for q in metrics.snapshot()["slow_queries"] if q["scope"] == "list_tasks"]
+    assert slow and slow[0]["sql"].startswith("SELECT")
+    assert any("idx_tasks_project_status_rank" in step for step in slow[0]["plan"])
+
+
+def test_stats_shortcut_and_dump(tmp_path):
+    tools.get_projects()
+    response, _ = shortcuts.process_shortcut("/stats")
+    assert "tools.get_projects" in response and "p99 ms" in response
+
+    path = instrumentation.dump_stats(str(tmp_path / "stats.json"))
+    with open(path) as f:
+        assert "tools.get_projects" in json.load(f)["operations"]
+
+    response, _ = shortcuts.process_shortcut("/stats reset")
+    assert "reset" in response
+    # Only the /stats call itself, which finishes after the reset
+    assert list(metrics.snapshot()["operations"]) == ["shortcuts.process_shortcut"]
@@ -0,0 +1,78 @@
+# test_response_cache.py
+"""
+Tests for the on-disk agent response cache
+"""
+
+import json
+import time
+
+import pytest
+
+import tools
+from response_cache import ResponseCache, is_read_only_prompt, is_standalone_prompt, normalize_prompt
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(tools, "DB_PATH", str(tmp_path / "tasks.db"))
+    tools.init_db()
+    cache = ResponseCache(path=str(tmp_path / "responses.db"))
+    yield cache
+    cache.close()
+    tools.close_db()
+
+
+def test_normalize_and_read_only():
+    assert normalize_prompt("  What's URGENT?? ") == normalize_prompt("what’s urgent")
+    assert is_read_only_prompt("Show me a summary of all my tasks")
+    assert is_read_only_prompt("What is due this week?")
+    assert not is_read_only_prompt("Add a task to buy milk")
+    assert not is_read_only_prompt("Mark abc12345 as done")
+    assert not is_read_only_prompt("?!")
+
+
+def test_follow_ups_are_not_cached(cache):
+    assert is_standalone_prompt("What is due this week?")
+    assert is_standalone_prompt("List all tasks in the 'work' project")
+    assert not is_standalone_prompt("And the urgent ones?")
+    assert not is_standalone_prompt("What about work?")
+    assert not is_standalone_prompt("Which of them are overdue?")
+
+    version = cache.version()
+    cache.put("And the urgent ones?", "Only Fix bug.", version)
+    assert cache.get("and the urgent ones") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_hit_until_tasks_change(cache):
+    version = cache.version()
+    cache.put("What's urgent?", "Nothing urgent.", version)
+    assert cache.get("what's urgent") == "Nothing urgent."
+    # Write prompts are never stored or served
+    cache.put("Add a task to buy milk", "Added.", version)
+    assert cache.get("Add a task to buy milk") is None
+
+    task_id = json.loads(tools.add_task("Fix bug", "work", priority="urgent"))["task_id"]
+    assert cache.get("What's urgent?") is None
+    cache.put("What's urgent?", "Fix bug.", cache.version())
+    tools.update_task(task_id, status="done")
+    assert cache.get("What's urgent?") is None
+
+    # A bulk insert moves the version once, too
+    before = tools.write_version()
+    tools.add_tasks([{"title": f"Task {i}", "project": "work"} for i in range(3)])
+    assert tools.write_version() == before + 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_ttl_and_size_eviction(cache):
+    cache.max_entries = 2
+    version = cache.version()
+    for question in ("list work", "list home", "list garden"):
+        cache.put(question, f"reply to {question}", version)
+        time.sleep(0.01)
+    assert cache.get("list work") is None
+    assert cache.stats()["entries"] == 2
+
+    cache.ttl = 0
+    assert cache.get("list garden") is None
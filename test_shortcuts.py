@@ -3,9 +3,23 @@
 Quick test script for the shortcut system
 """
 
-from tools import init_db, add_task
+from datetime import date
+from tools import init_db, add_tasks
 from shortcuts import process_shortcut
+from quick_add import parse_task_text
 import json
+import pytest
+import tools
+
+
+@pytest.fixture(autouse=True)
+def temp_db(tmp_path, monkeypatch):
+    """Point tools at a fresh database for every test, so /add never writes to ./tasks.db."""
+    monkeypatch.setattr(tools, "DB_PATH", str(tmp_path / "tasks.db"))
+    init_db()
+    yield
+    tools.close_db()
+
 
 def setup_test_data():
     """Add some test tasks to the database"""
@@ -23,10 +37,14 @@ def setup_test_data():
     ]
 
     print("Setting up test data...")
-    for title, project, priority, due_date, description in tasks:
-        result = add_task(title, project, priority, due_date, description)
-        data = json.loads(result)
-        print(f"  ✓ Added: {title} [{data['task_id']}]")
+    result = add_tasks([
+        {"title": title, "project": project, "priority": priority,
+         "due_date": due_date, "description": description}
+        for title, project, priority, due_date, description in tasks
+    ])
+    data = json.loads(result)
+    for (title, *_), task_id in zip(tasks, data['task_ids']):
+        print(f"  ✓ Added: {title} [{task_id}]")
 
     print("\nTest data setup complete!\n")
 
@@ -42,6 +60,13 @@ def test_fast_shortcuts():
         "/summary",
         "/urgent",
         "/today",
+        "/overdue",
+        "/week",
+        "/upcoming 3",
+        "/search bug",
+        "/summary",
+        "/cache",
+        "/stats",
         "/help"
     ]
 
@@ -57,9 +82,9 @@ def test_fast_shortcuts():
 
 
 def test_ai_shortcuts():
-    """Test AI shortcut expansion"""
+    """Test smart shortcuts (local execution or AI expansion)"""
     print("\n" + "=" * 60)
-    print("TESTING AI SHORTCUTS (expansion only)")
+    print("TESTING SMART SHORTCUTS (local or AI expansion)")
     print("=" * 60)
 
     shortcuts_to_test = [
@@ -67,7 +92,6 @@ def test_ai_shortcuts():
         "/list work",
         "/done abc123ef",
         "/delete xyz789",
-        "/search meeting",
     ]
 
     for shortcut in shortcuts_to_test:
@@ -79,6 +103,113 @@ def test_ai_shortcuts():
             print(f"Expanded to: {modified_input}")
 
 
+def test_quick_add_parser():
+    """Test the local /add parser"""
+    projects = ["work", "grocery", "AgriTech DB"]
+    friday = date(2026, 10, 16)
+
+    assert parse_task_text("Buy milk for grocery project urgent", projects, friday) == {
+        "title": "Buy milk", "project": "grocery", "priority": "urgent", "due_date": None}
+    assert parse_task_text("Review PR for work high priority due tomorrow", projects, friday) == {
+        "title": "Review PR", "project": "work", "priority": "high", "due_date": "2026-10-17"}
+    assert parse_task_text("Fix schema in agritech db by mon", projects, friday)["due_date"] == "2026-10-19"
+    assert parse_task_text("Plan demo work next fri", projects, friday)["due_date"] == "2026-10-23"
+
+    # A weekday word inside the title is not a due date
+    projects = projects + ["car"]
+    assert parse_task_text("Buy sun cream for grocery", projects, friday) is None
+    assert parse_task_text("Fix the sat nav for car", projects, friday) is None
+    assert parse_task_text("Wed planning for work", projects, friday) is None
+    assert parse_task_text("Call the garage for car sat", projects, friday)["due_date"] == "2026-10-17"
+
+    # Not confident: no known project, two projects, or two dates
+    assert parse_task_text("Buy milk", projects, friday) is None
+    assert parse_task_text("Buy milk for grocery and work", projects, friday) is None
+    assert parse_task_text("Ship work today or tomorrow", projects, friday) is None
+
+
+def test_smart_shortcuts_run_locally():
+    """Test that /add, /list, /done and /delete skip the AI when the input is clear"""
+    add_tasks([{"title": "Seed", "project": "work"}])
+
+    response, modified_input = process_shortcut("/add Write report for work urgent")
+    assert modified_input is None and "Write report" in response
+    task_id = json.loads(tools.list_tasks(project="work", priority="urgent"))["tasks"][0]["id"]
+
+    response, modified_input = process_shortcut("/list WORK")
+    assert modified_input is None and "Found 2 task(s)" in response
+
+    response, modified_input = process_shortcut(f"/done {task_id[:-6]}")
+    assert modified_input is None and f"Marked [{task_id}] as done" in response
+    response, modified_input = process_shortcut(f"/delete {task_id}")
+    assert modified_input is None and "Deleted" in response
+    response, modified_input = process_shortcut(f"/done {task_id}")
+    assert "not found" in response
+    assert "Compacted" in process_shortcut("/compact")[0]
+    assert "Usage" in process_shortcut("/compact now")[0]
+
+    # Ambiguous input still goes to the AI
+    assert process_shortcut("/add Buy milk")[0] is None
+    assert process_shortcut("/list somewhere")[0] is None
+    assert process_shortcut("/done the milk task")[0] is None
+
+
+def test_typos_resolve_locally():
+    add_tasks([{"title": "Prepare quarterly budget", "project": "work"},
+               {"title": "Plant tomatoes", "project": "garden"},
+               {"title": "Paint fence", "project": "garage"}])
+
+    response, modified_input = process_shortcut("/list wrok")
+    assert modified_input is None and "showing 'work'" in response and "quarterly budget" in response
+    assert "Did you mean: garage, garden?" in process_shortcut("/list gardge")[0]
+
+    response = process_shortcut("/search quartely")[0]
+    assert "No exact matches" in response and "Prepare quarterly budget" in response
+
+    response = process_shortcut("/add Prepare quartely budget for work")[0]
+    assert "Possible duplicate of" in response and "Prepare quarterly budget" in response
+
+
+def test_tag_shortcut():
+    task_ids = json.loads(add_tasks([{"title": "Fix sink", "project": "house", "tags": "home"},
+                                     {"title": "Post parcel", "project": "chores", "tags": "errand"}]))["task_ids"]
+
+    assert "#errand" in process_shortcut("/tag")[0]
+    response = process_shortcut(f"/tag {task_ids[0]} +errand -home")[0]
+    assert "now has #errand" in response
+    response = process_shortcut("/tag errand")[0]
+    assert "Found 2 task(s)" in response and "Fix sink" in response and "#errand" in response
+    assert "Found 2 task(s)" in process_shortcut("/tag home or errand")[0]
+    assert "No tasks found" in process_shortcut("/tag home errand")[0]
+    assert "not found" in process_shortcut("/tag 0000aaaa +x")[0]
+
+
+def test_listings_page_lazily(monkeypatch):
+    """Test that /urgent shows one terminal page and /next, /prev move through the rest"""
+    import shortcuts
+    monkeypatch.setattr(shortcuts, "page_size", lambda: 5)
+    add_tasks([{"title": f"Urgent {i}", "project": "work", "priority": "urgent"} for i in range(12)])
+    fetched = []
+
+    def fetch_tasks(**kwargs):
+        page = tools.fetch_tasks(**kwargs)
+        fetched.extend(page.tasks)
+        return page
+    monkeypatch.setattr(shortcuts, "fetch_tasks", fetch_tasks)
+
+    first, _ = process_shortcut("/urgent")
+    assert "Tasks 1–5:" in first and "Urgent 4" in first and "Urgent 5" not in first
+    assert "/next for more" in first and "/prev" not in first
+    # The page shown plus one page of look-ahead, not all 12 rows
+    assert len(fetched) == 10
+    assert "Tasks 6–10:" in process_shortcut("/next")[0]
+    last, _ = process_shortcut("/next")
+    assert "Tasks 11–12:" in last and "/next" not in last
+    assert "last page" in process_shortcut("/next")[0]
+    assert process_shortcut("/prev")[0].count("Urgent") == 5
+    assert "Your Projects" in process_shortcut("/projects")[0]
+
+
 def test_unknown_shortcuts():
     """Test unknown shortcuts"""
     print("\n" + "=" * 60)
@@ -110,5 +241,5 @@ if __name__ == "__main__":
     print("\n" + "=" * 60)
     print("✅ ALL TESTS COMPLETE")
     print("=" * 60)
-    print("\nNote: AI shortcuts only show expansion (they need Azure AI to execute)")
+    print("\nNote: shortcuts that fall back to the AI only show expansion (they need Azure AI to execute)")
     print("Run 'python main.py' to test AI shortcuts end-to-end\n")
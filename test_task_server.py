@@ -0,0 +1,103 @@
+# test_task_server.py
+"""
+Tests for the task server and its thin client
+"""
+
+import http.client
+import inspect
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import pytest
+
+import agent_tools
+import task_client
+import tools
+from task_client import TaskClient, TaskServerError
+from task_schema import Task, TaskPage
+from task_server import TaskServer
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    """A task server on a free port over a fresh database, with the client proxies pointed at it."""
+    monkeypatch.setattr(tools, "DB_PATH", str(tmp_path / "tasks.db"))
+    tools.init_db()
+    server = TaskServer(("127.0.0.1", 0), readers=4)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(task_client, "_client", TaskClient(server.url))
+    yield server
+    server.shutdown()
+    thread.join()
+    server.server_close()
+
+
+def test_typed_calls_round_trip(server):
+    created = task_client.create_task("Ship release", "work", "urgent", date(2026, 3, 1))
+    assert isinstance(created, Task) and created.due_date == date(2026, 3, 1)
+
+    page = task_client.fetch_tasks(project="work", limit=10)
+    assert isinstance(page, TaskPage) and page.tasks[0].id == created.id
+    assert page.tasks[0].due_date == date(2026, 3, 1)
+    assert [p.name for p in task_client.fetch_projects()] == ["work"]
+    assert task_client.tag_task(created.id, add=["release"]) == ["release"]
+    assert [t.id for t in task_client.fetch_tasks(tags=("release",)).tasks] == [created.id]
+    assert task_client.edit_task(created.id, status="done") is True
+    assert task_client.remove_task("missing") is False
+
+    # Agent tools keep their schema-bearing signature and compact output
+    assert task_client.list_tasks.__doc__ == agent_tools.list_tasks.__doc__
+    assert inspect.signature(task_client.list_tasks) == inspect.signature(agent_tools.list_tasks)
+    assert json.loads(task_client.list_tasks(project="work"))["rows"][0][3] == "done"
+
+    with pytest.raises(ValueError):
+        task_client.fetch_tasks(cursor="not-a-cursor")
+    with pytest.raises(TaskServerError):
+        TaskClient(server.url).call("tools.no_such_function")
+
+
+def test_concurrent_writes_are_group_committed(server):
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(lambda i: json.loads(task_client.add_task(f"Task {i}", "work")), range(200)))
+    assert all(r["status"] == "created" for r in results)
+    assert task_client.fetch_summary() == {"work": {"todo": 200}}
+
+    info = task_client.ping()
+    assert info["writes"] == 200
+    assert info["groups"] < 200  # several writes shared a commit
+
+    # Writes made through the server move the version clients cache on
+    before = task_client.data_version()
+    task_client.add_task("One more", "work")
+    assert task_client.data_version() != before
+
+
+def test_cross_site_requests_are_refused(server):
+    def post(headers):
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+        try:
+            conn.request("POST", "/rpc", json.dumps({"jsonrpc": "2.0", "id": 1, "method": "tools.fetch_summary"}),
+                         headers)
+            return conn.getresponse().status
+        finally:
+            conn.close()
+
+    # A form or fetch() without a preflight can only send text/plain and friends
+    assert post({"Content-Type": "text/plain"}) == 415
+    assert post({}) == 415
+    # A DNS-rebound name reaches the socket but not the handler
+    assert post({"Content-Type": "application/json", "Host": f"evil.example:{server.server_address[1]}"}) == 403
+    assert post({"Content-Type": "application/json; charset=utf-8"}) == 200
+    assert post({"Content-Type": "application/json", "Host": f"localhost:{server.server_address[1]}"}) == 200
+
+
+def test_token_is_required_when_set(server):
+    server.token = "s3cret"
+    with pytest.raises(TaskServerError, match="401"):
+        task_client.fetch_summary()
+    with pytest.raises(TaskServerError, match="401"):
+        TaskClient(server.url, token="wrong").call("ping")
+    assert TaskClient(server.url, token="s3cret").call("tools.fetch_summary") == {}
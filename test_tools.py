@@ -0,0 +1,474 @@
+# test_tools.py
+"""
+Tests for the SQLite layer in tools.py
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import date, timedelta
+
+import pytest
+
+import tools
+
+
+@pytest.fixture(autouse=True)
+def temp_db(tmp_path, monkeypatch):
+    """Point tools at a fresh database for every test."""
+    monkeypatch.setattr(tools, "DB_PATH", str(tmp_path / "tasks.db"))
+    tools.init_db()
+    yield
+    tools.close_db()
+
+
+def test_connection_is_reused_per_thread():
+    assert tools.get_connection() is tools.get_connection()
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(tools.get_connection()))
+    thread.start()
+    thread.join()
+    assert other[0] is not tools.get_connection()
+
+
+def test_connection_uses_wal():
+    mode = tools.get_connection().execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+
+
+def test_close_db_reopens_on_next_use():
+    conn = tools.get_connection()
+    tools.close_db()
+    assert tools.get_connection() is not conn
+    assert json.loads(tools.list_tasks())["tasks"] == []
+
+
+def test_migrations_upgrade_legacy_database(tmp_path, monkeypatch):
+    legacy = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(legacy)
+    conn.execute("""
+        CREATE TABLE tasks (id TEXT PRIMARY KEY, title TEXT NOT NULL, project TEXT NOT NULL,
+                            status TEXT DEFAULT 'todo', priority TEXT DEFAULT 'normal',
+                            due_date TEXT, description TEXT, tags TEXT, created_at TEXT)
+    """)
+    conn.execute("INSERT INTO tasks (id, title, project, priority) VALUES ('a1', 'Old task', 'work', 'urgent')")
+    conn.execute("""INSERT INTO tasks (id, title, project, due_date, tags) VALUES
+                    ('a2', 'Timestamped', 'work', '2026-02-09T10:30:00', 'Home, #errand'),
+                    ('a3', 'Vague', 'work', 'someday', NULL)""")
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setattr(tools, "DB_PATH", legacy)
+    tools.init_db()
+    tools.init_db()  # re-running must be a no-op
+    conn = tools.get_connection()
+    assert tools.schema_version(conn) == tools.MIGRATIONS[-1][0]
+    assert conn.execute("SELECT priority_rank FROM tasks WHERE id = 'a1'").fetchone()[0] == 1
+    assert conn.execute("SELECT due_date, due_day FROM tasks WHERE id IN ('a2', 'a3') ORDER BY id").fetchall() == [
+        ("2026-02-09", date(2026, 2, 9).toordinal()), ("someday", None)]
+    assert [t.id for t, _ in tools.find_duplicates("Old tasks", "work")] == ["a1"]
+    assert [(t.id, t.tags) for t in tools.fetch_tasks(tags="errand", fields="id,tags").tasks] == [
+        ("a2", ["home", "errand"])]
+
+    # Space is only reclaimed once the file is converted, by /compact --full
+    tools.add_tasks([{"title": f"Filler {i}", "project": "bulk", "description": "x" * 500} for i in range(300)])
+    with conn:
+        conn.execute("DELETE FROM tasks WHERE project = 'bulk'")
+    assert tools.compact_db() == {}
+    assert tools.compact_db(full=True)["main"] > 0
+    assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    assert [t.id for t in tools.fetch_search("timestamped").tasks] == ["a2"]
+    assert [t.id for t in tools.fetch_tasks(tags="home").tasks] == ["a2"]
+
+
+def test_full_compaction_of_a_small_legacy_database(tmp_path, monkeypatch):
+    legacy = str(tmp_path / "small.db")
+    conn = sqlite3.connect(legacy)
+    conn.execute("""
+        CREATE TABLE tasks (id TEXT PRIMARY KEY, title TEXT NOT NULL, project TEXT NOT NULL,
+                            status TEXT DEFAULT 'todo', priority TEXT DEFAULT 'normal',
+                            due_date TEXT, description TEXT, tags TEXT, created_at TEXT)
+    """)
+    conn.close()
+    monkeypatch.setattr(tools, "DB_PATH", legacy)
+    tools.init_db()
+    tools.add_task("Only task", "work")
+
+    # The switch adds pointer-map pages, so a file with nothing to free may grow
+    assert tools.compact_db(full=True) == {"main": 0}
+    assert tools.get_connection().execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    assert [t.title for t in tools.fetch_tasks().tasks] == ["Only task"]
+
+
+def test_listing_is_served_by_index():
+    conn = tools.get_connection()
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM tasks WHERE project = ? AND status = ? ORDER BY priority_rank",
+        ("work", "todo")
+    ).fetchall()
+    details = " ".join(row[-1] for row in plan)
+    assert "idx_tasks_project_status_rank" in details
+    assert "TEMP B-TREE" not in details
+
+
+def test_list_tasks_orders_by_priority():
+    for priority in ("low", "urgent", "normal", "high"):
+        tools.add_task(f"{priority} task", "work", priority)
+    tasks = json.loads(tools.list_tasks(project="work"))["tasks"]
+    assert [t["priority"] for t in tasks] == ["urgent", "high", "normal", "low"]
+
+    # Writers outside tools.py only set priority; triggers fill in priority_rank
+    conn = tools.get_connection()
+    with conn:
+        conn.execute("INSERT INTO tasks (id, title, project, priority) VALUES ('outside1', 'Outside', 'work', 'urgent')")
+        conn.execute("UPDATE tasks SET priority = 'low' WHERE title = 'high task'")
+    tasks = json.loads(tools.list_tasks(project="work"))["tasks"]
+    assert [t["title"] for t in tasks] == ["urgent task", "Outside", "normal task", "low task", "high task"]
+    assert [t["title"] for t in json.loads(tools.list_tasks(priority="urgent"))["tasks"]] == ["urgent task", "Outside"]
+
+
+def test_search_ranks_title_matches_first():
+    tools.add_task("Prepare meeting notes", "work", description="")
+    tools.add_task("Write report", "work", description="Summarise the last meeting")
+    tools.add_task("Buy milk", "grocery")
+    titles = [t["title"] for t in json.loads(tools.search_tasks("meet"))["tasks"]]
+    assert titles == ["Prepare meeting notes", "Write report"]
+
+
+def test_search_phrase_and_index_sync():
+    created = json.loads(tools.add_task("Weekly sync call", "work"))
+    tools.add_task("Call about the weekly budget", "work")
+    titles = [t["title"] for t in json.loads(tools.search_tasks('"weekly sync"'))["tasks"]]
+    assert titles == ["Weekly sync call"]
+
+    tools.delete_task(created["task_id"])
+    assert json.loads(tools.search_tasks('"weekly sync"'))["tasks"] == []
+    assert json.loads(tools.search_tasks('" "'))["tasks"] == []
+
+
+def test_fuzzy_search_and_duplicate_flags():
+    first = json.loads(tools.add_task("Review release notes", "work"))
+    assert "possible_duplicates" not in first
+    tools.add_tasks([{"title": "Renew passport", "project": "personal"}])
+
+    # Both the trigger and the bulk-insert path keep the trigram index current
+    assert [t.title for t in tools.fetch_fuzzy("reveiw relase").tasks] == ["Review release notes"]
+    assert json.loads(tools.search_tasks("pasport", fuzzy=True))["tasks"][0]["title"] == "Renew passport"
+    with pytest.raises(ValueError):
+        tools.fetch_fuzzy("pasport", cursor="abc")
+
+    # The best match is found even behind more recent titles sharing trigrams
+    tools.add_tasks([{"title": f"Renewal notice {i}", "project": "letters"} for i in range(tools.FUZZY_CANDIDATES + 10)])
+    assert tools.fetch_fuzzy("renew pasport", limit=1).tasks[0].title == "Renew passport"
+
+    typo = json.loads(tools.add_task("Reveiw release notes", "work"))
+    assert typo["status"] == "created"
+    assert [d["task_id"] for d in typo["possible_duplicates"]] == [first["task_id"]]
+    assert "possible_duplicates" not in json.loads(tools.add_task("Review release notes", "personal"))
+    assert [t.title for t, _ in tools.find_duplicates("Renew pasport", "personal")] == ["Renew passport"]
+
+    # Done and deleted tasks are not flagged
+    tools.update_task(first["task_id"], status="done")
+    tools.delete_task(typo["task_id"])
+    assert tools.find_duplicates("Review release notes", "work") == []
+    assert tools.closest_projects("wrok") == ["work"]
+    assert tools.closest_projects("nowhere") == []
+
+
+def test_tag_filters_use_the_tag_index():
+    home = json.loads(tools.add_task("Fix sink", "house", tags="Home, #repair"))
+    assert home["tags"] == ["home", "repair"]
+    tools.add_tasks([{"title": "Buy paint", "project": "house", "tags": ["home", "errand"]},
+                     {"title": "Post parcel", "project": "chores", "tags": "errand"}])
+
+    def titles(**kwargs):
+        return sorted(t["title"] for t in json.loads(tools.list_tasks(**kwargs))["tasks"])
+    assert titles(tags="home") == ["Buy paint", "Fix sink"]
+    assert titles(tags="home,errand") == ["Buy paint"]
+    assert titles(tags="repair,errand", match="any") == ["Buy paint", "Fix sink", "Post parcel"]
+    assert titles(tags="errand", project="chores") == ["Post parcel"]
+    assert json.loads(tools.list_tasks(tags="home", match="some"))["status"] == "error"
+
+    # Replacing, editing and deleting keep task_tags in step
+    tools.update_task(home["task_id"], tags="garden")
+    assert titles(tags="home") == ["Buy paint"] and titles(tags="garden") == ["Fix sink"]
+    assert tools.tag_task(home["task_id"], add=["home"], remove=["garden"]) == ["home"]
+    assert tools.tag_task("missing", add=["x"]) is None
+    tools.update_task(home["task_id"], priority="urgent")
+    assert titles(tags="home", priority="urgent") == ["Fix sink"]
+    assert tools.fetch_tags() == [("errand", 2), ("home", 2)]
+    tools.delete_task(home["task_id"])
+    assert tools.get_connection().execute("SELECT COUNT(*) FROM task_tags WHERE tag = 'home'").fetchone()[0] == 1
+
+    # A page of tasks with all the tags is read in order off the task_tags key
+    sql, params, keys = tools._keyed(tools.list_source(tags=["home", "errand"]), ("id",))
+    plan = " ".join(row[-1] for row in tools.get_connection().execute(
+        f"EXPLAIN QUERY PLAN {sql} ORDER BY {keys} LIMIT 10", params))
+    assert "USING PRIMARY KEY (tag=?)" in plan and "TEMP B-TREE" not in plan
+
+
+def test_archive_moves_old_done_tasks_and_reads_span_both():
+    tools.add_tasks([{"title": f"Old report {i}", "project": "work", "status": "done", "tags": "q1"}
+                     for i in range(5)] + [{"title": "Recent report", "project": "work", "status": "done"},
+                                           {"title": "Open report", "project": "home"}])
+    conn = tools.get_connection()
+    with conn:
+        conn.execute("UPDATE tasks SET done_day = done_day - 100 WHERE title LIKE 'Old%'")
+    assert tools.archive_tasks(older_than_days=90, batch_size=2) == 5
+    assert tools.archive_tasks(older_than_days=90) == 0
+
+    # Gone from the hot indexes, found again with include_archived
+    def titles(tool, *args, **kwargs):
+        return sorted(t["title"] for t in json.loads(tool(*args, **kwargs))["tasks"])
+    assert titles(tools.search_tasks, "report") == ["Open report", "Recent report"]
+    assert len(titles(tools.search_tasks, "report", include_archived=True)) == 7
+    assert titles(tools.list_tasks, tags="q1") == []
+    assert len(titles(tools.list_tasks, tags="q1", include_archived=True)) == 5
+    for table in ("task_tags", "title_bands"):
+        assert conn.execute(f"SELECT COUNT(*) FROM {table} WHERE task_rowid <= 5").fetchone()[0] == 0
+    assert json.loads(tools.get_summary()) == {"home": {"todo": 1}, "work": {"done": 1}}
+    assert json.loads(tools.get_summary(include_archived=True))["work"] == {"done": 6}
+
+    # Pages of the combined listing walk every task once
+    seen, cursor = [], None
+    while True:
+        page = tools.fetch_tasks(limit=3, cursor=cursor, include_archived=True)
+        seen += [t.id for t in page.tasks]
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+    assert len(seen) == len(set(seen)) == 7
+    with pytest.raises(ValueError):
+        tools.fetch_tasks(cursor=cursor or tools.fetch_tasks(limit=1).next_cursor, include_archived=True)
+
+    # Maintenance runs once per interval unless forced
+    assert tools.run_maintenance(force=True)["archived"] == 0
+    assert tools.run_maintenance() is None
+
+
+def test_archive_is_only_created_when_needed():
+    tools.add_tasks([{"title": "Finished", "project": "work", "status": "done"}])
+    assert tools.run_maintenance() == {"archived": 0, "freed_pages": {"main": 0}}
+    assert not os.path.exists(tools.archive_path())
+    assert json.loads(tools.get_summary(include_archived=True)) == {"work": {"done": 1}}
+
+
+def test_task_ids_are_time_ordered_and_resolve_by_prefix():
+    ids = [tools.new_task_id() for _ in range(1000)]
+    assert ids == sorted(ids) and len(set(ids)) == 1000
+    assert all(len(i) == 20 and not set(i) & set("ilou") for i in ids)
+
+    first = json.loads(tools.add_task("Write report", "work"))["task_id"]
+    second = json.loads(tools.add_task("Send report", "work"))["task_id"]
+    tools.add_tasks([{"id": "0a1b2c3d", "title": "Legacy task", "project": "work"}])
+    assert first < second
+
+    # The shortest unambiguous start of an ID stands in for it
+    shared = next(i for i in range(20) if first[i] != second[i])  # length of the common start
+    assert tools.resolve_task_id(second[:shared + 1]) == second
+    assert tools.resolve_task_id("0a1b") == "0a1b2c3d"
+    assert tools.resolve_task_id("0a1b2c3d") == "0a1b2c3d"
+    assert tools.resolve_task_id(first[:3]) is None  # shorter than MIN_ID_PREFIX
+    assert tools.resolve_task_id("zzzz") is None
+    with pytest.raises(ValueError, match="several tasks"):
+        tools.resolve_task_id(first[:shared])
+
+    assert json.loads(tools.update_task(first[:shared + 1], status="done")) == {"status": "updated", "task_id": first}
+    assert json.loads(tools.update_task(first[:shared]))["status"] == "error"
+    assert json.loads(tools.delete_task("0a1b2c3")) == {"status": "deleted", "task_id": "0a1b2c3d"}
+    assert json.loads(tools.delete_task("0a1b"))["status"] == "not_found"
+
+    # A prefix is a range scan of the primary-key index
+    plan = " ".join(row[-1] for row in tools.get_connection().execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM tasks WHERE id > ? AND id < ? ORDER BY id LIMIT 3", ("01", "01\U0010ffff")))
+    assert "USING COVERING INDEX sqlite_autoindex_tasks_1 (id>? AND id<?)" in plan
+
+
+def test_keyset_pagination_walks_every_task_once():
+    for i in range(12):
+        tools.add_task(f"Task {i}", "work", ("urgent", "high", "normal", "low")[i % 4])
+    full = json.loads(tools.list_tasks(fields="id"))["tasks"]
+
+    seen, cursor = [], None
+    while True:
+        page = json.loads(tools.list_tasks(limit=5, cursor=cursor, fields="id"))
+        assert len(page["tasks"]) <= 5
+        seen += page["tasks"]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert seen == full
+    assert set(full[0]) == {"id"}
+
+
+def test_invalid_cursor_and_fields_are_reported():
+    assert json.loads(tools.list_tasks(cursor="not-a-cursor"))["status"] == "error"
+    assert json.loads(tools.search_tasks("x", fields="id,nope"))["status"] == "error"
+    list_cursor = tools._encode_cursor("list", [1, 1])
+    assert json.loads(tools.get_tasks_due_today(cursor=list_cursor))["status"] == "error"
+
+
+def test_typed_api_builds_tasks_from_rows():
+    from datetime import date
+    from task_schema import Task
+
+    created = tools.create_task("Ship release", "work", "urgent", "2026-03-01")
+    tools.add_tasks([{"title": "Tagged", "project": "work", "tags": "a,b"}])
+    with pytest.raises(ValueError):
+        tools.create_task("Bad date", "work", due_date="next week")
+
+    page = tools.fetch_tasks(project="work", limit=1)
+    task = page.tasks[0]
+    assert isinstance(task, Task) and not hasattr(task, "__dict__")
+    assert task.id == created.id and task.due_date == date(2026, 3, 1)
+    assert page.next_cursor and page.rest is None
+    assert tools.fetch_tasks(cursor=page.next_cursor, fields="id,tags").tasks[0].tags == ["a", "b"]
+    assert [p.to_dict() for p in tools.fetch_projects()] == [{"name": "work", "total_tasks": 2, "completed": 0}]
+
+    # The JSON tools encode the same objects in the stored form
+    listed = json.loads(tools.list_tasks(project="work", limit=1))
+    assert listed["tasks"][0]["due_date"] == "2026-03-01"
+    assert listed["next_cursor"] == page.next_cursor
+    assert json.loads(tools.add_task("Bad", "work", due_date="soon"))["status"] == "error"
+
+
+def test_date_ranges_use_day_numbers():
+    today = date.today()
+    for title, offset, status in (("Late", -3, "todo"), ("Late but done", -2, "done"), ("Now", 0, "todo"),
+                                  ("Soon", 3, "in_progress"), ("Later", 30, "todo"), ("Undated", None, "todo")):
+        due = (today + timedelta(days=offset)).isoformat() if offset is not None else None
+        tools.add_tasks([{"title": title, "project": "work", "status": status, "due_date": due}])
+
+    titles = lambda tool, *args: [t["title"] for t in json.loads(tool(*args))["tasks"]]
+    assert titles(tools.get_overdue_tasks) == ["Late"]
+    assert titles(tools.get_upcoming_tasks, 7) == ["Now", "Soon"]
+    assert titles(tools.get_tasks_due_between) == ["Late", "Now", "Soon", "Later"]
+    assert titles(tools.get_tasks_due_this_week)[0] == "Now"
+    assert json.loads(tools.get_tasks_due_between("soon"))["status"] == "error"
+
+    # Writers outside tools.py only set due_date; a trigger fills in due_day
+    conn = tools.get_connection()
+    with conn:
+        conn.execute("UPDATE tasks SET due_date = ? WHERE title = 'Undated'", ((today - timedelta(days=9)).isoformat(),))
+    assert titles(tools.get_overdue_tasks) == ["Undated", "Late"]
+
+    plan = " ".join(row[-1] for row in conn.execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM tasks WHERE status != 'done' AND due_day < ? ORDER BY due_day",
+        (today.toordinal(),)))
+    assert "idx_tasks_open_due" in plan and "TEMP B-TREE" not in plan
+
+
+def test_add_tasks_is_all_or_nothing():
+    result = json.loads(tools.add_tasks([
+        {"title": "One", "project": "work"},
+        {"title": "Two", "project": "work", "priority": "sometime"},
+    ]))
+    assert result["status"] == "error" and result["message"].startswith("task 1:")
+    assert json.loads(tools.list_tasks())["tasks"] == []
+
+    result = json.loads(tools.add_tasks([
+        {"title": "One", "project": "work", "due_date": "2026-03-01"},
+        {"title": "Two", "project": "home", "priority": "urgent"},
+    ]))
+    assert result["count"] == 2
+
+    # A taken or mistyped field is an error result, not an exception
+    taken = json.loads(tools.add_tasks([{"id": result["task_ids"][0], "title": "Three", "project": "work"}]))
+    assert taken == {"status": "error", "message": f"task id {result['task_ids'][0]!r} already exists"}
+    mistyped = json.loads(tools.add_tasks([{"title": "Four", "project": "work", "due_date": 20260301}]))
+    assert mistyped["status"] == "error" and "due_date must be" in mistyped["message"]
+
+    updated = json.loads(tools.update_tasks([
+        {"task_id": result["task_ids"][0], "status": "done"},
+        {"task_id": result["task_ids"][1], "priority": "low"},
+        {"task_id": "missing", "status": "done"},
+    ]))
+    assert updated["count"] == 2
+    tasks = {t["id"]: t for t in json.loads(tools.list_tasks())["tasks"]}
+    assert tasks[result["task_ids"][0]]["status"] == "done"
+    assert tasks[result["task_ids"][1]]["priority"] == "low"
+
+
+def test_import_file_streams_csv_and_jsonl(tmp_path):
+    import importer
+
+    csv_path = tmp_path / "tasks.csv"
+    csv_path.write_text(
+        "id,title,project,priority,due_date\n"
+        "a1,Plan sprint,work,high,2026-03-01\n"
+        "a2,,work,low,\n"
+        "a3,Buy milk,grocery,,\n"
+    )
+    report = importer.import_file(str(csv_path), chunk_size=2)
+    assert (report["imported"], report["rejected"]) == (2, 1)
+    assert report["errors"] == ["line 3: title is required"]
+
+    jsonl_path = tmp_path / "tasks.jsonl"
+    jsonl_path.write_text(
+        '{"id": "a1", "title": "Plan sprint", "project": "work"}\n'
+        '{"title": "Write docs", "project": "work", "tags": ["docs"]}\n'
+        'not json\n'
+        '{"title": 5, "project": "work"}\n'
+        '{"title": "Tagged", "project": "work", "tags": 3}\n'
+        '{"title": "Ship it", "project": "work"}\n'
+    )
+    report = importer.import_file(str(jsonl_path), chunk_size=2)
+    assert (report["imported"], report["duplicates"], report["rejected"]) == (2, 1, 3)
+    assert report["errors"][1:] == ["line 4: title must be a string, got 5",
+                                    "line 5: tags must be a string or list, got 3"]
+    assert len(json.loads(tools.list_tasks())["tasks"]) == 4
+
+
+def test_counters_follow_inserts_updates_and_deletes():
+    a = json.loads(tools.add_task("A", "work"))["task_id"]
+    b = json.loads(tools.add_task("B", "work"))["task_id"]
+    tools.add_tasks([{"title": "C", "project": "home"}, {"title": "D", "project": "home", "status": "done"}])
+    tools.update_task(a, status="done")
+    tools.delete_task(b)
+    tools.update_tasks([{"task_id": a, "priority": "urgent"}])  # no status change
+
+    assert json.loads(tools.get_summary()) == {"home": {"done": 1, "todo": 1}, "work": {"done": 1}}
+    assert json.loads(tools.get_projects()) == [
+        {"name": "home", "total_tasks": 2, "completed": 1},
+        {"name": "work", "total_tasks": 1, "completed": 1},
+    ]
+
+    conn = tools.get_connection()
+    with conn:
+        conn.execute("DELETE FROM task_counts")
+    assert json.loads(tools.get_summary()) == {}
+    assert json.loads(tools.rebuild_counters())["groups"] == 3
+    assert json.loads(tools.get_summary()) == {"home": {"done": 1, "todo": 1}, "work": {"done": 1}}
+
+
+def test_result_cache_invalidates_on_writes():
+    from cache import ResultCache
+
+    cache = ResultCache(max_entries=2)
+    calls = []
+
+    def summary():
+        calls.append(1)
+        return tools.get_summary()
+
+    assert cache.get("summary", summary) == "{}"
+    assert cache.get("summary", summary) == "{}"
+    assert len(calls) == 1
+
+    tools.add_task("A", "work")
+    assert json.loads(cache.get("summary", summary)) == {"work": {"todo": 1}}
+    assert len(calls) == 2
+
+    # A commit from another connection is picked up through PRAGMA data_version.
+    other = sqlite3.connect(tools.DB_PATH)
+    other.execute("UPDATE tasks SET status = 'done'")
+    other.commit()
+    other.close()
+    assert json.loads(cache.get("summary", summary)) == {"work": {"done": 1}}
+
+    cache.get("a", lambda: 1)
+    cache.get("b", lambda: 2)
+    stats = cache.stats()
+    assert (stats["hits"], stats["invalidations"], stats["evictions"], stats["entries"]) == (1, 2, 1, 2)
@@ -1,138 +1,1631 @@
 # tools.py
+import base64
 import json
+import os
+import re
 import sqlite3
-from datetime import datetime
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+from task_schema import TASK_FIELDS, ProjectStats, Task, TaskPage, normalize_tags, task_factory
+from fuzzy import closest, similarity, title_bands, word_similarity
+from instrumentation import TimedConnection, timed, timed_dumps
 
 DB_PATH = "tasks.db"
+# Where archive_tasks() moves old done tasks; by default next to DB_PATH
+ARCHIVE_PATH = os.environ.get("TASK_ARCHIVE_PATH")
+
+# Pragmas applied to every connection handed out by get_connection().
+# WAL lets readers run alongside a writer, and synchronous=NORMAL only
+# fsyncs at checkpoints instead of on every single-row commit. With
+# incremental auto-vacuum, compact_db() can hand pages freed by archiving
+# back to the filesystem a few at a time.
+PRAGMAS = (
+    # Only takes effect while the file is new, so it must come before WAL
+    ("auto_vacuum", "INCREMENTAL"),
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("cache_size", -16000),      # ~16 MB page cache
+    ("mmap_size", 268435456),    # 256 MB memory-mapped I/O
+    ("busy_timeout", 5000),      # ms to wait on a locked database
+    ("temp_store", "MEMORY"),
+)
+
+# Size of sqlite3's per-connection prepared statement cache. Every query
+# in this module is a constant string, so repeated calls reuse the
+# compiled statement instead of re-parsing the SQL.
+STATEMENT_CACHE_SIZE = 128
+
+_local = threading.local()
+_connections = []
+_connections_lock = threading.Lock()
+_generation = 0
+_write_version = 0
+_write_version_lock = threading.Lock()
+
+
+def get_connection() -> sqlite3.Connection:
+    """Return this thread's shared connection to DB_PATH, opening it on first use."""
+    if getattr(_local, "generation", None) != _generation:
+        _local.connections = {}
+        _local.generation = _generation
+    conns = _local.connections
+    conn = conns.get(DB_PATH)
+    if conn is None:
+        conn = sqlite3.connect(DB_PATH, cached_statements=STATEMENT_CACHE_SIZE,
+                               check_same_thread=False, factory=TimedConnection)
+        for name, value in PRAGMAS:
+            conn.execute(f"PRAGMA {name} = {value}")
+        conns[DB_PATH] = conn
+        with _connections_lock:
+            _connections.append(conn)
+    return conn
+
+
+def close_db():
+    """Close every connection opened by get_connection(), across all threads."""
+    global _generation
+    with _connections_lock:
+        conns = list(_connections)
+        _connections.clear()
+        _generation += 1
+    for conn in conns:
+        try:
+            conn.execute("PRAGMA optimize")
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+
+# How often a write retries BEGIN IMMEDIATE when another process still
+# holds the write lock after busy_timeout, and the first back-off delay.
+BUSY_RETRIES = 5
+BUSY_BACKOFF = 0.05
+
+
+def _is_busy(error: sqlite3.OperationalError) -> bool:
+    message = str(error)
+    return "locked" in message or "busy" in message
+
+
+def _begin_immediate(conn: sqlite3.Connection):
+    """
+    Take the write lock up front, retrying with back-off while it is busy.
+
+    A deferred transaction that reads first and upgrades to a write later
+    fails with "database is locked" without waiting on busy_timeout;
+    BEGIN IMMEDIATE waits for the lock before anything is read.
+    """
+    for attempt in range(BUSY_RETRIES):
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            return
+        except sqlite3.OperationalError as e:
+            if not _is_busy(e) or attempt == BUSY_RETRIES - 1:
+                raise
+            time.sleep(BUSY_BACKOFF * 2 ** attempt)
+
+
+@contextmanager
+def _writing():
+    """
+    Yield this thread's connection inside a write transaction and bump the
+    write version afterwards, so caches keyed on data_version() see the change.
+
+    Inside group_commit() the write runs in a savepoint of the shared
+    transaction instead, so a failing write only undoes itself.
+    """
+    global _write_version
+    conn = get_connection()
+    try:
+        if getattr(_local, "group", False):
+            conn.execute("SAVEPOINT tool_write")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK TO tool_write")
+                raise
+            finally:
+                conn.execute("RELEASE tool_write")
+        else:
+            _begin_immediate(conn)
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+    finally:
+        with _write_version_lock:
+            _write_version += 1
+
+
+@contextmanager
+def group_commit():
+    """
+    Run several tool writes in one transaction with a single commit.
+
+    Used by the task server's writer thread: every write queued while the
+    previous commit was in flight lands in the next group, so N concurrent
+    writes cost one fsync instead of N.
+    """
+    conn = get_connection()
+    _begin_immediate(conn)
+    _local.group = True
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    else:
+        conn.commit()
+    finally:
+        _local.group = False
+
+
+def data_version(conn: sqlite3.Connection = None) -> tuple:
+    """
+    Return a token that changes whenever task data may have changed.
+
+    Combines the in-process write counter bumped by the mutating tools with
+    SQLite's PRAGMA data_version, which moves when another connection
+    (another thread or process) commits.
+    """
+    conn = conn or get_connection()
+    return (DB_PATH, _write_version, conn.execute("PRAGMA data_version").fetchone()[0])
+
+
+# Sort order for priorities; anything unrecognised sorts last.
+PRIORITY_RANK = {"urgent": 1, "high": 2, "normal": 3, "low": 4}
+
+
+def priority_rank(priority: str) -> int:
+    """Return the stored sort rank for a priority name."""
+    return PRIORITY_RANK.get(priority, 4)
+
+
+def _migrate_priority_rank(conn):
+    conn.execute("ALTER TABLE tasks ADD COLUMN priority_rank INTEGER NOT NULL DEFAULT 3")
+    conn.execute("""
+        UPDATE tasks SET priority_rank = CASE priority
+            WHEN 'urgent' THEN 1 WHEN 'high' THEN 2 WHEN 'normal' THEN 3 ELSE 4 END
+    """)
+    conn.execute("CREATE INDEX idx_tasks_project_status_rank ON tasks (project, status, priority_rank)")
+    conn.execute("CREATE INDEX idx_tasks_status_due ON tasks (status, due_date)")
+    conn.execute("CREATE INDEX idx_tasks_rank ON tasks (priority_rank)")
+
+
+def _migrate_fts(conn):
+    # External-content FTS5 index over tasks: the text lives only in
+    # tasks, the index is kept in step by triggers keyed on rowid.
+    conn.execute("""
+        CREATE VIRTUAL TABLE tasks_fts USING fts5(
+            title, description, tags,
+            content='tasks', content_rowid='rowid', prefix='2 3'
+        )
+    """)
+    conn.execute("""
+        CREATE TRIGGER tasks_fts_insert AFTER INSERT ON tasks BEGIN
+            INSERT INTO tasks_fts (rowid, title, description, tags)
+            VALUES (new.rowid, new.title, new.description, new.tags);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER tasks_fts_delete AFTER DELETE ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, title, description, tags)
+            VALUES ('delete', old.rowid, old.title, old.description, old.tags);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER tasks_fts_update AFTER UPDATE OF title, description, tags ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, title, description, tags)
+            VALUES ('delete', old.rowid, old.title, old.description, old.tags);
+            INSERT INTO tasks_fts (rowid, title, description, tags)
+            VALUES (new.rowid, new.title, new.description, new.tags);
+        END
+    """)
+    conn.execute("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')")
+
+
+def _migrate_bulk_load(conn):
+    # Per-row FTS maintenance inside a trigger flushes the FTS5 pending
+    # buffer on every row. insert_tasks() flips bulk_load.active inside its
+    # own write transaction and indexes the new rows with one INSERT ...
+    # SELECT instead; other connections never observe the flag set.
+    conn.execute("CREATE TABLE bulk_load (active INTEGER NOT NULL)")
+    conn.execute("INSERT INTO bulk_load (active) VALUES (0)")
+    conn.execute("DROP TRIGGER tasks_fts_insert")
+    conn.execute("""
+        CREATE TRIGGER tasks_fts_insert AFTER INSERT ON tasks
+        WHEN NOT (SELECT active FROM bulk_load) BEGIN
+            INSERT INTO tasks_fts (rowid, title, description, tags)
+            VALUES (new.rowid, new.title, new.description, new.tags);
+        END
+    """)
+
+
+def _migrate_counters(conn):
+    # (project, status) -> count, kept current by triggers so dashboards
+    # read a handful of rows instead of aggregating the whole tasks table.
+    # A NULL status (only possible from outside writers) counts as 'todo'.
+    conn.execute("""
+        CREATE TABLE task_counts (
+            project TEXT NOT NULL,
+            status TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (project, status)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("""
+        CREATE TRIGGER task_counts_insert AFTER INSERT ON tasks
+        WHEN NOT (SELECT active FROM bulk_load) BEGIN
+            INSERT INTO task_counts (project, status, count)
+            VALUES (new.project, COALESCE(new.status, 'todo'), 1)
+            ON CONFLICT (project, status) DO UPDATE SET count = count + 1;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER task_counts_delete AFTER DELETE ON tasks BEGIN
+            UPDATE task_counts SET count = count - 1
+            WHERE project = old.project AND status = COALESCE(old.status, 'todo');
+            DELETE FROM task_counts
+            WHERE project = old.project AND status = COALESCE(old.status, 'todo') AND count <= 0;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER task_counts_update AFTER UPDATE OF project, status ON tasks
+        WHEN old.project IS NOT new.project OR old.status IS NOT new.status BEGIN
+            UPDATE task_counts SET count = count - 1
+            WHERE project = old.project AND status = COALESCE(old.status, 'todo');
+            DELETE FROM task_counts
+            WHERE project = old.project AND status = COALESCE(old.status, 'todo') AND count <= 0;
+            INSERT INTO task_counts (project, status, count)
+            VALUES (new.project, COALESCE(new.status, 'todo'), 1)
+            ON CONFLICT (project, status) DO UPDATE SET count = count + 1;
+        END
+    """)
+    _rebuild_counters(conn)
+
+
+# SQL for a due_date's day number, matching Python's date.toordinal()
+# (julianday('0001-01-01') is 1721425.5); NULL when due_date is not a date.
+DUE_DAY_SQL = "CAST(julianday({0}) - 1721424.5 AS INTEGER)"
+
+
+def due_day(due_date) -> int:
+    """Stored day number for a date (or YYYY-MM-DD string), or None."""
+    if isinstance(due_date, str):
+        due_date = date.fromisoformat(due_date)
+    return due_date.toordinal() if due_date else None
+
+
+def _migrate_due_day(conn):
+    # Range queries compare an integer day number instead of due_date
+    # text. due_date keeps the display form, normalised to YYYY-MM-DD;
+    # values that are not dates keep their text and get no due_day.
+    conn.execute("""
+        UPDATE tasks SET due_date = date(due_date)
+        WHERE date(due_date) IS NOT NULL AND due_date IS NOT date(due_date)
+    """)
+    conn.execute("ALTER TABLE tasks ADD COLUMN due_day INTEGER")
+    conn.execute(f"UPDATE tasks SET due_day = {DUE_DAY_SQL.format('due_date')}")
+    # Only open tasks are ever asked for by date, so done tasks stay out of the index
+    conn.execute("DROP INDEX idx_tasks_status_due")
+    conn.execute("CREATE INDEX idx_tasks_open_due ON tasks (due_day, priority_rank) WHERE status != 'done'")
+    # tools.py writes due_day itself; these only fire for writers that do not
+    for event in ("INSERT", "UPDATE OF due_date"):
+        name = event.split()[0].lower()
+        conn.execute(f"""
+            CREATE TRIGGER tasks_due_day_{name} AFTER {event} ON tasks
+            WHEN new.due_day IS NOT {DUE_DAY_SQL.format('new.due_date')} BEGIN
+                UPDATE tasks SET due_day = {DUE_DAY_SQL.format('new.due_date')} WHERE rowid = new.rowid;
+            END
+        """)
+
+
+def _insert_title_bands(conn, rows):
+    """Index (rowid, title, project) rows for duplicate detection."""
+    conn.executemany(
+        "INSERT OR IGNORE INTO title_bands (band, task_rowid) VALUES (?, ?)",
+        ((band, rowid) for rowid, title, project in rows for band in title_bands(title, project))
+    )
+
+
+def _migrate_fuzzy(conn):
+    # Trigram index over titles for fuzzy search (FTS5's trigram
+    # tokenizer, SQLite 3.34+), maintained like tasks_fts. detail='none'
+    # keeps it small: queries only ever ask which rows hold a trigram.
+    conn.execute("""
+        CREATE VIRTUAL TABLE tasks_trigram USING fts5(
+            title, content='tasks', content_rowid='rowid', tokenize='trigram', detail='none'
+        )
+    """)
+    conn.execute("""
+        CREATE TRIGGER tasks_trigram_insert AFTER INSERT ON tasks
+        WHEN NOT (SELECT active FROM bulk_load) BEGIN
+            INSERT INTO tasks_trigram (rowid, title) VALUES (new.rowid, new.title);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER tasks_trigram_delete AFTER DELETE ON tasks BEGIN
+            INSERT INTO tasks_trigram (tasks_trigram, rowid, title) VALUES ('delete', old.rowid, old.title);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER tasks_trigram_update AFTER UPDATE OF title ON tasks BEGIN
+            INSERT INTO tasks_trigram (tasks_trigram, rowid, title) VALUES ('delete', old.rowid, old.title);
+            INSERT INTO tasks_trigram (rowid, title) VALUES (new.rowid, new.title);
+        END
+    """)
+    conn.execute("INSERT INTO tasks_trigram (tasks_trigram) VALUES ('rebuild')")
+    # MinHash band keys of each title (see fuzzy.py), written by tools.py
+    # on insert. The tools never rename a task; a title or project changed
+    # by another writer just drops the task out of duplicate detection.
+    conn.execute("""
+        CREATE TABLE title_bands (
+            band INTEGER NOT NULL,
+            task_rowid INTEGER NOT NULL,
+            PRIMARY KEY (band, task_rowid)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX idx_title_bands_task ON title_bands (task_rowid)")
+    for event in ("DELETE", "UPDATE OF title, project"):
+        name = event.split()[0].lower()
+        conn.execute(f"""
+            CREATE TRIGGER title_bands_{name} AFTER {event} ON tasks BEGIN
+                DELETE FROM title_bands WHERE task_rowid = old.rowid;
+            END
+        """)
+    _insert_title_bands(conn, conn.execute("SELECT rowid, title, project FROM tasks").fetchall())
+
+
+def _migrate_write_version(conn):
+    # A counter that moves with every change to tasks, from any writer,
+    # and survives restarts (data_version() does neither across
+    # sessions). The response cache keys agent replies on it.
+    conn.execute("CREATE TABLE write_version (version INTEGER NOT NULL)")
+    conn.execute("INSERT INTO write_version (version) VALUES (0)")
+    for event, guard in (("INSERT", "WHEN NOT (SELECT active FROM bulk_load) "), ("UPDATE", ""), ("DELETE", "")):
+        conn.execute(f"""
+            CREATE TRIGGER write_version_{event.lower()} AFTER {event} ON tasks
+            {guard}BEGIN
+                UPDATE write_version SET version = version + 1;
+            END
+        """)
+
+
+def _insert_task_tags(conn, rows, schema: str = "main"):
+    """Index (rowid, priority_rank, tags) rows, tags as a list or the stored comma-joined text."""
+    conn.executemany(
+        f"INSERT OR IGNORE INTO {schema}.task_tags (tag, priority_rank, task_rowid) VALUES (?, ?, ?)",
+        ((tag, rank, rowid) for rowid, rank, tags in rows for tag in normalize_tags(tags))
+    )
+
+
+def _migrate_tags(conn):
+    # One row per (tag, task), so a tag filter is an index range scan
+    # instead of matching tags text. Carrying priority_rank in the key
+    # keeps each tag's tasks in list order: a page of a tag is read
+    # straight off the index, and further tags are probed per row.
+    # tasks.tags keeps the comma-joined list for display and search;
+    # tools.py writes both. The triggers only ever remove rows, so a tags
+    # change by another writer drops the task out of tag filters.
+    conn.execute("""
+        CREATE TABLE task_tags (
+            tag TEXT NOT NULL,
+            priority_rank INTEGER NOT NULL,
+            task_rowid INTEGER NOT NULL,
+            PRIMARY KEY (tag, priority_rank, task_rowid)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX idx_task_tags_task ON task_tags (task_rowid)")
+    for event in ("DELETE", "UPDATE OF tags"):
+        name = event.split()[0].lower()
+        conn.execute(f"""
+            CREATE TRIGGER task_tags_{name} AFTER {event} ON tasks BEGIN
+                DELETE FROM task_tags WHERE task_rowid = old.rowid;
+            END
+        """)
+    conn.execute("""
+        CREATE TRIGGER task_tags_rank AFTER UPDATE OF priority_rank ON tasks
+        WHEN old.priority_rank IS NOT new.priority_rank BEGIN
+            UPDATE task_tags SET priority_rank = new.priority_rank WHERE task_rowid = old.rowid;
+        END
+    """)
+    rows = conn.execute(
+        "SELECT rowid, priority_rank, tags FROM tasks WHERE tags IS NOT NULL AND tags != ''"
+    ).fetchall()
+    # Stored tags were never normalised; bring them in line with new writes
+    conn.executemany("UPDATE tasks SET tags = ? WHERE rowid = ? AND tags IS NOT ?", (
+        (",".join(normalize_tags(tags)) or None, rowid, ",".join(normalize_tags(tags)) or None)
+        for rowid, _, tags in rows
+    ))
+    _insert_task_tags(conn, rows)
+
+
+# SQL for today's day number in local time, matching date.today().toordinal()
+TODAY_SQL = "CAST(julianday('now', 'localtime') - 1721424.5 AS INTEGER)"
+
+
+def _migrate_done_day(conn):
+    # The day a task was marked done, so archive_tasks() finds tasks done
+    # more than N days ago with a range scan of a partial index. Triggers
+    # keep it for every writer; insert_tasks() writes it for done rows
+    # itself. Tasks already done count as done on the day of the upgrade.
+    conn.execute("ALTER TABLE tasks ADD COLUMN done_day INTEGER")
+    conn.execute(f"UPDATE tasks SET done_day = {TODAY_SQL} WHERE status = 'done'")
+    conn.execute("CREATE INDEX idx_tasks_done_day ON tasks (done_day) WHERE status = 'done'")
+    conn.execute(f"""
+        CREATE TRIGGER tasks_done_day_insert AFTER INSERT ON tasks
+        WHEN new.status = 'done' AND new.done_day IS NULL BEGIN
+            UPDATE tasks SET done_day = {TODAY_SQL} WHERE rowid = new.rowid;
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER tasks_done_day_update AFTER UPDATE OF status ON tasks
+        WHEN (new.status = 'done') IS NOT (old.status = 'done') BEGIN
+            UPDATE tasks SET done_day = CASE WHEN new.status = 'done' THEN {TODAY_SQL} END
+            WHERE rowid = new.rowid;
+        END
+    """)
+    # When each maintenance job last ran, shared by every process
+    conn.execute("CREATE TABLE maintenance (job TEXT PRIMARY KEY, last_run TEXT NOT NULL)")
+
+
+def _migrate_trigram_terms(conn):
+    # One row per (trigram, task) of tasks_trigram, so fuzzy search can
+    # rank tasks by how many of the query's trigrams they hold before
+    # capping the candidates (detail='none' stores no repeats or offsets).
+    conn.execute("CREATE VIRTUAL TABLE tasks_trigram_terms USING fts5vocab(tasks_trigram, instance)")
+
+
+PRIORITY_RANK_SQL = (
+    "CASE {0} " + " ".join(f"WHEN '{name}' THEN {rank}" for name, rank in PRIORITY_RANK.items()) + " ELSE 4 END"
+)
+
+
+def _migrate_priority_rank_triggers(conn):
+    # tools.py writes priority_rank itself; these only fire for writers
+    # that set priority alone, who would otherwise get the default rank.
+    for event in ("INSERT", "UPDATE OF priority"):
+        name = event.split()[0].lower()
+        conn.execute(f"""
+            CREATE TRIGGER tasks_priority_rank_{name} AFTER {event} ON tasks
+            WHEN new.priority_rank IS NOT {PRIORITY_RANK_SQL.format('new.priority')} BEGIN
+                UPDATE tasks SET priority_rank = {PRIORITY_RANK_SQL.format('new.priority')} WHERE rowid = new.rowid;
+            END
+        """)
+    conn.execute(f"""
+        UPDATE tasks SET priority_rank = {PRIORITY_RANK_SQL.format('priority')}
+        WHERE priority_rank IS NOT {PRIORITY_RANK_SQL.format('priority')}
+    """)
+
+
+# Ordered schema migrations: (version, description, function(conn)).
+# Append new entries; never edit or reorder ones that have shipped.
+MIGRATIONS = [
+    (1, "priority rank column and listing indexes", _migrate_priority_rank),
+    (2, "full-text search index", _migrate_fts),
+    (3, "bulk-load switch for index triggers", _migrate_bulk_load),
+    (4, "project/status counters", _migrate_counters),
+    (5, "integer due day and open-task due index", _migrate_due_day),
+    (6, "trigram index and title bands for fuzzy matching", _migrate_fuzzy),
+    (7, "persistent write version", _migrate_write_version),
+    (8, "task-tag index", _migrate_tags),
+    (9, "done day and maintenance log for archiving", _migrate_done_day),
+    (10, "trigram postings view for fuzzy ranking", _migrate_trigram_terms),
+    (11, "priority rank triggers for outside writers", _migrate_priority_rank_triggers),
+]
+
 
+def _rebuild_counters(conn) -> int:
+    conn.execute("DELETE FROM task_counts")
+    cursor = conn.execute("""
+        INSERT INTO task_counts (project, status, count)
+        SELECT project, COALESCE(status, 'todo'), COUNT(*) FROM tasks
+        GROUP BY project, COALESCE(status, 'todo')
+    """)
+    return cursor.rowcount
+
+
+def write_version() -> int:
+    """Number of changes ever made to tasks; unlike data_version() it persists across sessions."""
+    return get_connection().execute("SELECT version FROM write_version").fetchone()[0]
+
+
+def schema_version(conn: sqlite3.Connection = None) -> int:
+    """Return the highest migration version applied to the database."""
+    conn = conn or get_connection()
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def migrate(conn: sqlite3.Connection = None) -> int:
+    """Apply any pending migrations in order and return the resulting version."""
+    conn = conn or get_connection()
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT,
+            applied_at TEXT
+        )
+    """)
+    for version, description, apply in MIGRATIONS:
+        if version <= schema_version(conn):
+            continue
+        # BEGIN IMMEDIATE takes the write lock up front, so two processes
+        # upgrading the same file cannot both apply a migration.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if version > schema_version(conn):
+                apply(conn)
+                conn.execute(
+                    "INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)",
+                    (version, description, datetime.now().isoformat())
+                )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return schema_version(conn)
+
+
+@timed
 def init_db():
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection()
+    with conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                id TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                project TEXT NOT NULL,
+                status TEXT DEFAULT 'todo',
+                priority TEXT DEFAULT 'normal',
+                due_date TEXT,
+                description TEXT,
+                tags TEXT,
+                created_at TEXT
+            )
+        """)
+    migrate(conn)
+
+# Columns a caller may request through the `fields` argument are TASK_FIELDS.
+LIST_FIELDS = ("id", "title", "project", "status", "priority", "due_date")
+SEARCH_FIELDS = LIST_FIELDS + ("description",)
+MAX_PAGE_SIZE = 500
+# Most rows after a page that rest counts; past it, the summary covers the next ones only
+REST_SUMMARY_LIMIT = 1000
+
+
+def _parse_fields(fields, default: tuple) -> tuple:
+    """Validate a field projection given as a list or comma-separated string."""
+    if not fields:
+        return default
+    if isinstance(fields, str):
+        fields = [f.strip() for f in fields.split(",")]
+    fields = tuple(f for f in fields if f)
+    unknown = [f for f in fields if f not in TASK_FIELDS]
+    if unknown or not fields:
+        raise ValueError(f"unknown field(s): {', '.join(unknown)}; choose from {', '.join(TASK_FIELDS)}")
+    return fields
+
+
+def _encode_cursor(kind: str, key) -> str:
+    raw = json.dumps([kind, *key], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(kind: str, cursor: str) -> list:
+    """Return the sort key stored in a cursor produced for the same kind of query."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ValueError("invalid cursor")
+    if not isinstance(data, list) or not data or data[0] != kind:
+        raise ValueError("invalid cursor")
+    return data[1:]
+
+
+def _page_limit(limit) -> int:
+    return max(1, min(int(limit), MAX_PAGE_SIZE))
+
+
+TAG_MATCHES = ("all", "any")
+
+
+def _tag_filter(tags: list, match: str, schema: str = "main"):
+    """
+    (sort keys, FROM/WHERE clause, params) for tasks in schema carrying all (or any) of tags.
+
+    For "all", the rarest tag's task_tags range is read in list order and
+    each other tag is one primary-key probe per row, so a page costs about
+    its own size. "any" collects the tags' rows and sorts them.
+    """
+    if match not in TAG_MATCHES:
+        raise ValueError(f"match must be one of {', '.join(TAG_MATCHES)}, got {match!r}")
+    if match == "any" and len(tags) > 1:
+        placeholders = ", ".join("?" * len(tags))
+        return ("t.priority_rank", "t.rowid"), (
+            f"FROM {schema}.tasks t WHERE t.rowid IN "
+            f"(SELECT task_rowid FROM {schema}.task_tags WHERE tag IN ({placeholders}))"
+        ), list(tags)
+    if len(tags) > 1:
+        conn = get_connection()
+        tags = sorted(tags, key=lambda tag: conn.execute(
+            f"SELECT COUNT(*) FROM {schema}.task_tags WHERE tag = ?", (tag,)
+        ).fetchone()[0])
+    where = f"FROM {schema}.task_tags g JOIN {schema}.tasks t ON t.rowid = g.task_rowid WHERE g.tag = ?"
+    where += f""" AND EXISTS (
+        SELECT 1 FROM {schema}.task_tags o
+        WHERE o.tag = ? AND o.priority_rank = g.priority_rank AND o.task_rowid = g.task_rowid
+    )""" * (len(tags) - 1)
+    return ("g.priority_rank", "g.task_rowid"), where, list(tags)
+
+
+def list_source(project: str = None, status: str = None, priority: str = None,
+                tags=None, match: str = "all", schema: str = "main"):
+    """
+    Source for list_tasks: (sort key expressions, FROM/WHERE clause, params).
+
+    Sources alias tasks as t; query_page() pages through them by sort key.
+    tags (a list or comma-separated string) keeps tasks carrying all of
+    them, or any with match="any". schema "archive" lists archived tasks.
+    """
+    tags = normalize_tags(tags)
+    if tags:
+        keys, where, params = _tag_filter(tags, match, schema)
+    else:
+        keys, where, params = ("t.priority_rank", "t.rowid"), f"FROM {schema}.tasks t WHERE 1=1", []
+    if project:
+        where += " AND t.project = ?"
+        params.append(project)
+    if status:
+        where += " AND t.status = ?"
+        params.append(status)
+    if priority:
+        where += " AND t.priority_rank = ? AND t.priority = ?"
+        params.extend([priority_rank(priority), priority])
+    return keys, where, params
+
+
+def search_source(query: str, schema: str = "main"):
+    """Source for search_tasks, or None when the query has no searchable terms."""
+    match = _fts_query(query)
+    if not match:
+        return None
+    # Title hits weigh most, then tags, then description.
+    return (
+        ("bm25(tasks_fts, 10.0, 1.0, 5.0)", "t.priority_rank", "t.rowid"),
+        f"FROM {schema}.tasks_fts JOIN {schema}.tasks t ON t.rowid = tasks_fts.rowid WHERE tasks_fts MATCH ?",
+        [match],
+    )
+
+
+def today_source():
+    """Source for get_tasks_due_today: open tasks due today."""
+    today = date.today().toordinal()
+    return ("t.priority_rank", "t.rowid"), "FROM tasks t WHERE t.due_day = ? AND t.status != 'done'", [today]
+
+
+def due_source(start: date = None, end: date = None):
+    """
+    Source for open tasks due between start and end inclusive (either may be
+    open-ended), soonest first. Served by a range scan on idx_tasks_open_due.
+    """
+    where = "FROM tasks t WHERE t.status != 'done'"
+    params = []
+    if start:
+        where += " AND t.due_day >= ?"
+        params.append(start.toordinal())
+    if end:
+        where += " AND t.due_day <= ?"
+        params.append(end.toordinal())
+    if not start and not end:
+        where += " AND t.due_day IS NOT NULL"
+    return ("t.due_day", "t.priority_rank", "t.rowid"), where, params
+
+
+def overdue_source():
+    """Source for open tasks due before today."""
+    return due_source(end=date.today() - timedelta(days=1))
+
+
+def week_source():
+    """Source for open tasks due from today through Sunday."""
+    today = date.today()
+    return due_source(today, today + timedelta(days=6 - today.weekday()))
+
+
+def upcoming_source(days: int = 7):
+    """Source for open tasks due from today through the next days days."""
+    today = date.today()
+    return due_source(today, today + timedelta(days=max(0, int(days))))
+
+
+def _keyed(source, columns, after=None):
+    """
+    Wrap a source as SELECT * FROM (k0, k1, ..., columns) [WHERE key > after].
+
+    SQLite flattens the subquery, so indexes on the inner WHERE still apply.
+    """
+    keys, where, params = source
+    select = ", ".join([f"{k} AS k{i}" for i, k in enumerate(keys)] + [f"t.{c}" for c in columns])
+    key_names = ", ".join(f"k{i}" for i in range(len(keys)))
+    sql = f"SELECT * FROM (SELECT {select} {where})"
+    params = list(params)
+    if after:
+        sql += f" WHERE ({key_names}) > ({', '.join('?' * len(keys))})"
+        params.extend(after)
+    return sql, params, key_names
+
+
+def _remaining_counts(conn: sqlite3.Connection, source, after) -> dict:
+    """
+    Count the rows after a page, by priority and by status. Only the
+    next REST_SUMMARY_LIMIT rows are read, so a huge result costs no
+    more than a bounded index scan; "capped" marks a count that stopped there.
+    """
+    sql, params, key_names = _keyed(source, ("priority", "status"), after)
+    rest = {"count": 0, "priority": {}, "status": {}}
+    for priority, status, count in conn.execute(
+        f"SELECT priority, status, COUNT(*) FROM ({sql} ORDER BY {key_names} LIMIT ?) GROUP BY priority, status",
+        params + [REST_SUMMARY_LIMIT]
+    ):
+        rest["count"] += count
+        rest["priority"][priority] = rest["priority"].get(priority, 0) + count
+        rest["status"][status] = rest["status"].get(status, 0) + count
+    rest["priority"] = dict(sorted(rest["priority"].items(), key=lambda kv: priority_rank(kv[0])))
+    if rest["count"] >= REST_SUMMARY_LIMIT:
+        rest["capped"] = True
+    return rest
+
+
+def query_page(kind: str, source, default_fields: tuple, limit: int = None, cursor: str = None,
+               fields=None, summarize_rest: bool = False) -> TaskPage:
+    """
+    Run one page of a read query, building Task objects straight from the rows.
+
+    With summarize_rest, a truncated page also carries rest, the number
+    of rows after it (up to REST_SUMMARY_LIMIT) broken down by priority
+    and status. Raises
+    ValueError for unknown fields or a cursor from another kind of query.
+    """
+    columns = _parse_fields(fields, default_fields)
+    after = _decode_cursor(kind, cursor) if cursor else None
+    if source is None:
+        return TaskPage([], None, columns)
+    conn = get_connection()
+    sql, params, key_names = _keyed(source, columns, after)
+    sql += f" ORDER BY {key_names}"
+    factory = task_factory(columns, key_size=len(source[0]))
+    rows = conn.cursor()
+    rows.row_factory = factory
+    if limit is None:
+        tasks = rows.execute(sql, params).fetchall()
+        next_cursor = None
+    else:
+        # One extra row only signals that a next page exists
+        limit = _page_limit(limit)
+        tasks = rows.execute(sql + " LIMIT ?", params + [limit + 1]).fetchmany(limit)
+        last_key = factory.last_key
+        next_cursor = _encode_cursor(kind, last_key) if rows.fetchone() is not None else None
+    rows.close()
+    page = TaskPage(tasks, next_cursor, columns)
+    if summarize_rest and next_cursor:
+        page.rest = _remaining_counts(conn, source, last_key)
+    return page
+
+
+def archive_path() -> str:
+    """The archive database: ARCHIVE_PATH, or <DB_PATH stem>-archive.db."""
+    return ARCHIVE_PATH or os.path.splitext(DB_PATH)[0] + "-archive.db"
+
+
+def _attach_archive(conn: sqlite3.Connection, create: bool = False) -> bool:
+    """
+    Attach the archive to conn as schema "archive", if it exists (or
+    create it); False when there is no archive yet.
+
+    Must run outside a transaction, as ATTACH cannot run inside one.
+    """
+    if any(name == "archive" for _, name, _ in conn.execute("PRAGMA database_list").fetchall()):
+        return True
+    path = archive_path()
+    if not create and not os.path.exists(path):
+        return False
+    conn.execute("ATTACH DATABASE ? AS archive", (path,))
+    conn.execute("PRAGMA archive.auto_vacuum = INCREMENTAL")
+    conn.execute("PRAGMA archive.journal_mode = WAL")
+    if create:
+        _create_archive_schema(conn)
+    return True
+
+
+def _create_archive_schema(conn: sqlite3.Connection):
+    # Archived tasks keep every column, plus search and tag indexes of
+    # their own. Nothing but archive_tasks() writes here, so the indexes
+    # are filled by it rather than by triggers.
     conn.execute("""
-        CREATE TABLE IF NOT EXISTS tasks (
+        CREATE TABLE IF NOT EXISTS archive.tasks (
             id TEXT PRIMARY KEY,
             title TEXT NOT NULL,
             project TEXT NOT NULL,
-            status TEXT DEFAULT 'todo',
-            priority TEXT DEFAULT 'normal',
+            status TEXT,
+            priority TEXT,
+            priority_rank INTEGER NOT NULL,
             due_date TEXT,
+            due_day INTEGER,
             description TEXT,
             tags TEXT,
-            created_at TEXT
+            created_at TEXT,
+            done_day INTEGER
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS archive.idx_archive_project_rank ON tasks (project, priority_rank)")
+    conn.execute("CREATE INDEX IF NOT EXISTS archive.idx_archive_rank ON tasks (priority_rank)")
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS archive.tasks_fts USING fts5(
+            title, description, tags,
+            content='tasks', content_rowid='rowid', prefix='2 3'
         )
     """)
-    conn.commit()
-    conn.close()
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS archive.task_tags (
+            tag TEXT NOT NULL,
+            priority_rank INTEGER NOT NULL,
+            task_rowid INTEGER NOT NULL,
+            PRIMARY KEY (tag, priority_rank, task_rowid)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS archive.task_counts (
+            project TEXT PRIMARY KEY,
+            count INTEGER NOT NULL
+        ) WITHOUT ROWID
+    """)
 
-def add_task(title: str, project: str, priority: str = "normal",
-             due_date: str = None, description: str = "") -> str: 
-    """Add a new task to a project."""
-    import uuid
-    task_id = str(uuid.uuid4())[:8]
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute(
-        "INSERT INTO tasks (id, title, project, status, priority, due_date, description, created_at) VALUES (?, ?, ?, 'todo', ?, ?, ?, ?)",
-        (task_id, title, project, priority, due_date, description, datetime.now().isoformat())
+
+def with_archive(kind: str, make_source, include_archived: bool) -> tuple:
+    """
+    (cursor kind, source) for make_source(schema), over tasks alone or,
+    with include_archived and an archive on disk, over tasks and the
+    archive together.
+
+    The combined source is a UNION ALL of both, sorted by the same keys
+    plus which side a row came from (rowids repeat across the two), so
+    its cursors have a kind of their own.
+    """
+    hot = make_source("main")
+    if not include_archived or hot is None or not _attach_archive(get_connection()):
+        return kind, hot
+    cold = make_source("archive")
+    arms, params = [], []
+    for archived, (keys, where, arm_params) in enumerate((hot, cold)):
+        select = ", ".join([f"{k} AS k{i}" for i, k in enumerate(keys)] + [f"{archived} AS archived"]
+                           + [f"t.{c} AS {c}" for c in TASK_FIELDS])
+        arms.append(f"SELECT {select} {where}")
+        params.extend(arm_params)
+    keys = tuple(f"t.k{i}" for i in range(len(hot[0]))) + ("t.archived",)
+    return f"{kind}+archived", (keys, f"FROM ({' UNION ALL '.join(arms)}) t", params)
+
+
+def fetch_tasks(project: str = None, status: str = None, priority: str = None,
+                limit: int = None, cursor: str = None, fields=None, tags=None, match: str = "all",
+                include_archived: bool = False) -> TaskPage:
+    """
+    Typed list_tasks for in-process callers; raises ValueError on a bad
+    cursor, field or match. include_archived lists archived tasks too.
+    """
+    kind, source = with_archive(
+        "list", lambda schema: list_source(project, status, priority, tags, match, schema), include_archived
     )
-    conn.commit()
-    conn.close()
-    return json.dumps({"status": "created", "task_id": task_id, "title": title, "project": project})
-
-def list_tasks(project: str = None, status: str = None, priority: str = None) -> str:
-    """List tasks, optionally filtered by project, status, and/or priority."""
-    conn = sqlite3.connect(DB_PATH)
-    query = "SELECT * FROM tasks WHERE 1=1"
-    params = []
-    if project:
-        query += " AND project = ?"
-        params.append(project)
-    if status:
-        query += " AND status = ?"
-        params.append(status)
-    if priority:
-        query += " AND priority = ?"
-        params.append(priority)
-    query += " ORDER BY CASE priority WHEN 'urgent' THEN 1 WHEN 'high' THEN 2 WHEN 'normal' THEN 3 ELSE 4 END"
-    rows = conn.execute(query, params).fetchall()
-    conn.close()
-    tasks = [{"id": r[0], "title": r[1], "project": r[2], "status": r[3], "priority": r[4], "due_date": r[5]} for r in rows]
-    return json.dumps(tasks, indent=2)
-
-def update_task(task_id: str, status: str = None, priority: str = None) -> str:
-    """Update a task's status or priority."""
-    conn = sqlite3.connect(DB_PATH)
-    if status:
-        conn.execute("UPDATE tasks SET status = ? WHERE id = ?", (status, task_id))
-    if priority:
-        conn.execute("UPDATE tasks SET priority = ? WHERE id = ?", (priority, task_id))
-    conn.commit()
-    conn.close()
-    return json.dumps({"status": "updated", "task_id": task_id})
-
-def get_summary() -> str:
-    """Get a summary of tasks across all projects."""
-    conn = sqlite3.connect(DB_PATH)
-    rows = conn.execute("""
-        SELECT project, status, COUNT(*) FROM tasks
-        GROUP BY project, status ORDER BY project
-    """).fetchall()
-    conn.close()
+    return query_page(kind, source, LIST_FIELDS, limit, cursor, fields)
+
+
+def fetch_search(query: str, limit: int = None, cursor: str = None, fields=None,
+                 include_archived: bool = False) -> TaskPage:
+    """Typed search_tasks for in-process callers; include_archived searches archived tasks too."""
+    kind, source = with_archive("search", lambda schema: search_source(query, schema), include_archived)
+    return query_page(kind, source, SEARCH_FIELDS, limit, cursor, fields)
+
+
+def fetch_due_today(limit: int = None, cursor: str = None, fields=None) -> TaskPage:
+    """Typed get_tasks_due_today for in-process callers."""
+    return query_page("today", today_source(), LIST_FIELDS, limit, cursor, fields)
+
+
+def fetch_due_between(start: date = None, end: date = None, limit: int = None,
+                      cursor: str = None, fields=None) -> TaskPage:
+    """Typed range query: open tasks due from start to end inclusive, soonest first."""
+    return query_page("due", due_source(start, end), LIST_FIELDS, limit, cursor, fields)
+
+
+def fetch_overdue(limit: int = None, cursor: str = None, fields=None) -> TaskPage:
+    """Open tasks due before today, oldest first."""
+    return query_page("due", overdue_source(), LIST_FIELDS, limit, cursor, fields)
+
+
+def fetch_due_this_week(limit: int = None, cursor: str = None, fields=None) -> TaskPage:
+    """Open tasks due from today through Sunday."""
+    return query_page("due", week_source(), LIST_FIELDS, limit, cursor, fields)
+
+
+def fetch_upcoming(days: int = 7, limit: int = None, cursor: str = None, fields=None) -> TaskPage:
+    """Open tasks due from today through the next days days."""
+    return query_page("due", upcoming_source(days), LIST_FIELDS, limit, cursor, fields)
+
+
+def _archived_counts(include_archived: bool) -> dict:
+    """{project: archived task count}, empty unless include_archived and an archive exists."""
+    conn = get_connection()
+    if not include_archived or not _attach_archive(conn):
+        return {}
+    return dict(conn.execute("SELECT project, count FROM archive.task_counts").fetchall())
+
+
+def fetch_summary(include_archived: bool = False) -> dict:
+    """
+    Task counts as {project: {status: count}}, read from the counters
+    table; include_archived adds archived tasks to the done counts.
+    """
     summary = {}
-    for project, status, count in rows:
-        if project not in summary:
-            summary[project] = {}
-        summary[project][status] = count
-    return json.dumps(summary, indent=2)
-
-def get_projects() -> str:
-    """Get a list of all unique projects with task counts."""
-    conn = sqlite3.connect(DB_PATH)
-    rows = conn.execute("""
-        SELECT project, COUNT(*) as total,
-               SUM(CASE WHEN status = 'done' THEN 1 ELSE 0 END) as completed
-        FROM tasks
+    for project, status, count in get_connection().execute(
+        "SELECT project, status, count FROM task_counts ORDER BY project, status"
+    ):
+        summary.setdefault(project, {})[status] = count
+    archived = _archived_counts(include_archived)
+    for project, count in archived.items():
+        statuses = summary.setdefault(project, {})
+        statuses["done"] = statuses.get("done", 0) + count
+    return dict(sorted(summary.items())) if archived else summary
+
+
+def fetch_projects(include_archived: bool = False) -> list:
+    """ProjectStats for every project, by name; include_archived counts archived tasks as completed."""
+    rows = get_connection().execute("""
+        SELECT project, SUM(count) as total,
+               SUM(CASE WHEN status = 'done' THEN count ELSE 0 END) as completed
+        FROM task_counts
         GROUP BY project
         ORDER BY project
     """).fetchall()
-    conn.close()
-    projects = [{"name": r[0], "total_tasks": r[1], "completed": r[2]} for r in rows]
-    return json.dumps(projects, indent=2)
+    archived = _archived_counts(include_archived)
+    if not archived:
+        return [ProjectStats(*r) for r in rows]
+    totals = {project: [total, completed] for project, total, completed in rows}
+    for project, count in archived.items():
+        counts = totals.setdefault(project, [0, 0])
+        counts[0] += count
+        counts[1] += count
+    return [ProjectStats(project, *counts) for project, counts in sorted(totals.items())]
+
+
+# Least word_similarity() for a fuzzy search hit and Jaccard similarity
+# for a possible duplicate. Fuzzy search scores the best-ranked trigram
+# matches; the duplicate check reads the most recent tasks in each band
+# and scores those sharing the most bands. The bounds keep common
+# trigrams and a title repeated many times cheap.
+FUZZY_SIMILARITY = 0.4
+DUPLICATE_SIMILARITY = 0.5
+FUZZY_CANDIDATES = 1000
+BAND_CANDIDATES = 100
+DUPLICATE_CANDIDATES = 20
+
+
+def _query_trigrams(text: str) -> list:
+    """The trigrams of the words of text, as the trigram index stores them."""
+    grams = set()
+    for word in text.lower().split():
+        grams.update(word[i:i + 3] for i in range(len(word) - 2))
+    return sorted(grams)
 
+
+def _tasks_by_rowid(conn: sqlite3.Connection, rowids: list, columns: tuple) -> list:
+    """Tasks for rowids, in the same order."""
+    factory = task_factory(columns, key_size=1)
+    rows = conn.cursor()
+    rows.row_factory = lambda cursor, row: (row[0], factory(cursor, row))
+    select = ", ".join(f"t.{c}" for c in columns)
+    placeholders = ", ".join("?" * len(rowids))
+    found = dict(rows.execute(f"SELECT t.rowid, {select} FROM tasks t WHERE t.rowid IN ({placeholders})", rowids))
+    return [found[r] for r in rowids if r in found]
+
+
+def fetch_fuzzy(query: str, limit: int = None, cursor: str = None, fields=None) -> TaskPage:
+    """
+    Tasks whose title approximately contains query (typos allowed), best
+    match first, as a single page: there is never a next_cursor.
+
+    Candidates come from the trigram index, so only tasks sharing a
+    trigram with the query are ever scored. They are the FUZZY_CANDIDATES
+    holding the most of the query's trigrams (newest first among equals),
+    so a close match is found however old it is and however many titles
+    share a common trigram.
+    """
+    if cursor:
+        raise ValueError("fuzzy search results have no further pages")
+    columns = _parse_fields(fields, SEARCH_FIELDS)
+    grams = _query_trigrams(query)
+    if not grams:
+        return TaskPage([], None, columns)
+    conn = get_connection()
+    candidates = conn.execute(f"""
+        SELECT t.rowid, t.title FROM tasks t WHERE t.rowid IN (
+            SELECT doc FROM tasks_trigram_terms WHERE term IN ({", ".join("?" * len(grams))})
+            GROUP BY doc ORDER BY COUNT(*) DESC, doc DESC LIMIT ?
+        )
+    """, (*grams, FUZZY_CANDIDATES)).fetchall()
+    scored = [(word_similarity(query, title), rowid) for rowid, title in candidates]
+    scored = sorted((s for s in scored if s[0] >= FUZZY_SIMILARITY), key=lambda s: (-s[0], -s[1]))
+    if limit is not None:
+        scored = scored[:_page_limit(limit)]
+    return TaskPage(_tasks_by_rowid(conn, [rowid for _, rowid in scored], columns), None, columns)
+
+
+def find_duplicates(title: str, project: str, limit: int = 3) -> list:
+    """
+    Open tasks in project with a near-identical title, as (Task, similarity)
+    pairs, most similar first.
+
+    Looks the title's MinHash bands up in title_bands and scores at most
+    DUPLICATE_CANDIDATES tasks, however many tasks there are.
+    """
+    bands = title_bands(title, project)
+    if not bands:
+        return []
+    conn = get_connection()
+    # The most recent tasks in each band, ranked by how many bands they share
+    hits = Counter()
+    for band in bands:
+        hits.update(rowid for rowid, in conn.execute(
+            "SELECT task_rowid FROM title_bands WHERE band = ? ORDER BY task_rowid DESC LIMIT ?",
+            (band, BAND_CANDIDATES)
+        ).fetchall())
+    ranked = sorted(hits.items(), key=lambda hit: (-hit[1], -hit[0]))[:DUPLICATE_CANDIDATES]
+    candidates = [
+        task for task in _tasks_by_rowid(conn, [rowid for rowid, _ in ranked], LIST_FIELDS)
+        if task.project == project and task.status != "done"
+    ]
+    scored = [(task, similarity(title, task.title)) for task in candidates]
+    scored = sorted((s for s in scored if s[1] >= DUPLICATE_SIMILARITY), key=lambda s: -s[1])
+    return scored[:limit]
+
+
+def fetch_tags() -> list:
+    """(tag, task count) for every tag in use, by tag; counted off the task_tags index alone."""
+    return get_connection().execute(
+        "SELECT tag, COUNT(*) FROM task_tags GROUP BY tag ORDER BY tag"
+    ).fetchall()
+
+
+def closest_projects(name: str, limit: int = 3, include_archived: bool = False) -> list:
+    """Names of existing projects spelled most like name, best first; name itself leads when it exists."""
+    return closest(name, [p.name for p in fetch_projects(include_archived)], limit)
+
+
+def _error(message: str) -> str:
+    return json.dumps({"status": "error", "message": message})
+
+# Task IDs are ULID-style: 50 bits of milliseconds then 50 random bits,
+# written in lower-case Crockford base32 (no i, l, o or u). Its digits
+# sort in ASCII order, so IDs sort by creation time and new rows append
+# to the end of the primary-key index instead of landing at random.
+_ID_ALPHABET = "0123456789abcdefghjkmnpqrstvwxyz"
+# Every pair of digits, so an ID is ten lookups of 10 bits each
+_ID_PAIRS = [a + b for a in _ID_ALPHABET for b in _ID_ALPHABET]
+_ID_SHIFTS = range(90, -1, -10)
+_RANDOM_BITS = 50
+_id_lock = threading.Lock()
+_last_id = (0, 0)  # (milliseconds, random part) of the last ID made here
+# Fewest leading characters of an ID accepted in its place
+MIN_ID_PREFIX = 4
+
+
+def new_task_id() -> str:
+    """
+    A new 20-character task ID. Within one millisecond the random part is
+    incremented instead of redrawn (carrying into the time when it runs
+    out), so IDs made by one process never repeat and stay in order.
+    """
+    global _last_id
+    with _id_lock:
+        ms, last_ms, last_random = time.time_ns() // 1_000_000, *_last_id
+        if ms > last_ms:
+            random_part = int.from_bytes(os.urandom(7), "big") >> (56 - _RANDOM_BITS)
+        else:
+            ms, random_part = last_ms, last_random + 1
+            if random_part >> _RANDOM_BITS:
+                ms, random_part = ms + 1, 0
+        _last_id = (ms, random_part)
+    value = (ms << _RANDOM_BITS) | random_part
+    return "".join([_ID_PAIRS[(value >> shift) & 1023] for shift in _ID_SHIFTS])
+
+
+def _resolve_task_id(conn: sqlite3.Connection, task_id: str):
+    found = conn.execute("SELECT id FROM tasks WHERE id = ?", (task_id,)).fetchone()
+    if found or len(task_id) < MIN_ID_PREFIX:
+        return found and found[0]
+    # Every ID starting with task_id sorts between it and task_id + U+10FFFF,
+    # so this is a range scan of the primary-key index
+    ids = [row[0] for row in conn.execute(
+        "SELECT id FROM tasks WHERE id > ? AND id < ? ORDER BY id LIMIT 3", (task_id, task_id + "\U0010ffff")
+    )]
+    if len(ids) > 1:
+        shown = ", ".join(ids[:2]) + (", ..." if len(ids) > 2 else "")
+        raise ValueError(f"task ID {task_id!r} matches several tasks ({shown}); give more of it")
+    return ids[0] if ids else None
+
+
+def resolve_task_id(task_id: str):
+    """
+    The full ID of the task whose ID is task_id or, failing that, the only
+    one starting with it (at least MIN_ID_PREFIX characters); None if there
+    is none. Raises ValueError when the prefix matches several tasks.
+    """
+    return _resolve_task_id(get_connection(), task_id)
+
+
+def create_task(title: str, project: str, priority: str = "normal",
+                due_date=None, description: str = "", tags=None) -> Task:
+    """
+    Insert one todo task and return it.
+
+    due_date may be a date or a YYYY-MM-DD string; anything else raises
+    ValueError. tags may be a list or a comma-separated string.
+    """
+    if isinstance(due_date, str):
+        try:
+            due_date = date.fromisoformat(due_date.strip())
+        except ValueError:
+            raise ValueError(f"due_date must be YYYY-MM-DD, got {due_date!r}")
+    task = Task(new_task_id(), title, project, "todo", priority, due_date or None, description or "",
+                normalize_tags(tags))
+    with _writing() as conn:
+        cursor = conn.execute(
+            "INSERT INTO tasks (id, title, project, status, priority, priority_rank, due_date, due_day, description, tags, created_at) VALUES (?, ?, ?, 'todo', ?, ?, ?, ?, ?, ?, ?)",
+            (task.id, title, project, priority, priority_rank(priority), task.sql_value("due_date"),
+             due_day(task.due_date), task.description, task.sql_value("tags"), task.created_at.isoformat())
+        )
+        _insert_title_bands(conn, [(cursor.lastrowid, title, project)])
+        _insert_task_tags(conn, [(cursor.lastrowid, priority_rank(priority), task.tags)])
+    return task
+
+@timed
+def add_task(title: str, project: str, priority: str = "normal",
+             due_date: str = None, description: str = "", tags: str = None) -> str:
+    """Add a new task to a project, optionally with comma-separated tags. Open tasks with a near-identical title in the same project are listed as possible_duplicates."""
+    duplicates = find_duplicates(title, project)
+    try:
+        task = create_task(title, project, priority, due_date, description, tags)
+    except ValueError as e:
+        return _error(str(e))
+    result = {"status": "created", "task_id": task.id, "title": title, "project": project}
+    if task.tags:
+        result["tags"] = task.tags
+    if duplicates:
+        result["possible_duplicates"] = [
+            {"task_id": t.id, "title": t.title, "similarity": round(score, 2)} for t, score in duplicates
+        ]
+    return json.dumps(result)
+
+@timed
+def insert_tasks(tasks, skip_existing: bool = False) -> int:
+    """
+    Insert validated Task objects with a single executemany in one transaction.
+
+    Returns the number of rows inserted. With skip_existing, tasks whose id
+    is already present are ignored instead of aborting the batch.
+    """
+    today = date.today().toordinal()
+    rows = (
+        (t.id, t.title, t.project, t.status, t.priority, priority_rank(t.priority),
+         t.due_date.isoformat() if t.due_date else None, due_day(t.due_date),
+         t.description, ",".join(t.tags) or None, t.created_at.isoformat(),
+         today if t.status == "done" else None)
+        for t in tasks
+    )
+    verb = "INSERT OR IGNORE" if skip_existing else "INSERT"
+    with _writing() as conn:
+        conn.execute("UPDATE bulk_load SET active = 1")
+        last_rowid = conn.execute("SELECT IFNULL(MAX(rowid), 0) FROM tasks").fetchone()[0]
+        cursor = conn.executemany(
+            f"{verb} INTO tasks (id, title, project, status, priority, priority_rank, due_date, due_day, description, tags, created_at, done_day) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        conn.execute("""
+            INSERT INTO tasks_fts (rowid, title, description, tags)
+            SELECT rowid, title, description, tags FROM tasks WHERE rowid > ?
+        """, (last_rowid,))
+        conn.execute("""
+            INSERT INTO tasks_trigram (rowid, title) SELECT rowid, title FROM tasks WHERE rowid > ?
+        """, (last_rowid,))
+        _insert_title_bands(conn, conn.execute(
+            "SELECT rowid, title, project FROM tasks WHERE rowid > ?", (last_rowid,)
+        ).fetchall())
+        _insert_task_tags(conn, conn.execute(
+            "SELECT rowid, priority_rank, tags FROM tasks WHERE rowid > ? AND tags IS NOT NULL", (last_rowid,)
+        ).fetchall())
+        conn.execute("""
+            INSERT INTO task_counts (project, status, count)
+            SELECT project, COALESCE(status, 'todo'), COUNT(*) FROM tasks WHERE rowid > ?
+            GROUP BY project, COALESCE(status, 'todo')
+            ON CONFLICT (project, status) DO UPDATE SET count = count + excluded.count
+        """, (last_rowid,))
+        conn.execute("UPDATE write_version SET version = version + 1")
+        conn.execute("UPDATE bulk_load SET active = 0")
+    return cursor.rowcount
+
+def _taken_id_message(ids: list) -> str:
+    repeated = [task_id for task_id, count in Counter(ids).items() if count > 1]
+    if repeated:
+        return f"task id {repeated[0]!r} is given more than once"
+    conn = get_connection()
+    taken = next((i for i in ids if conn.execute("SELECT 1 FROM tasks WHERE id = ?", (i,)).fetchone()), None)
+    return f"task id {taken!r} already exists" if taken else "task ids must be unique"
+
+@timed
+def add_tasks(tasks: list) -> str:
+    """Add several tasks at once. Each item is an object with title and project, and optionally priority, status, due_date and description. All tasks are created or none are."""
+    batch = []
+    for i, t in enumerate(tasks):
+        try:
+            batch.append(Task.from_dict({**t, "id": t.get("id") or new_task_id()}))
+        except ValueError as e:
+            return _error(f"task {i}: {e}")
+    try:
+        insert_tasks(batch)
+    except sqlite3.IntegrityError:
+        return _error(_taken_id_message([t.id for t in batch]))
+    return json.dumps({"status": "created", "count": len(batch), "task_ids": [t.id for t in batch]})
+
+@timed
+def list_tasks(project: str = None, status: str = None, priority: str = None,
+               limit: int = None, cursor: str = None, fields: str = None,
+               tags: str = None, match: str = "all", include_archived: bool = False) -> str:
+    """List tasks, optionally filtered by project, status, priority and/or comma-separated tags (all of them, or any with match="any"). Use limit to page results and pass back next_cursor for the next page; fields is a comma-separated list of columns to return. include_archived also lists long-finished tasks moved to the archive."""
+    try:
+        page = fetch_tasks(project, status, priority, limit, cursor, fields, tags, match, include_archived)
+    except ValueError as e:
+        return _error(str(e))
+    return timed_dumps(page.to_dict(), indent=2)
+
+def _set_tags(conn: sqlite3.Connection, rowid: int, tags: list):
+    # The task_tags_update trigger clears the old rows first
+    conn.execute("UPDATE tasks SET tags = ? WHERE rowid = ?", (",".join(tags) or None, rowid))
+    rank, = conn.execute("SELECT priority_rank FROM tasks WHERE rowid = ?", (rowid,)).fetchone()
+    _insert_task_tags(conn, [(rowid, rank, tags)])
+
+def edit_task(task_id: str, status: str = None, priority: str = None, tags=None) -> bool:
+    """
+    Set a task's status, priority and/or tags; False if there is no such task.
+
+    tags (a list or comma-separated string) replaces the task's tags; an
+    empty one clears them.
+    """
+    with _writing() as conn:
+        found = conn.execute("SELECT rowid FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        if found and status:
+            conn.execute("UPDATE tasks SET status = ? WHERE id = ?", (status, task_id))
+        if found and priority:
+            conn.execute("UPDATE tasks SET priority = ?, priority_rank = ? WHERE id = ?",
+                         (priority, priority_rank(priority), task_id))
+        if found and tags is not None:
+            _set_tags(conn, found[0], normalize_tags(tags))
+    return found is not None
+
+def tag_task(task_id: str, add=None, remove=None):
+    """Add and remove tags on a task; returns its new tags, or None if there is no such task."""
+    with _writing() as conn:
+        found = conn.execute("SELECT rowid, tags FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        if found is None:
+            return None
+        rowid, current = found
+        dropped = set(normalize_tags(remove))
+        tags = [t for t in normalize_tags([current or "", *normalize_tags(add)]) if t not in dropped]
+        if tags != normalize_tags(current):
+            _set_tags(conn, rowid, tags)
+    return tags
+
+@timed
+def update_task(task_id: str, status: str = None, priority: str = None, tags: str = None) -> str:
+    """Update a task's status, priority or tags (comma-separated; replaces its tags, "" clears them). task_id may be any unambiguous start of the ID."""
+    try:
+        full_id = resolve_task_id(task_id)
+    except ValueError as e:
+        return _error(str(e))
+    if full_id is None or not edit_task(full_id, status, priority, tags):
+        return json.dumps({"status": "not_found", "task_id": task_id})
+    return json.dumps({"status": "updated", "task_id": full_id})
+
+@timed
+def update_tasks(updates: list) -> str:
+    """Update several tasks at once. Each item is an object with task_id and a new status and/or priority."""
+    rows = []
+    for i, u in enumerate(updates):
+        if not u.get("task_id"):
+            return _error(f"update {i}: task_id is required")
+        priority = u.get("priority")
+        rows.append((u.get("status"), priority, priority_rank(priority) if priority else None, u["task_id"]))
+    with _writing() as conn:
+        cursor = conn.executemany("""
+            UPDATE tasks SET status = COALESCE(?, status),
+                             priority = COALESCE(?, priority),
+                             priority_rank = COALESCE(?, priority_rank)
+            WHERE id = ?
+        """, rows)
+    return json.dumps({"status": "updated", "count": cursor.rowcount, "requested": len(rows)})
+
+@timed
+def get_summary(include_archived: bool = False) -> str:
+    """Get a summary of tasks across all projects. include_archived counts archived tasks as done."""
+    return timed_dumps(fetch_summary(include_archived), indent=2)
+
+@timed
+def get_projects(include_archived: bool = False) -> str:
+    """Get a list of all unique projects with task counts. include_archived counts archived tasks as completed."""
+    return timed_dumps([p.to_dict() for p in fetch_projects(include_archived)], indent=2)
+
+@timed
+def get_tags() -> str:
+    """Get every tag in use, with how many tasks carry it."""
+    return timed_dumps([{"tag": tag, "tasks": count} for tag, count in fetch_tags()], indent=2)
+
+@timed
+def rebuild_counters() -> str:
+    """Recompute the project/status counters from the tasks table."""
+    with _writing() as conn:
+        groups = _rebuild_counters(conn)
+    return json.dumps({"status": "rebuilt", "groups": groups})
+
+def remove_task(task_id: str) -> bool:
+    """Delete a task; False if there is no such task."""
+    with _writing() as conn:
+        cursor = conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+    return cursor.rowcount > 0
+
+@timed
 def delete_task(task_id: str) -> str:
-    """Delete a task by its ID."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
-    conn.commit()
-    deleted = cursor.rowcount
-    conn.close()
-    if deleted > 0:
-        return json.dumps({"status": "deleted", "task_id": task_id})
+    """Delete a task by its ID, or any unambiguous start of it."""
+    try:
+        full_id = resolve_task_id(task_id)
+    except ValueError as e:
+        return _error(str(e))
+    if full_id is not None and remove_task(full_id):
+        return json.dumps({"status": "deleted", "task_id": full_id})
     else:
         return json.dumps({"status": "not_found", "task_id": task_id})
 
-def search_tasks(query: str) -> str:
-    """Search tasks by text in title or description."""
-    conn = sqlite3.connect(DB_PATH)
-    search_pattern = f"%{query}%"
-    rows = conn.execute("""
-        SELECT id, title, project, status, priority, due_date, description
-        FROM tasks
-        WHERE title LIKE ? OR description LIKE ?
-        ORDER BY CASE priority WHEN 'urgent' THEN 1 WHEN 'high' THEN 2 WHEN 'normal' THEN 3 ELSE 4 END
-    """, (search_pattern, search_pattern)).fetchall()
-    conn.close()
-    tasks = [{"id": r[0], "title": r[1], "project": r[2], "status": r[3], "priority": r[4], "due_date": r[5], "description": r[6]} for r in rows]
-    return json.dumps(tasks, indent=2)
-
-def get_tasks_due_today() -> str:
-    """Get all tasks due today."""
-    today = datetime.now().date().isoformat()
-    conn = sqlite3.connect(DB_PATH)
-    rows = conn.execute("""
-        SELECT id, title, project, status, priority, due_date
-        FROM tasks
-        WHERE due_date = ? AND status != 'done'
-        ORDER BY CASE priority WHEN 'urgent' THEN 1 WHEN 'high' THEN 2 WHEN 'normal' THEN 3 ELSE 4 END
-    """, (today,)).fetchall()
-    conn.close()
-    tasks = [{"id": r[0], "title": r[1], "project": r[2], "status": r[3], "priority": r[4], "due_date": r[5]} for r in rows]
-    return json.dumps(tasks, indent=2)
\ No newline at end of file
+# Done tasks are archived once they have been done this many days,
+# ARCHIVE_BATCH_SIZE per transaction so other writers never wait long.
+ARCHIVE_AFTER_DAYS = int(os.environ.get("TASK_ARCHIVE_AFTER_DAYS", 90))
+ARCHIVE_BATCH_SIZE = 500
+# Free pages handed back to the filesystem per compact_db() call, and
+# the least time between two runs of run_maintenance().
+COMPACT_PAGES = 2000
+MAINTENANCE_INTERVAL = timedelta(hours=24)
+_ARCHIVE_COLUMNS = ("id, title, project, status, priority, priority_rank, due_date, due_day, "
+                    "description, tags, created_at, done_day")
+
+
+def archive_tasks(older_than_days: int = None, batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    """
+    Move tasks done more than older_than_days days ago (default
+    ARCHIVE_AFTER_DAYS) into the archive database and return how many moved.
+
+    Each batch is copied and deleted in one transaction spanning both
+    files. Should a crash leave a batch in both, the next run only deletes
+    the copies; a task whose id an unrelated archived task already has
+    stays where it is.
+    """
+    cutoff = date.today().toordinal() - (ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days)
+    conn = get_connection()
+    # No archive file until there is something to put in it
+    if conn.execute("SELECT 1 FROM tasks WHERE status = 'done' AND done_day < ? LIMIT 1", (cutoff,)).fetchone() is None:
+        return 0
+    _attach_archive(conn, create=True)
+    moved, last = 0, 0
+    while True:
+        with _writing() as conn:
+            # The batch is the old done tasks in a rowid range, so every
+            # statement below can name it without a list of ids
+            high, count = conn.execute("""
+                SELECT MAX(rowid), COUNT(*) FROM (
+                    SELECT rowid FROM tasks WHERE status = 'done' AND done_day < ? AND rowid > ?
+                    ORDER BY rowid LIMIT ?
+                )
+            """, (cutoff, last, batch_size)).fetchone()
+            if not count:
+                break
+            batch = "FROM tasks m WHERE m.status = 'done' AND m.done_day < ? AND m.rowid > ? AND m.rowid <= ?"
+            params = (cutoff, last, high)
+            first_new = conn.execute("SELECT IFNULL(MAX(rowid), 0) FROM archive.tasks").fetchone()[0]
+            conn.execute(f"""
+                INSERT INTO archive.tasks ({_ARCHIVE_COLUMNS}) SELECT {_ARCHIVE_COLUMNS} {batch}
+                AND NOT EXISTS (SELECT 1 FROM archive.tasks a WHERE a.id = m.id)
+            """, params)
+            conn.execute("""
+                INSERT INTO archive.tasks_fts (rowid, title, description, tags)
+                SELECT rowid, title, description, tags FROM archive.tasks WHERE rowid > ?
+            """, (first_new,))
+            _insert_task_tags(conn, conn.execute(
+                "SELECT rowid, priority_rank, tags FROM archive.tasks WHERE rowid > ? AND tags IS NOT NULL",
+                (first_new,)
+            ).fetchall(), schema="archive")
+            conn.execute("""
+                INSERT INTO archive.task_counts (project, count)
+                SELECT project, COUNT(*) FROM archive.tasks WHERE rowid > ? GROUP BY project
+                ON CONFLICT (project) DO UPDATE SET count = count + excluded.count
+            """, (first_new,))
+            # The delete triggers clear the search, fuzzy, tag and counter rows
+            cursor = conn.execute(f"""
+                DELETE FROM tasks WHERE rowid IN (
+                    SELECT m.rowid {batch} AND EXISTS (
+                        SELECT 1 FROM archive.tasks a WHERE a.id = m.id AND a.created_at IS m.created_at
+                    )
+                )
+            """, params)
+            moved += cursor.rowcount
+            last = high
+    return moved
+
+
+def _rebuild_rowid_indexes(conn: sqlite3.Connection):
+    # Everything keyed on tasks.rowid, rebuilt from the tasks table
+    conn.execute("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')")
+    conn.execute("INSERT INTO tasks_trigram (tasks_trigram) VALUES ('rebuild')")
+    conn.execute("DELETE FROM title_bands")
+    _insert_title_bands(conn, conn.execute("SELECT rowid, title, project FROM tasks").fetchall())
+    conn.execute("DELETE FROM task_tags")
+    _insert_task_tags(conn, conn.execute(
+        "SELECT rowid, priority_rank, tags FROM tasks WHERE tags IS NOT NULL"
+    ).fetchall())
+
+
+def _vacuum_into_incremental(conn: sqlite3.Connection) -> int:
+    """
+    One-time full VACUUM switching an older database to incremental
+    auto-vacuum; returns the pages it freed. That is never below zero,
+    though a small file can grow by the pointer-map pages the switch adds.
+
+    VACUUM may renumber the rowids of tasks (its key is id, not an
+    INTEGER PRIMARY KEY), so when any moved, every index keyed on them
+    is rebuilt.
+    """
+    rowids = conn.execute("SELECT rowid, id FROM tasks ORDER BY rowid").fetchall()
+    pages = conn.execute("PRAGMA main.page_count").fetchone()[0]
+    conn.execute("PRAGMA main.auto_vacuum = INCREMENTAL")
+    conn.execute("VACUUM main")
+    if conn.execute("SELECT rowid, id FROM tasks ORDER BY rowid").fetchall() != rowids:
+        with _writing() as writer:
+            _rebuild_rowid_indexes(writer)
+    return max(0, pages - conn.execute("PRAGMA main.page_count").fetchone()[0])
+
+
+def compact_db(pages: int = COMPACT_PAGES, full: bool = False) -> dict:
+    """
+    Merge the full-text index segments and hand up to pages free pages of
+    each database back to the filesystem; returns the pages freed.
+
+    Only databases using incremental auto-vacuum (every one created since
+    the archive was added) can shrink this way. With full, an older
+    database is switched over first by one full VACUUM, which rewrites
+    the whole file and holds the write lock while it does; otherwise it
+    just reuses freed pages.
+    """
+    conn = get_connection()
+    schemas = ("main", "archive") if _attach_archive(conn) else ("main",)
+    upgraded = {}
+    if full and conn.execute("PRAGMA main.auto_vacuum").fetchone()[0] != 2:
+        upgraded["main"] = _vacuum_into_incremental(conn)
+    with _writing() as conn:
+        conn.execute("INSERT INTO tasks_fts (tasks_fts, rank) VALUES ('merge', 500)")
+        conn.execute("INSERT INTO tasks_trigram (tasks_trigram, rank) VALUES ('merge', 500)")
+        if "archive" in schemas:
+            conn.execute("INSERT INTO archive.tasks_fts (tasks_fts, rank) VALUES ('merge', 500)")
+    freed = {}
+    for schema in schemas:
+        if conn.execute(f"PRAGMA {schema}.auto_vacuum").fetchone()[0] != 2:  # INCREMENTAL
+            continue
+        before = conn.execute(f"PRAGMA {schema}.freelist_count").fetchone()[0]
+        # Run as a script: through execute() the pragma frees one page per step
+        conn.executescript(f"PRAGMA {schema}.incremental_vacuum({int(pages)});")
+        freed[schema] = before - conn.execute(f"PRAGMA {schema}.freelist_count").fetchone()[0]
+        freed[schema] += upgraded.pop(schema, 0)
+        conn.execute(f"PRAGMA {schema}.wal_checkpoint(TRUNCATE)")
+    return freed
+
+
+def run_maintenance(force: bool = False):
+    """
+    Archive old done tasks and compact the databases, at most once per
+    MAINTENANCE_INTERVAL across every process sharing the database unless
+    force. Returns {"archived": n, "freed_pages": {...}}, or None when not due.
+    """
+    now = datetime.now()
+    with _writing() as conn:
+        row = conn.execute("SELECT last_run FROM maintenance WHERE job = 'archive'").fetchone()
+        if not force and row and now - datetime.fromisoformat(row[0]) < MAINTENANCE_INTERVAL:
+            return None
+        conn.execute("INSERT OR REPLACE INTO maintenance (job, last_run) VALUES ('archive', ?)",
+                     (now.isoformat(),))
+    return {"archived": archive_tasks(), "freed_pages": compact_db()}
+
+
+_SEARCH_TERM = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def _fts_query(text: str) -> str:
+    """
+    Translate user search text into an FTS5 MATCH expression.
+
+    "quoted text" is matched as an exact phrase; bare words match as
+    prefixes (a trailing * is accepted but implied), so "meet" still
+    finds "meeting". Terms are OR-ed together and ranked by BM25.
+    """
+    terms = []
+    for phrase, word in _SEARCH_TERM.findall(text):
+        if phrase.strip():
+            terms.append('"' + phrase.replace('"', '""') + '"')
+        word = word.rstrip("*")
+        if word:
+            terms.append('"' + word.replace('"', '""') + '"*')
+    return " OR ".join(terms)
+
+@timed
+def search_tasks(query: str, limit: int = None, cursor: str = None, fields: str = None,
+                 fuzzy: bool = False, include_archived: bool = False) -> str:
+    """Search tasks by text in title, description or tags ("quoted" for exact phrases), best matches first. Supports limit, next_cursor paging and a comma-separated fields list. With fuzzy, matches titles despite typos (one page, no cursor). include_archived also searches archived tasks (not with fuzzy)."""
+    try:
+        if fuzzy:
+            page = fetch_fuzzy(query, limit, cursor, fields)
+        else:
+            page = fetch_search(query, limit, cursor, fields, include_archived)
+    except ValueError as e:
+        return _error(str(e))
+    return timed_dumps(page.to_dict(), indent=2)
+
+@timed
+def get_tasks_due_today(limit: int = None, cursor: str = None, fields: str = None) -> str:
+    """Get all tasks due today. Supports limit, next_cursor paging and a comma-separated fields list."""
+    try:
+        page = fetch_due_today(limit, cursor, fields)
+    except ValueError as e:
+        return _error(str(e))
+    return timed_dumps(page.to_dict(), indent=2)
+
+def _due_tool(fetch, *args, limit=None, cursor=None, fields=None) -> str:
+    try:
+        page = fetch(*args, limit=limit, cursor=cursor, fields=fields)
+    except ValueError as e:
+        return _error(str(e))
+    return timed_dumps(page.to_dict(), indent=2)
+
+@timed
+def get_overdue_tasks(limit: int = None, cursor: str = None, fields: str = None) -> str:
+    """Get open tasks whose due date has passed, oldest first. Supports limit, next_cursor paging and a comma-separated fields list."""
+    return _due_tool(fetch_overdue, limit=limit, cursor=cursor, fields=fields)
+
+@timed
+def get_tasks_due_this_week(limit: int = None, cursor: str = None, fields: str = None) -> str:
+    """Get open tasks due from today through Sunday, soonest first. Supports limit, next_cursor paging and a comma-separated fields list."""
+    return _due_tool(fetch_due_this_week, limit=limit, cursor=cursor, fields=fields)
+
+@timed
+def get_upcoming_tasks(days: int = 7, limit: int = None, cursor: str = None, fields: str = None) -> str:
+    """Get open tasks due in the next N days (including today), soonest first. Supports limit, next_cursor paging and a comma-separated fields list."""
+    return _due_tool(fetch_upcoming, days, limit=limit, cursor=cursor, fields=fields)
+
+@timed
+def get_tasks_due_between(start_date: str = None, end_date: str = None, limit: int = None,
+                          cursor: str = None, fields: str = None) -> str:
+    """Get open tasks due between start_date and end_date inclusive (YYYY-MM-DD; either may be omitted), soonest first. Supports limit, next_cursor paging and a comma-separated fields list."""
+    try:
+        start = date.fromisoformat(start_date) if start_date else None
+        end = date.fromisoformat(end_date) if end_date else None
+    except ValueError:
+        return _error("start_date and end_date must be YYYY-MM-DD")
+    return _due_tool(fetch_due_between, start, end, limit=limit, cursor=cursor, fields=fields)